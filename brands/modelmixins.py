@@ -1,8 +1,17 @@
-from django.core.cache import cache
 from django.utils.text import slugify
-from django_lifecycle import AFTER_DELETE, AFTER_SAVE, BEFORE_SAVE, BEFORE_UPDATE, hook
+from django_lifecycle import (
+    AFTER_DELETE,
+    AFTER_SAVE,
+    AFTER_UPDATE,
+    BEFORE_SAVE,
+    BEFORE_UPDATE,
+    hook,
+)
 
-from core.cache_key_schema import brands_pattern
+from core import cache_key_schema
+from core.cache_key_schema import brands_namespace
+from core.utils import invalidate_namespace, invalidate_tags
+from products.search import get_search_backend
 
 
 class BrandModelMixin:
@@ -26,4 +35,23 @@ class BrandModelMixin:
     @hook(AFTER_SAVE)
     @hook(AFTER_DELETE)
     def clear_cache(self):
-        cache.delete_pattern(pattern=brands_pattern())
+        invalidate_namespace(brands_namespace())
+        brand_urls = {self.url, self.initial_value("url")} - {None, ""}
+        invalidate_tags(
+            cache_key_schema.brand_tag(self.id),
+            *map(cache_key_schema.brand_products_tag, brand_urls),
+        )
+
+    @hook(AFTER_UPDATE, when="name", has_changed=True)
+    def update_product_listings(self):
+        self.product_listings.update(brand_name=self.name)
+
+    @hook(AFTER_UPDATE, when="url", has_changed=True)
+    def update_product_listings_url(self):
+        self.product_listings.update(brand_url=self.url)
+
+    @hook(AFTER_UPDATE, when="name", has_changed=True)
+    def clear_search_cache(self):
+        product_ids = self.products.values_list("id", flat=True)
+        get_search_backend().index_products(product_ids=product_ids)
+        invalidate_tags(cache_key_schema.search_tag())
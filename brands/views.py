@@ -1,5 +1,4 @@
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from rest_framework.generics import (
     ListAPIView,
     ListCreateAPIView,
@@ -7,10 +6,11 @@ from rest_framework.generics import (
 )
 
 from core import cache_key_schema
-from core.cache_key_schema import brands_key_prefix
-from core.utils import get_cached_queryset
-from products.models import Product
-from products.serializers import ProductListSerializer
+from core.cache_key_schema import brands_key_prefix, brands_namespace
+from core.utils import namespaced_cache_page
+from products.models import ProductListing
+from products.serializers import ProductListingSerializer
+from products.viewmixins import CachedProductListAPIViewMixin
 
 from .serializers import BrandDetailSerializer, BrandListSerializer
 from .viewmixins import BrandAPIViewMixin
@@ -22,7 +22,9 @@ class BrandListCreate(BrandAPIViewMixin, ListCreateAPIView):
     search_fields = ("name", "country")
 
     @method_decorator(
-        decorator=cache_page(timeout=None, key_prefix=brands_key_prefix()),
+        decorator=namespaced_cache_page(
+            key_prefix=brands_key_prefix(), namespaces=(brands_namespace(),)
+        ),
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
@@ -35,16 +37,22 @@ class BrandDetailUpdateDelete(BrandAPIViewMixin, RetrieveUpdateDestroyAPIView):
     http_method_names = ("get", "patch", "delete")
 
     @method_decorator(
-        decorator=cache_page(timeout=None, key_prefix=brands_key_prefix()),
+        decorator=namespaced_cache_page(
+            key_prefix=brands_key_prefix(), namespaces=(brands_namespace(),)
+        ),
     )
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
 
-class BrandProductList(ListAPIView):
-    serializer_class = ProductListSerializer
+class BrandProductList(CachedProductListAPIViewMixin, ListAPIView):
+    serializer_class = ProductListingSerializer
     ordering_fields = ("id", "rating", "cheapest_product_item__selling_price")
-    search_fields = ("name", "brand__name", "category__full_name")
+    search_fields = ("name", "brand_name", "category_full_name")
+    list_cache_kwargs = ("brand_url",)
+    list_cache_collection_tag = staticmethod(cache_key_schema.brand_products_tag)
+    all_list_cache_key = staticmethod(cache_key_schema.brand_all_products)
+    visible_list_cache_key = staticmethod(cache_key_schema.brand_visible_products)
 
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
@@ -53,13 +61,8 @@ class BrandProductList(ListAPIView):
         user, brand_url = self.request.user, self.kwargs["brand_url"]
 
         if user.is_staff:
-            queryset = Product.objects.brand_all_products(brand_url)
-            queryset = self.filter_queryset(queryset=queryset)
-            cache_key = cache_key_schema.brand_all_products(brand_url)
+            queryset = ProductListing.objects.brand_all_products(brand_url)
         else:
-            queryset = Product.objects.brand_visible_products(brand_url)
-            queryset = self.filter_queryset(queryset=queryset)
-            cache_key = cache_key_schema.brand_visible_products(brand_url)
+            queryset = ProductListing.objects.brand_visible_products(brand_url)
 
-        cached_queryset = get_cached_queryset(queryset=queryset, cache_key=cache_key)
-        return cached_queryset
+        return queryset
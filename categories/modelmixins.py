@@ -1,10 +1,12 @@
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
-from django_lifecycle import AFTER_DELETE, AFTER_SAVE, BEFORE_SAVE, hook
+from django_lifecycle import AFTER_DELETE, AFTER_SAVE, AFTER_UPDATE, BEFORE_SAVE, hook
 
-from core.cache_key_schema import categories_pattern
+from core import cache_key_schema
+from core.cache_key_schema import categories_namespace
+from core.utils import invalidate_namespace, invalidate_tags
+from products.search import get_search_backend
 
 
 class CategoryModelMixin:
@@ -47,4 +49,15 @@ class CategoryModelMixin:
     @hook(AFTER_SAVE)
     @hook(AFTER_DELETE)
     def clear_cache(self):
-        cache.delete_pattern(pattern=categories_pattern())
+        invalidate_namespace(categories_namespace())
+        invalidate_tags(cache_key_schema.category_tag(self.id))
+
+    @hook(AFTER_UPDATE, when="full_name", has_changed=True)
+    def update_product_listings(self):
+        self.product_listings.update(category_full_name=self.full_name)
+
+    @hook(AFTER_UPDATE, when="full_name", has_changed=True)
+    def clear_search_cache(self):
+        product_ids = self.products.values_list("id", flat=True)
+        get_search_backend().index_products(product_ids=product_ids)
+        invalidate_tags(cache_key_schema.search_tag())
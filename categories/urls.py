@@ -19,4 +19,9 @@ urlpatterns = [
         view=views.CategoryProductList.as_view(),
         name="category_products",
     ),
+    path(
+        route="categories/<int:category_id>/facets/",
+        view=views.CategoryFacetList.as_view(),
+        name="category_facets",
+    ),
 ]
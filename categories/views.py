@@ -1,16 +1,34 @@
+from django.db.models import Prefetch
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from rest_framework.generics import (
+    GenericAPIView,
     ListAPIView,
     ListCreateAPIView,
     RetrieveUpdateDestroyAPIView,
 )
+from rest_framework.response import Response
 
 from core import cache_key_schema
-from core.cache_key_schema import categories_key_prefix
-from core.utils import get_cached_queryset
-from products.models import Product
-from products.serializers import ProductListSerializer
+from core.cache_key_schema import categories_key_prefix, categories_namespace
+from core.cdn import add_surrogate_keys
+from core.permissions import IsAdminOrReadOnly
+from core.utils import (
+    NAMESPACED_CACHE_TIMEOUT,
+    get_cached_entry,
+    get_cached_object_validators,
+    get_conditional_cached_response,
+    get_query_fingerprint,
+    namespaced_cache_page,
+)
+from products.filters import ATTRIBUTE_FILTER_PARAM, get_attribute_filters
+from products.models import (
+    Attribute,
+    AttributeValue,
+    ProductAttributeValue,
+    ProductListing,
+)
+from products.serializers import AttributeFacetSerializer, ProductListingSerializer
+from products.viewmixins import CachedProductListAPIViewMixin
 
 from .serializers import CategoryDetailSerializer, CategoryListSerializer
 from .viewmixins import CategoryAPIViewMixin
@@ -23,7 +41,9 @@ class CategoryListCreate(CategoryAPIViewMixin, ListCreateAPIView):
     search_fields = ("name",)
 
     @method_decorator(
-        decorator=cache_page(timeout=None, key_prefix=categories_key_prefix()),
+        decorator=namespaced_cache_page(
+            key_prefix=categories_key_prefix(), namespaces=(categories_namespace(),)
+        ),
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
@@ -36,28 +56,86 @@ class CategoryDetailUpdateDelete(CategoryAPIViewMixin, RetrieveUpdateDestroyAPIV
     http_method_names = ("get", "patch", "delete")
 
     @method_decorator(
-        decorator=cache_page(timeout=None, key_prefix=categories_key_prefix()),
+        decorator=namespaced_cache_page(
+            key_prefix=categories_key_prefix(), namespaces=(categories_namespace(),)
+        ),
     )
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
 
-class CategoryProductList(ListAPIView):
-    serializer_class = ProductListSerializer
+class CategoryProductList(CachedProductListAPIViewMixin, ListAPIView):
+    serializer_class = ProductListingSerializer
     ordering_fields = ("id", "rating", "cheapest_product_item__selling_price")
-    search_fields = ("name", "brand__name", "category__full_name")
+    search_fields = ("name", "brand_name", "category_full_name")
+    list_cache_kwargs = ("category_id",)
+    list_cache_collection_tag = staticmethod(cache_key_schema.category_products_tag)
+    all_list_cache_key = staticmethod(cache_key_schema.category_all_products)
+    visible_list_cache_key = staticmethod(cache_key_schema.category_visible_products)
 
     def get_queryset(self):
         user, category_id = self.request.user, self.kwargs["category_id"]
 
         if user.is_staff:
-            queryset = Product.objects.category_all_products(category_id)
-            queryset = self.filter_queryset(queryset=queryset)
-            cache_key = cache_key_schema.category_all_products(category_id)
+            queryset = ProductListing.objects.category_all_products(category_id)
         else:
-            queryset = Product.objects.category_visible_products(category_id)
-            queryset = self.filter_queryset(queryset=queryset)
-            cache_key = cache_key_schema.category_visible_products(category_id)
+            queryset = ProductListing.objects.category_visible_products(category_id)
+
+        return queryset
+
+
+class CategoryFacetList(GenericAPIView):
+    serializer_class = AttributeFacetSerializer
+    permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = None
+    http_method_names = ("get",)
+
+    def get_queryset(self):
+        attribute_values = AttributeValue.objects.order_by("id")
+        queryset = Attribute.objects.filter(category=self.kwargs["category_id"])
+        queryset = queryset.prefetch_related(
+            Prefetch(lookup="values", queryset=attribute_values)
+        )
+        return queryset
+
+    def get(self, request, *args, **kwargs):
+        user, category_id = request.user, self.kwargs["category_id"]
+        attribute_filters = get_attribute_filters(request)
+        cache_key = cache_key_schema.category_facets(
+            category=category_id,
+            view="staff" if user.is_staff else "public",
+            fingerprint=get_query_fingerprint(
+                request, param_names=(ATTRIBUTE_FILTER_PARAM,)
+            ),
+        )
+
+        def get_facets():
+            facet_counts = ProductAttributeValue.objects.facet_counts(
+                category_id=category_id,
+                attribute_filters=attribute_filters,
+                visible_only=not user.is_staff,
+            )
+            context = self.get_serializer_context()
+            context["facet_counts"] = facet_counts
+            context["selected_attribute_values"] = set().union(
+                *attribute_filters.values()
+            )
+            serializer = self.get_serializer(
+                self.get_queryset(), many=True, context=context
+            )
+            return serializer.data
 
-        cached_queryset = get_cached_queryset(queryset=queryset, cache_key=cache_key)
-        return cached_queryset
+        cached_facets = get_cached_entry(
+            get_object_function=get_facets,
+            cache_key=cache_key,
+            timeout=NAMESPACED_CACHE_TIMEOUT,
+            get_tags_function=lambda facets: (
+                cache_key_schema.facets_tag(),
+                cache_key_schema.category_products_tag(category_id),
+            ),
+        )
+        etag, last_modified = get_cached_object_validators(cache_key, cached_facets)
+        response = get_conditional_cached_response(
+            request, etag, last_modified, Response(data=cached_facets.value)
+        )
+        return add_surrogate_keys(request, response, cached_facets.tags)
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.6 on 2026-10-18 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0014_alter_comment_user"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["product", "create_datetime", "id"],
+                name="comment_product_listing_idx",
+            ),
+        ),
+    ]
@@ -1,15 +1,16 @@
-from django.core.cache import cache
 from django.db.models import F
 from django_lifecycle import (
     AFTER_CREATE,
     AFTER_DELETE,
     AFTER_SAVE,
+    AFTER_UPDATE,
     BEFORE_CREATE,
     BEFORE_DELETE,
     hook,
 )
 
 from core import cache_key_schema
+from core.utils import invalidate_keys, invalidate_tags
 
 
 class CommentModelMixin:
@@ -21,24 +22,72 @@ class CommentModelMixin:
         if user_is_buyer:
             self.is_buyer = True
 
+    def update_comments_count(self, value):
+        product_model = self._meta.get_field("product").related_model
+        product_model.objects.filter(id=self.product_id).update(
+            comments_count=F("comments_count") + value
+        )
+        invalidate_tags(cache_key_schema.product_tag(self.product_id))
+
     @hook(AFTER_CREATE)
     def increase_comments_count(self):
-        self.product.comments_count = F("comments_count") + 1
-        self.product.save()
+        self.update_comments_count(1)
 
     @hook(BEFORE_DELETE)
     def decrease_comments_count(self):
-        self.product.comments_count = F("comments_count") - 1
-        self.product.save()
+        self.update_comments_count(-1)
+
+    def get_rating_score(self, rating, published, product_id):
+        return {product_id: rating} if rating is not None and published else {}
+
+    def update_product_rating(self, initial_score, score):
+        product_model = self._meta.get_field("product").related_model
+        product_ids = initial_score.keys() | score.keys()
+        for product_id in product_ids:
+            initial_rating = initial_score.get(product_id)
+            rating = score.get(product_id)
+            product_model.objects.update_rating(
+                product_id=product_id,
+                rating_sum=(rating or 0) - (initial_rating or 0),
+                rating_count=(rating is not None) - (initial_rating is not None),
+            )
+        for product in product_model.objects.filter(id__in=product_ids):
+            product.clear_collections_ordering_cache()
+        invalidate_tags(*map(cache_key_schema.product_tag, product_ids))
+
+    @hook(AFTER_CREATE, when="rating", is_not=None)
+    def add_rating(self):
+        self.update_product_rating(
+            initial_score={},
+            score=self.get_rating_score(self.rating, self.published, self.product_id),
+        )
+
+    @hook(AFTER_UPDATE, when_any=["rating", "published", "product"], has_changed=True)
+    def change_rating(self):
+        initial_score = self.get_rating_score(
+            self.initial_value("rating"),
+            self.initial_value("published"),
+            self.initial_value("product"),
+        )
+        score = self.get_rating_score(self.rating, self.published, self.product_id)
+        if initial_score != score:
+            self.update_product_rating(initial_score=initial_score, score=score)
+
+    @hook(AFTER_DELETE, when="rating", is_not=None)
+    def remove_rating(self):
+        self.update_product_rating(
+            initial_score=self.get_rating_score(
+                self.rating, self.published, self.product_id
+            ),
+            score={},
+        )
 
     @hook(AFTER_SAVE)
     @hook(AFTER_DELETE)
     def clear_cache(self):
-        cache.delete_many(
-            keys=(
-                cache_key_schema.all_comments(),
-                cache_key_schema.single_comment(self.id),
-            )
+        invalidate_keys(
+            cache_key_schema.all_comments(),
+            cache_key_schema.single_comment(self.id),
         )
 
 
@@ -56,9 +105,7 @@ class LikeModelMixin:
     @hook(AFTER_SAVE)
     @hook(AFTER_DELETE)
     def clear_cache(self):
-        cache.delete_many(
-            keys=(
-                cache_key_schema.all_comments(),
-                cache_key_schema.single_comment(self.comment.id),
-            )
+        invalidate_keys(
+            cache_key_schema.all_comments(),
+            cache_key_schema.single_comment(self.comment.id),
         )
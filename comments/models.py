@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -35,6 +36,15 @@ class Comment(LifecycleModelMixin, CommentModelMixin, TimeStamp):
         verbose_name=_("متن دیدگاه"),
         max_length=2000,
     )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name=_("امتیاز"),
+        null=True,
+        blank=True,
+        validators=(
+            MinValueValidator(1),
+            MaxValueValidator(5),
+        ),
+    )
     is_buyer = models.BooleanField(
         verbose_name="خریدار",
         default=False,
@@ -50,6 +60,12 @@ class Comment(LifecycleModelMixin, CommentModelMixin, TimeStamp):
         ordering = ("-create_datetime",)
         unique_together = ("user", "product")
         db_table = "comment"
+        indexes = (
+            models.Index(
+                fields=("product", "create_datetime", "id"),
+                name="comment_product_listing_idx",
+            ),
+        )
 
     def __str__(self) -> str:
         return f"{self.user.get_full_name()} - {self.product.name} - {self.text:20} ..."
@@ -47,6 +47,7 @@ class CommentListSerializer(CommentBaseSerializer):
         fields = (
             "id",
             "text",
+            "rating",
             "full_name",
             "absolute_url",
             "user",
@@ -175,3 +175,8 @@ SPECTACULAR_SETTINGS = {
         "displayOperationId": True,
     },
 }
+
+CDN = {
+    "BACKEND": "core.cdn.DummyPurgeBackend",
+    "MAX_AGE": 60 * 60,
+}
@@ -28,8 +28,39 @@ CACHES = {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": "redis://127.0.0.1:6379",
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "CLIENT_CLASS": "core.cache_backends.CircuitBreakerClient",
+            "SOCKET_CONNECT_TIMEOUT": 0.1,
+            "SOCKET_TIMEOUT": 0.25,
+            "FALLBACK_CACHE": "fallback",
+            "CIRCUIT_BREAKER_FAILURE_THRESHOLD": 5,
+            "CIRCUIT_BREAKER_RECOVERY_INTERVAL": 5,
+            "SERIALIZER": "core.cache_codecs.CompactSerializer",
+            "COMPRESSOR": "core.cache_codecs.ZstdCompressor",
+            "COMPACT_CODEC": "orjson",
+            "COMPRESS_MIN_LENGTH": 1024,
             "IGNORE_EXCEPTIONS": True,
         },
-    }
+    },
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "TIMEOUT": 60,
+        "OPTIONS": {
+            "MAX_ENTRIES": 1000,
+        },
+    },
+    "fallback": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "fallback",
+        "TIMEOUT": 30,
+        "OPTIONS": {
+            "MAX_ENTRIES": 1000,
+        },
+    },
+    "tiered": {
+        "BACKEND": "core.cache_backends.TieredCache",
+        "OPTIONS": {
+            "LOCAL_CACHE": "local",
+            "REMOTE_CACHE": "default",
+        },
+    },
 }
@@ -56,4 +56,8 @@ urlpatterns = [
         route="api/v1/",
         view=include("comments.urls"),
     ),
+    path(
+        route="api/v1/",
+        view=include("core.urls"),
+    ),
 ] + static(prefix=settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
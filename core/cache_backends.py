@@ -0,0 +1,336 @@
+import json
+import logging
+import os
+import threading
+import time
+from functools import partial
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django_redis import get_redis_connection
+from django_redis.client import DefaultClient
+from django_redis.exceptions import ConnectionInterrupted
+from redis.exceptions import ConnectionError, RedisError, ResponseError
+
+from . import cache_key_schema
+from .circuit_breaker import get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+listener_lock = threading.Lock()
+listener_processes = set()
+
+
+class CircuitOpenError(ConnectionError):
+    pass
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.local_alias = options.get("LOCAL_CACHE", "local")
+        self.remote_alias = options.get("REMOTE_CACHE", "default")
+        self.reconnect_interval = options.get("RECONNECT_INTERVAL", 1)
+
+    @property
+    def local(self):
+        return caches[self.local_alias]
+
+    @property
+    def remote(self):
+        return caches[self.remote_alias]
+
+    def get_local_timeout(self, timeout):
+        local_timeout = self.local.default_timeout
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return local_timeout
+        if local_timeout is None:
+            return timeout
+        return min(timeout, local_timeout)
+
+    def get(self, key, default=None, version=None):
+        self.start_invalidation_listener()
+
+        value = self.local.get(key, MISSING, version=version)
+        if value is not MISSING:
+            return value
+
+        value = self.remote.get(key, MISSING, version=version)
+        if value is MISSING:
+            return default
+
+        self.local.set(
+            key, value, timeout=self.get_local_timeout(None), version=version
+        )
+        return value
+
+    def get_many(self, keys, version=None):
+        self.start_invalidation_listener()
+
+        values = self.local.get_many(keys, version=version)
+        missing_keys = [key for key in keys if key not in values]
+        if missing_keys:
+            remote_values = self.remote.get_many(missing_keys, version=version)
+            self.local.set_many(
+                remote_values, timeout=self.get_local_timeout(None), version=version
+            )
+            values.update(remote_values)
+
+        return values
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.remote.set(key, value, timeout=timeout, version=version)
+        self.local.set(
+            key, value, timeout=self.get_local_timeout(timeout), version=version
+        )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.remote.add(key, value, timeout=timeout, version=version)
+        if added:
+            self.local.set(
+                key, value, timeout=self.get_local_timeout(timeout), version=version
+            )
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed_keys = self.remote.set_many(data, timeout=timeout, version=version)
+        self.local.set_many(
+            data, timeout=self.get_local_timeout(timeout), version=version
+        )
+        return failed_keys
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.remote.touch(key, timeout=timeout, version=version)
+
+    def has_key(self, key, version=None):
+        return self.local.has_key(key, version=version) or self.remote.has_key(
+            key, version=version
+        )
+
+    def incr(self, key, delta=1, version=None):
+        value = self.remote.incr(key, delta=delta, version=version)
+        self.invalidate_local((key,), version=version)
+        return value
+
+    def delete(self, key, version=None):
+        deleted = self.remote.delete(key, version=version)
+        self.invalidate_local((key,), version=version)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        self.remote.delete_many(keys, version=version)
+        self.invalidate_local(keys, version=version)
+
+    def clear(self):
+        self.remote.clear()
+        self.invalidate_local((), clear=True)
+
+    def invalidate_local(self, keys, version=None, clear=False):
+        if clear:
+            self.local.clear()
+        else:
+            self.local.delete_many(keys, version=version)
+
+        message = json.dumps({"keys": list(keys), "version": version, "clear": clear})
+        try:
+            get_redis_connection(self.remote_alias).publish(
+                cache_key_schema.local_cache_invalidation_channel(), message
+            )
+        except (RedisError, NotImplementedError) as error:
+            logger.warning("Could not publish local cache invalidation: %s", error)
+
+    def start_invalidation_listener(self):
+        listener_process = (os.getpid(), self.local_alias)
+        if listener_process in listener_processes:
+            return
+
+        with listener_lock:
+            if listener_process in listener_processes:
+                return
+            listener_processes.add(listener_process)
+            listener = threading.Thread(
+                target=self.listen_for_invalidations,
+                name="local-cache-invalidation-listener",
+                daemon=True,
+            )
+            listener.start()
+
+    def listen_for_invalidations(self):
+        channel = cache_key_schema.local_cache_invalidation_channel()
+
+        while True:
+            try:
+                pubsub = get_redis_connection(self.remote_alias).pubsub()
+                pubsub.subscribe(channel)
+                self.local.clear()
+
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.handle_invalidation_message(message["data"])
+            except (RedisError, NotImplementedError) as error:
+                logger.warning("Local cache invalidation listener failed: %s", error)
+                self.local.clear()
+                time.sleep(self.reconnect_interval)
+
+    def handle_invalidation_message(self, data):
+        message = json.loads(data)
+        if message["clear"]:
+            self.local.clear()
+        else:
+            self.local.delete_many(message["keys"], version=message["version"])
+
+
+class CircuitBreakerClient(DefaultClient):
+    def __init__(self, server, params, backend):
+        super().__init__(server, params, backend)
+        options = params.get("OPTIONS", {})
+        self.fallback_alias = options.get("FALLBACK_CACHE", "fallback")
+        self.circuit_breaker = get_circuit_breaker(
+            name=",".join(self._server),
+            probe_function=self.ping,
+            on_close=self.clear_fallback,
+            failure_threshold=options.get("CIRCUIT_BREAKER_FAILURE_THRESHOLD", 5),
+            recovery_interval=options.get("CIRCUIT_BREAKER_RECOVERY_INTERVAL", 5),
+        )
+
+    @property
+    def fallback(self):
+        return caches[self.fallback_alias]
+
+    def ping(self):
+        return super().get_client(write=True).ping()
+
+    def clear_fallback(self):
+        self.fallback.clear()
+
+    def call_redis(self, redis_function, fallback_function):
+        if not self.circuit_breaker.allow_request():
+            return fallback_function()
+
+        try:
+            result = redis_function()
+        except (ConnectionInterrupted, RedisError) as error:
+            cause = (
+                error.__cause__ if isinstance(error, ConnectionInterrupted) else error
+            )
+            if isinstance(cause, ResponseError):
+                raise
+            self.circuit_breaker.record_failure()
+            return fallback_function()
+
+        self.circuit_breaker.record_success()
+        return result
+
+    def get_client(self, write=True, tried=None, show_index=False):
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError("Redis circuit breaker is open")
+        return super().get_client(write=write, tried=tried, show_index=show_index)
+
+    def get(self, key, default=None, version=None, client=None):
+        return self.call_redis(
+            partial(super().get, key, default=default, version=version, client=client),
+            partial(self.fallback.get, key, default=default, version=version),
+        )
+
+    def get_many(self, keys, version=None, client=None):
+        return self.call_redis(
+            partial(super().get_many, keys, version=version, client=client),
+            partial(self.fallback.get_many, keys, version=version),
+        )
+
+    def set(
+        self,
+        key,
+        value,
+        timeout=DEFAULT_TIMEOUT,
+        version=None,
+        client=None,
+        nx=False,
+        xx=False,
+    ):
+        if nx:
+            fallback_function = partial(
+                self.fallback.add, key, value, timeout=timeout, version=version
+            )
+        else:
+            fallback_function = partial(
+                self.set_fallback, key, value, timeout=timeout, version=version
+            )
+
+        return self.call_redis(
+            partial(
+                super().set,
+                key,
+                value,
+                timeout=timeout,
+                version=version,
+                client=client,
+                nx=nx,
+                xx=xx,
+            ),
+            fallback_function,
+        )
+
+    def set_fallback(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.fallback.set(key, value, timeout=timeout, version=version)
+        return True
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        return self.call_redis(
+            partial(
+                super().set_many, data, timeout=timeout, version=version, client=client
+            ),
+            partial(self.fallback.set_many, data, timeout=timeout, version=version),
+        )
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        return self.call_redis(
+            partial(super().delete, key, version=version, prefix=prefix, client=client),
+            partial(self.fallback.delete, key, version=version),
+        )
+
+    def delete_many(self, keys, version=None, client=None):
+        return self.call_redis(
+            partial(super().delete_many, keys, version=version, client=client),
+            partial(self.fallback.delete_many, keys, version=version),
+        )
+
+    def incr(self, key, delta=1, version=None, client=None, ignore_key_check=False):
+        return self.call_redis(
+            partial(
+                super().incr,
+                key,
+                delta=delta,
+                version=version,
+                client=client,
+                ignore_key_check=ignore_key_check,
+            ),
+            partial(self.fallback.incr, key, delta=delta, version=version),
+        )
+
+    def decr(self, key, delta=1, version=None, client=None):
+        return self.call_redis(
+            partial(super().decr, key, delta=delta, version=version, client=client),
+            partial(self.fallback.decr, key, delta=delta, version=version),
+        )
+
+    def has_key(self, key, version=None, client=None):
+        return self.call_redis(
+            partial(super().has_key, key, version=version, client=client),
+            partial(self.fallback.has_key, key, version=version),
+        )
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        return self.call_redis(
+            partial(
+                super().touch, key, timeout=timeout, version=version, client=client
+            ),
+            partial(self.fallback.touch, key, timeout=timeout, version=version),
+        )
+
+    def clear(self, client=None):
+        self.fallback.clear()
+        return self.call_redis(partial(super().clear, client=client), lambda: None)
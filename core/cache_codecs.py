@@ -0,0 +1,109 @@
+import pickle
+
+import msgpack
+import orjson
+import pyzstd
+from django.core.exceptions import ImproperlyConfigured
+from django_redis.compressors.base import BaseCompressor
+from django_redis.serializers.base import BaseSerializer
+
+PICKLE_TAG = b"P"
+ORJSON_TAG = b"J"
+MSGPACK_TAG = b"M"
+LEGACY_PICKLE_TAG = pickle.PROTO
+
+ZSTD_MAGIC_NUMBER = b"\x28\xb5\x2f\xfd"
+
+
+def to_plain_value(value):
+    if isinstance(value, str):
+        return str.__str__(value)
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not a plain value")
+
+
+class OrjsonCodec:
+    tag = ORJSON_TAG
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_SUBCLASS
+    )
+
+    def dumps(self, value) -> bytes:
+        return orjson.dumps(value, default=to_plain_value, option=self.options)
+
+    def loads(self, value: bytes):
+        return orjson.loads(value)
+
+
+class MsgpackCodec:
+    tag = MSGPACK_TAG
+
+    def dumps(self, value) -> bytes:
+        return msgpack.packb(value, default=to_plain_value, strict_types=True)
+
+    def loads(self, value: bytes):
+        return msgpack.unpackb(value, raw=False, strict_map_key=False)
+
+
+CODECS = {
+    "orjson": OrjsonCodec(),
+    "msgpack": MsgpackCodec(),
+}
+
+
+class CompactSerializer(BaseSerializer):
+    def __init__(self, options):
+        codec_name = options.get("COMPACT_CODEC", "orjson")
+        if codec_name not in CODECS:
+            raise ImproperlyConfigured(
+                f"COMPACT_CODEC must be one of: {', '.join(CODECS)}"
+            )
+
+        self.codec = CODECS[codec_name]
+        self.decoders = {codec.tag: codec.loads for codec in CODECS.values()}
+        self.pickle_protocol = options.get("PICKLE_VERSION", pickle.HIGHEST_PROTOCOL)
+
+        super().__init__(options=options)
+
+    def dumps(self, value) -> bytes:
+        if isinstance(value, (dict, list, str)):
+            try:
+                return self.codec.tag + self.codec.dumps(value)
+            except (TypeError, ValueError, OverflowError):
+                pass
+
+        return PICKLE_TAG + pickle.dumps(value, protocol=self.pickle_protocol)
+
+    def loads(self, value: bytes):
+        tag, payload = value[:1], value[1:]
+
+        if tag == PICKLE_TAG:
+            return pickle.loads(payload)
+        if tag in self.decoders:
+            return self.decoders[tag](payload)
+        if tag == LEGACY_PICKLE_TAG:
+            return pickle.loads(value)
+
+        raise ValueError(f"Unknown cache codec tag: {tag!r}")
+
+
+class ZstdCompressor(BaseCompressor):
+    def __init__(self, options):
+        super().__init__(options)
+        self.min_length = options.get("COMPRESS_MIN_LENGTH", 1024)
+        self.level = options.get("COMPRESS_LEVEL", 3)
+
+    def compress(self, value: bytes) -> bytes:
+        if len(value) < self.min_length:
+            return value
+        return pyzstd.compress(value, level_or_option=self.level)
+
+    def decompress(self, value: bytes) -> bytes:
+        if value[:4] != ZSTD_MAGIC_NUMBER:
+            return value
+        return pyzstd.decompress(value)
@@ -1,19 +1,152 @@
-# brands app cache keys
+import re
 
+# cache key families
 
-def brands_pattern() -> str:
-    return "*brands*"
+KEY_FAMILIES = (
+    ("generations:categories", r"^generations:categories$"),
+    ("generations:brands", r"^generations:brands$"),
+    ("tags:clock", r"^tags:clock$"),
+    ("tags", r"^tags:"),
+    ("locks", r"^locks:"),
+    ("products:all", r"^products:all:"),
+    ("products:visible", r"^products:visible:"),
+    ("products:representation", r"^products:[^:]+:[^:]+:representation:"),
+    ("products:single", r"^products:[^:]+:[^:]+:[^:]+$"),
+    ("categories:products", r"^categories:[^:]+:products:"),
+    ("categories:facets", r"^categories:[^:]+:facets:"),
+    ("categories:pages", r"^categories:"),
+    ("brands:products", r"^brands:[^:]+:products:"),
+    ("brands:pages", r"^brands:"),
+    ("product-items:all", r"^product-items:all$"),
+    ("product-items:single", r"^product-items:"),
+    ("comments:all", r"^comments:all$"),
+    ("comments:single", r"^comments:"),
+    ("users:all", r"^users:all$"),
+    ("users:single", r"^users:"),
+)
 
 
-def brands_key_prefix() -> str:
+def key_family(cache_key) -> str:
+    for family, pattern in KEY_FAMILIES:
+        if re.search(pattern, cache_key):
+            return family
+    return "other"
+
+
+# cache namespaces
+
+
+def namespace_generation(namespace) -> str:
+    return f"generations:{namespace}"
+
+
+def brands_namespace() -> str:
     return "brands"
 
 
-# categories app cache keys
+def categories_namespace() -> str:
+    return "categories"
+
+
+# cache tags
+
+
+def cache_tag_version(tag) -> str:
+    return f"tags:{tag}"
+
+
+def cache_tags_clock() -> str:
+    return "tags:clock"
+
+
+def product_tag(product) -> str:
+    return f"product:{product}"
+
+
+def category_tag(category) -> str:
+    return f"category:{category}"
+
+
+def brand_tag(brand) -> str:
+    return f"brand:{brand}"
+
+
+def products_tag() -> str:
+    return "products"
+
+
+def category_products_tag(category) -> str:
+    return f"category:{category}:products"
+
+
+def brand_products_tag(brand) -> str:
+    return f"brand:{brand}:products"
+
+
+def ordering_tag(tag) -> str:
+    return f"{tag}:ordering"
+
+
+def search_tag() -> str:
+    return "products:search"
+
+
+def facets_tag() -> str:
+    return "products:facets"
+
 
+# cdn surrogate keys
 
-def categories_pattern() -> str:
-    return "*categories*"
+
+def surrogate_key(tag) -> str:
+    return tag.replace(":", "-")
+
+
+# cache locks
+
+
+def cache_fill_lock(cache_key) -> str:
+    return f"locks:{cache_key}"
+
+
+# cache channels
+
+
+def local_cache_invalidation_channel() -> str:
+    return "channels:local-cache-invalidation"
+
+
+# cache metrics
+
+
+def cache_metrics(family) -> str:
+    return f"metrics:cache:{family}"
+
+
+def cache_metrics_families() -> str:
+    return "metrics:cache:families"
+
+
+def product_views() -> str:
+    return "metrics:product-views"
+
+
+def product_views_flushing() -> str:
+    return "metrics:product-views:flushing"
+
+
+def product_viewer(product, visitor) -> str:
+    return f"metrics:product-viewers:{product}:{visitor}"
+
+
+# brands app cache keys
+
+
+def brands_key_prefix() -> str:
+    return "brands"
+
+
+# categories app cache keys
 
 
 def categories_key_prefix() -> str:
@@ -45,32 +178,40 @@ def single_user(user) -> str:
 # products app cache keys
 
 
-def all_products() -> str:
-    return "products:all"
+def all_products(fingerprint) -> str:
+    return f"products:all:{fingerprint}"
+
+
+def visible_products(fingerprint) -> str:
+    return f"products:visible:{fingerprint}"
+
+
+def single_product(category, product, view) -> str:
+    return f"products:{category}:{product}:{view}"
 
 
-def visible_products() -> str:
-    return "products:visible"
+def product_representation(category, product, view, fingerprint) -> str:
+    return f"products:{category}:{product}:representation:{view}:{fingerprint}"
 
 
-def single_product(product) -> str:
-    return f"products:{product}"
+def category_all_products(category, fingerprint) -> str:
+    return f"categories:{category}:products:all:{fingerprint}"
 
 
-def category_all_products(category) -> str:
-    return f"categories:{category}:products:all"
+def category_visible_products(category, fingerprint) -> str:
+    return f"categories:{category}:products:visible:{fingerprint}"
 
 
-def category_visible_products(category) -> str:
-    return f"categories:{category}:products:visible"
+def category_facets(category, view, fingerprint) -> str:
+    return f"categories:{category}:facets:{view}:{fingerprint}"
 
 
-def brand_all_products(brand) -> str:
-    return f"brands:{brand}:products:all"
+def brand_all_products(brand, fingerprint) -> str:
+    return f"brands:{brand}:products:all:{fingerprint}"
 
 
-def brand_visible_products(brand) -> str:
-    return f"brands:{brand}:products:visible"
+def brand_visible_products(brand, fingerprint) -> str:
+    return f"brands:{brand}:products:visible:{fingerprint}"
 
 
 def all_product_items() -> str:
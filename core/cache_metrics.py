@@ -0,0 +1,145 @@
+import logging
+import pickle
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.cache import caches
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from . import cache_key_schema
+
+logger = logging.getLogger(__name__)
+
+METRIC_FIELDS = (
+    "hits",
+    "misses",
+    "fills",
+    "fill_time_ms",
+    "fill_bytes",
+    "sized_fills",
+    "invalidations",
+)
+
+
+class CacheMetrics:
+    def __init__(self, cache_alias="default", flush_interval=10, size_sample_rate=0.01):
+        self.cache_alias = cache_alias
+        self.flush_interval = flush_interval
+        self.size_sample_rate = size_sample_rate
+        self.lock = threading.Lock()
+        self.counters = defaultdict(Counter)
+        self.last_flush_time = time.monotonic()
+
+    def record(self, cache_key, **values):
+        family = cache_key_schema.key_family(cache_key)
+        with self.lock:
+            self.counters[family].update(values)
+            flush_is_due = (
+                time.monotonic() - self.last_flush_time >= self.flush_interval
+            )
+
+        if flush_is_due:
+            self.flush()
+
+    def record_hit(self, cache_key):
+        self.record(cache_key, hits=1)
+
+    def record_miss(self, cache_key):
+        self.record(cache_key, misses=1)
+
+    def get_payload_size(self, value):
+        client = getattr(caches[self.cache_alias], "client", None)
+        if client is None:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+        payload = client.encode(value)
+        return len(payload) if isinstance(payload, bytes) else len(str(payload))
+
+    def record_fill(self, cache_key, fill_time, value=None, size=None):
+        if size is None and random.random() < self.size_sample_rate:
+            size = self.get_payload_size(value)
+
+        if size is None:
+            self.record(cache_key, fills=1, fill_time_ms=fill_time * 1000)
+        else:
+            self.record(
+                cache_key,
+                fills=1,
+                fill_time_ms=fill_time * 1000,
+                fill_bytes=size,
+                sized_fills=1,
+            )
+
+    def record_invalidation(self, *cache_keys):
+        for cache_key in cache_keys:
+            self.record(cache_key, invalidations=1)
+
+    def flush(self):
+        with self.lock:
+            counters, self.counters = self.counters, defaultdict(Counter)
+            self.last_flush_time = time.monotonic()
+
+        if not counters:
+            return
+
+        try:
+            pipeline = get_redis_connection(self.cache_alias).pipeline(
+                transaction=False
+            )
+            pipeline.sadd(cache_key_schema.cache_metrics_families(), *counters)
+            for family, values in counters.items():
+                metrics_key = cache_key_schema.cache_metrics(family)
+                for field, value in values.items():
+                    pipeline.hincrbyfloat(metrics_key, field, value)
+            pipeline.execute()
+        except RedisError as error:
+            logger.warning("Could not flush cache metrics: %s", error)
+
+    def read(self):
+        self.flush()
+
+        connection = get_redis_connection(self.cache_alias)
+        families = sorted(
+            family.decode()
+            for family in connection.smembers(cache_key_schema.cache_metrics_families())
+        )
+
+        metrics = {}
+        for family in families:
+            values = connection.hgetall(cache_key_schema.cache_metrics(family))
+            values = {key.decode(): float(value) for key, value in values.items()}
+            family_metrics = {field: values.get(field, 0) for field in METRIC_FIELDS}
+
+            lookups = family_metrics["hits"] + family_metrics["misses"]
+            fills = family_metrics["fills"]
+            sized_fills = family_metrics["sized_fills"]
+            family_metrics["hit_rate"] = (
+                family_metrics["hits"] / lookups if lookups else None
+            )
+            family_metrics["avg_fill_time_ms"] = (
+                family_metrics["fill_time_ms"] / fills if fills else None
+            )
+            family_metrics["avg_fill_bytes"] = (
+                family_metrics["fill_bytes"] / sized_fills if sized_fills else None
+            )
+            metrics[family] = family_metrics
+
+        return metrics
+
+    def reset(self):
+        with self.lock:
+            self.counters = defaultdict(Counter)
+
+        connection = get_redis_connection(self.cache_alias)
+        families_key = cache_key_schema.cache_metrics_families()
+        families = connection.smembers(families_key)
+        connection.delete(
+            families_key,
+            *(cache_key_schema.cache_metrics(family.decode()) for family in families),
+        )
+
+
+cache_metrics = CacheMetrics()
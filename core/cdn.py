@@ -0,0 +1,125 @@
+import json
+import logging
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+
+from . import cache_key_schema
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CDN = {"BACKEND": "core.cdn.DummyPurgeBackend"}
+
+cdn_purge_backend_lock = threading.Lock()
+cdn_purge_backend = None
+cdn_purge_executor_lock = threading.Lock()
+cdn_purge_executor = None
+
+
+class BasePurgeBackend:
+    background = False
+
+    def __init__(self, options):
+        self.options = options
+
+    def purge(self, surrogate_keys):
+        raise NotImplementedError
+
+
+class DummyPurgeBackend(BasePurgeBackend):
+    def purge(self, surrogate_keys):
+        pass
+
+
+class HttpPurgeBackend(BasePurgeBackend):
+    def __init__(self, options):
+        super().__init__(options)
+        self.url = options["URL"]
+        self.headers = options.get("HEADERS", {})
+        self.timeout = options.get("TIMEOUT", 1)
+        self.batch_size = options.get("BATCH_SIZE", 30)
+        self.background = options.get("BACKGROUND", True)
+
+    def purge(self, surrogate_keys):
+        surrogate_keys = list(surrogate_keys)
+        for index in range(0, len(surrogate_keys), self.batch_size):
+            self.send(surrogate_keys[index : index + self.batch_size])
+
+    def send(self, surrogate_keys):
+        request = urllib.request.Request(
+            url=self.url,
+            data=json.dumps({"tags": surrogate_keys}).encode(),
+            headers={"Content-Type": "application/json", **self.headers},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except OSError as error:
+            logger.warning("Could not purge CDN surrogate keys: %s", error)
+
+
+def get_cdn_settings() -> dict:
+    return getattr(settings, "CDN", DEFAULT_CDN)
+
+
+def get_cdn_purge_backend() -> BasePurgeBackend:
+    global cdn_purge_backend
+
+    if cdn_purge_backend is not None:
+        return cdn_purge_backend
+
+    with cdn_purge_backend_lock:
+        if cdn_purge_backend is None:
+            cdn_settings = get_cdn_settings()
+            backend_class = import_string(cdn_settings["BACKEND"])
+            cdn_purge_backend = backend_class(cdn_settings.get("OPTIONS", {}))
+        return cdn_purge_backend
+
+
+def get_cdn_purge_executor() -> ThreadPoolExecutor:
+    global cdn_purge_executor
+
+    if cdn_purge_executor is not None:
+        return cdn_purge_executor
+
+    with cdn_purge_executor_lock:
+        if cdn_purge_executor is None:
+            cdn_purge_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="cdn-purge"
+            )
+        return cdn_purge_executor
+
+
+def purge_cdn_tags(*tags):
+    surrogate_keys = sorted({cache_key_schema.surrogate_key(tag) for tag in tags})
+    if not surrogate_keys:
+        return
+
+    backend = get_cdn_purge_backend()
+    if backend.background:
+        get_cdn_purge_executor().submit(backend.purge, surrogate_keys)
+    else:
+        backend.purge(surrogate_keys)
+
+
+def add_surrogate_keys(request, response, tags):
+    if response is None or not tags:
+        return response
+    if request.method not in ("GET", "HEAD") or response.status_code >= 400:
+        return response
+
+    surrogate_keys = sorted({cache_key_schema.surrogate_key(tag) for tag in tags})
+    response.headers["Surrogate-Key"] = " ".join(surrogate_keys)
+    response.headers["Cache-Tag"] = ",".join(surrogate_keys)
+
+    max_age = get_cdn_settings().get("MAX_AGE")
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True)
+    elif max_age:
+        response.headers["Surrogate-Control"] = f"max-age={max_age}"
+    return response
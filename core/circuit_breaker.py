@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+circuit_breakers_lock = threading.Lock()
+circuit_breakers = {}
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name,
+        probe_function,
+        on_close=None,
+        failure_threshold=5,
+        recovery_interval=5,
+    ):
+        self.name = name
+        self.probe_function = probe_function
+        self.on_close = on_close
+        self.failure_threshold = failure_threshold
+        self.recovery_interval = recovery_interval
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.is_open = False
+
+    def allow_request(self) -> bool:
+        return not self.is_open
+
+    def record_success(self):
+        if self.failures:
+            with self.lock:
+                self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.is_open or self.failures < self.failure_threshold:
+                return
+            self.is_open = True
+
+        logger.warning(
+            "Circuit breaker %s opened after %s failures", self.name, self.failures
+        )
+        probe = threading.Thread(
+            target=self.probe,
+            name=f"circuit-breaker-probe-{self.name}",
+            daemon=True,
+        )
+        probe.start()
+
+    def probe(self):
+        while True:
+            time.sleep(self.recovery_interval)
+            try:
+                self.probe_function()
+            except Exception as error:
+                logger.info("Circuit breaker %s probe failed: %s", self.name, error)
+                continue
+
+            if self.on_close is not None:
+                self.on_close()
+            with self.lock:
+                self.failures = 0
+                self.is_open = False
+            logger.warning("Circuit breaker %s closed", self.name)
+            return
+
+
+def get_circuit_breaker(name, **options) -> CircuitBreaker:
+    circuit_breaker = circuit_breakers.get(name)
+    if circuit_breaker is not None:
+        return circuit_breaker
+
+    with circuit_breakers_lock:
+        if name not in circuit_breakers:
+            circuit_breakers[name] = CircuitBreaker(name=name, **options)
+        return circuit_breakers[name]
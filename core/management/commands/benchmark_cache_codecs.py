@@ -0,0 +1,107 @@
+import timeit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django_redis.compressors.identity import IdentityCompressor
+from django_redis.serializers.pickle import PickleSerializer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.cache_codecs import CompactSerializer, ZstdCompressor
+from products.models import Product, ProductListing
+from products.serializers import ProductDetailSerializer, ProductListingSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare pickle with the compact cache codec on real product payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=1000,
+            help="Number of dumps/loads rounds measured for every payload",
+        )
+        parser.add_argument(
+            "--compress-min-length",
+            type=int,
+            default=1024,
+            help="Payloads smaller than this are stored uncompressed",
+        )
+
+    def handle(self, *args, **options):
+        payloads = self.get_payloads()
+        codecs = self.get_codecs(options["compress_min_length"])
+        iterations = options["iterations"]
+
+        header = (
+            f"{'payload':<24}{'codec':<24}{'bytes':>10}{'dumps µs':>12}{'loads µs':>12}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for payload_name, payload in payloads.items():
+            for codec_name, (serializer, compressor) in codecs.items():
+
+                def dumps():
+                    return compressor.compress(serializer.dumps(payload))
+
+                encoded_payload = dumps()
+
+                def loads():
+                    return serializer.loads(compressor.decompress(encoded_payload))
+
+                dumps_time = timeit.timeit(dumps, number=iterations) / iterations
+                loads_time = timeit.timeit(loads, number=iterations) / iterations
+                self.stdout.write(
+                    f"{payload_name:<24}{codec_name:<24}{len(encoded_payload):>10}"
+                    f"{dumps_time * 1_000_000:>12.1f}{loads_time * 1_000_000:>12.1f}"
+                )
+
+    def get_codecs(self, compress_min_length):
+        options = {"COMPRESS_MIN_LENGTH": compress_min_length}
+        return {
+            "pickle": (PickleSerializer(options), IdentityCompressor(options)),
+            "pickle+zstd": (PickleSerializer(options), ZstdCompressor(options)),
+            "orjson": (
+                CompactSerializer({**options, "COMPACT_CODEC": "orjson"}),
+                IdentityCompressor(options),
+            ),
+            "orjson+zstd": (
+                CompactSerializer({**options, "COMPACT_CODEC": "orjson"}),
+                ZstdCompressor(options),
+            ),
+            "msgpack+zstd": (
+                CompactSerializer({**options, "COMPACT_CODEC": "msgpack"}),
+                ZstdCompressor(options),
+            ),
+        }
+
+    def get_payloads(self):
+        products = Product.objects.prefetch_related(
+            "items",
+            "media_files",
+            "items__configuration__attribute",
+        )
+        product = products.annotate(items_count=Count("items")).order_by("-items_count")
+        product = product.first()
+        if product is None:
+            raise CommandError("At least one product is needed to build the payloads")
+
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+        request = Request(APIRequestFactory().get("/", HTTP_HOST=host))
+        request.user = AnonymousUser()
+        context = {"request": request}
+
+        page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 10
+        page = ProductListing.objects.visible_products()[:page_size]
+
+        return {
+            "product instance": product,
+            "product detail": ProductDetailSerializer(product, context=context).data,
+            "product list page": ProductListingSerializer(
+                page, many=True, context=context
+            ).data,
+        }
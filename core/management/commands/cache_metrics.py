@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from core.cache_metrics import cache_metrics
+
+
+class Command(BaseCommand):
+    help = "Show cache hits, misses, fill latency, payload size and invalidations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete the collected metrics after showing them",
+        )
+
+    def handle(self, *args, **options):
+        metrics = cache_metrics.read()
+
+        header = (
+            f"{'family':<32}{'hits':>10}{'misses':>10}{'hit rate':>10}"
+            f"{'fill ms':>10}{'fill bytes':>12}{'invalidations':>15}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for family, values in metrics.items():
+            hit_rate = values["hit_rate"]
+            avg_fill_time_ms = values["avg_fill_time_ms"]
+            avg_fill_bytes = values["avg_fill_bytes"]
+            self.stdout.write(
+                f"{family:<32}"
+                f"{values['hits']:>10.0f}"
+                f"{values['misses']:>10.0f}"
+                f"{'-' if hit_rate is None else f'{hit_rate:.1%}':>10}"
+                f"{'-' if avg_fill_time_ms is None else f'{avg_fill_time_ms:.1f}':>10}"
+                f"{'-' if avg_fill_bytes is None else f'{avg_fill_bytes:.0f}':>12}"
+                f"{values['invalidations']:>15.0f}"
+            )
+
+        if options["reset"]:
+            cache_metrics.reset()
+            self.stdout.write(self.style.SUCCESS("Cache metrics were reset"))
@@ -0,0 +1,181 @@
+import math
+import multiprocessing
+import os
+from collections import Counter
+from urllib.parse import urlencode
+
+from django import db
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from brands.models import Brand
+from categories.models import Category
+from products.models import Product
+
+
+def warm_paths(paths, host, secure):
+    client = Client()
+    status_codes = Counter()
+    for path in paths:
+        response = client.get(path, HTTP_HOST=host, secure=secure)
+        status_codes[response.status_code] += 1
+    return status_codes
+
+
+def warm_paths_in_worker(arguments):
+    return warm_paths(*arguments)
+
+
+class Command(BaseCommand):
+    help = "Fill the catalog cache keys by replaying anonymous GET requests"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=None,
+            help="Only warm the detail pages of the top N products",
+        )
+        parser.add_argument(
+            "--order-by",
+            choices=("views_count", "sold_count"),
+            default="views_count",
+            help="Field used to pick the top products",
+        )
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=1,
+            help="Number of list pages to warm for every product list",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes",
+        )
+        parser.add_argument(
+            "--host",
+            default=(
+                settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+            ),
+            help="Host used to build the absolute urls stored in the cache",
+        )
+        parser.add_argument(
+            "--secure",
+            action="store_true",
+            help="Warm the https variant of the cached responses",
+        )
+
+    def handle(self, *args, **options):
+        paths = self.get_paths(options)
+        workers = max(1, min(options["workers"], len(paths)))
+        chunk_size = math.ceil(len(paths) / (workers * 4)) or 1
+        chunks = [
+            (paths[index : index + chunk_size], options["host"], options["secure"])
+            for index in range(0, len(paths), chunk_size)
+        ]
+
+        self.stdout.write(f"Warming {len(paths)} urls with {workers} workers")
+
+        status_codes = Counter()
+        if workers == 1:
+            for chunk in chunks:
+                status_codes.update(warm_paths_in_worker(chunk))
+        else:
+            db.connections.close_all()
+            with multiprocessing.Pool(processes=workers) as pool:
+                for result in pool.imap_unordered(warm_paths_in_worker, chunks):
+                    status_codes.update(result)
+
+        for status_code, count in sorted(status_codes.items()):
+            self.stdout.write(f"{status_code}: {count}")
+
+        if set(status_codes) - {200}:
+            self.stdout.write(self.style.WARNING("Some urls could not be warmed"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Cache was warmed"))
+
+    def get_paths(self, options):
+        visible_products = Product.objects.visible_products()
+        category_products_counts = dict(
+            visible_products.order_by()
+            .values("category")
+            .annotate(count=Count("id"))
+            .values_list("category", "count")
+        )
+        brand_products_counts = dict(
+            visible_products.order_by()
+            .values("brand__url")
+            .annotate(count=Count("id"))
+            .values_list("brand__url", "count")
+        )
+
+        paths = [reverse(viewname="categories:category_list_create")]
+        paths.extend(
+            self.get_page_paths(
+                reverse(viewname="brands:brand_list_create"),
+                items_count=Brand.objects.count(),
+            )
+        )
+        paths.extend(
+            self.get_page_paths(
+                reverse(viewname="products:product_list_create"),
+                items_count=visible_products.count(),
+                max_pages=options["pages"],
+            )
+        )
+
+        for category_id in Category.objects.values_list("id", flat=True).iterator():
+            kwargs = {"category_id": category_id}
+            paths.append(
+                reverse(
+                    viewname="categories:category_detail_update_delete", kwargs=kwargs
+                )
+            )
+            paths.extend(
+                self.get_page_paths(
+                    reverse(viewname="categories:category_products", kwargs=kwargs),
+                    items_count=category_products_counts.get(category_id, 0),
+                    max_pages=options["pages"],
+                )
+            )
+
+        for brand_url in Brand.objects.values_list("url", flat=True).iterator():
+            kwargs = {"brand_url": brand_url}
+            paths.append(
+                reverse(viewname="brands:brand_detail_update_delete", kwargs=kwargs)
+            )
+            paths.extend(
+                self.get_page_paths(
+                    reverse(viewname="brands:brand_products", kwargs=kwargs),
+                    items_count=brand_products_counts.get(brand_url, 0),
+                    max_pages=options["pages"],
+                )
+            )
+
+        products = visible_products.order_by(f"-{options['order_by']}")
+        if options["top"] is not None:
+            products = products[: options["top"]]
+        for category_id, product_url in products.values_list("category_id", "url"):
+            paths.append(
+                reverse(
+                    viewname="products:product_detail_update_delete",
+                    kwargs={"category_id": category_id, "product_url": product_url},
+                )
+            )
+
+        return paths
+
+    def get_page_paths(self, path, items_count, max_pages=None):
+        page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or items_count or 1
+        pages_count = max(1, math.ceil(items_count / page_size))
+        if max_pages is not None:
+            pages_count = min(pages_count, max_pages)
+
+        yield path
+        for page in range(2, pages_count + 1):
+            yield f"{path}?{urlencode({'page': page})}"
@@ -0,0 +1,29 @@
+class CounterFieldsModelMixin:
+    counter_fields = ()
+
+    def get_save_update_fields(self):
+        deferred_fields = self.get_deferred_fields()
+        unchanged_fields = {
+            field_name
+            for field_name in self.counter_fields
+            if field_name not in deferred_fields and not self.has_changed(field_name)
+        }
+        if not unchanged_fields:
+            return None
+
+        return [
+            field.attname
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname not in unchanged_fields | deferred_fields
+        ]
+
+    def save(self, *args, **kwargs):
+        if (
+            not args
+            and not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = self.get_save_update_fields()
+        super().save(*args, **kwargs)
@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import F, OrderBy, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def get_ordering_value(object, field_name):
+    value = object
+    for attribute in field_name.split("__"):
+        value = getattr(value, attribute, None)
+        if value is None:
+            return None
+    return value
+
+
+def is_nullable(model, field_name) -> bool:
+    for attribute in field_name.split("__"):
+        try:
+            field = model._meta.get_field(attribute)
+        except FieldDoesNotExist:
+            return attribute != "pk"
+        if field.null:
+            return True
+        model = field.related_model
+    return False
+
+
+class CursorPageNumberPagination(PageNumberPagination):
+    pagination_query_param = "pagination"
+    cursor_pagination = "cursor"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        pagination = request.query_params.get(self.pagination_query_param)
+        self.use_cursor = pagination == self.cursor_pagination
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.ordering = self.get_ordering(queryset)
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor["reverse"]
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+
+        if cursor is None:
+            objects = list(queryset[: self.page_size + 1])
+        else:
+            objects = self.get_objects_after(queryset, cursor["values"], reverse)
+
+        has_more = len(objects) > self.page_size
+        self.page = objects[: self.page_size]
+        if reverse:
+            self.page.reverse()
+        self.has_next = cursor is not None if reverse else has_more
+        self.has_previous = has_more if reverse else cursor is not None
+        return self.page
+
+    def get_ordering(self, queryset) -> list:
+        ordering = []
+        for field_name in queryset.query.order_by or queryset.model._meta.ordering:
+            if isinstance(field_name, OrderBy) and isinstance(field_name.expression, F):
+                ordering.append((field_name.expression.name, field_name.descending))
+                continue
+            if not isinstance(field_name, str) or field_name == "?":
+                raise ImproperlyConfigured(
+                    f"Cursor pagination cannot order by {field_name!r}"
+                )
+            ordering.append((field_name.lstrip("-"), field_name.startswith("-")))
+
+        if not any(field_name in ("id", "pk") for field_name, _ in ordering):
+            ordering.append(("pk", True))
+        self.nullable_fields = {
+            field_name
+            for field_name, _ in ordering
+            if is_nullable(queryset.model, field_name)
+        }
+        return ordering
+
+    def get_order_by(self, reverse) -> list:
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        order_by = []
+        for field_name, descending in self.ordering:
+            field_nulls = nulls if field_name in self.nullable_fields else {}
+            if descending != reverse:
+                order_by.append(F(field_name).desc(**field_nulls))
+            else:
+                order_by.append(F(field_name).asc(**field_nulls))
+        return order_by
+
+    def get_after_filter(self, field_name, descending, value, nulls_first):
+        if value is None:
+            return Q(**{f"{field_name}__isnull": False}) if nulls_first else None
+
+        lookup = "lt" if descending else "gt"
+        after_filter = Q(**{f"{field_name}__{lookup}": value})
+        if not nulls_first and field_name in self.nullable_fields:
+            after_filter |= Q(**{f"{field_name}__isnull": True})
+        return after_filter
+
+    def get_objects_after(self, queryset, values, reverse) -> list:
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        equal_filters = []
+        for (field_name, _), value in zip(self.ordering, values):
+            if value is None:
+                equal_filters.append(Q(**{f"{field_name}__isnull": True}))
+            else:
+                equal_filters.append(Q(**{field_name: value}))
+
+        objects = []
+        for index in reversed(range(len(self.ordering))):
+            field_name, descending = self.ordering[index]
+            after_filter = self.get_after_filter(
+                field_name, descending != reverse, values[index], nulls_first=reverse
+            )
+            if after_filter is None:
+                continue
+
+            branch = queryset.filter(*equal_filters[:index], after_filter)
+            objects.extend(branch[: self.page_size + 1 - len(objects)])
+            if len(objects) > self.page_size:
+                break
+        return objects
+
+    def decode_cursor(self, request):
+        encoded_cursor = request.query_params.get(self.cursor_query_param)
+        if not encoded_cursor:
+            return None
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded_cursor.encode()))
+            return {"reverse": bool(cursor["r"]), "values": list(cursor["v"])}
+        except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, object, reverse) -> str:
+        values = [
+            get_ordering_value(object, field_name) for field_name, _ in self.ordering
+        ]
+        cursor = json.dumps(
+            {"r": int(reverse), "v": values}, default=encode_cursor_value
+        )
+        encoded_cursor = base64.urlsafe_b64encode(cursor.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded_cursor)
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+
+        return Response(
+            OrderedDict(
+                (
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                )
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"][
+            "description"
+        ] = f"Omitted when {self.pagination_query_param}={self.cursor_pagination}"
+        return response_schema
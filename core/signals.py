@@ -0,0 +1,10 @@
+from django.core.signals import request_finished, request_started
+from django.dispatch import receiver
+
+from .utils import reset_pending_invalidations
+
+
+@receiver(signal=request_started)
+@receiver(signal=request_finished)
+def discard_pending_invalidations(**kwargs):
+    reset_pending_invalidations()
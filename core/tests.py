@@ -1,3 +1,90 @@
-from django.test import TestCase
+from unittest import SkipTest, mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+from django.utils.safestring import SafeString
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from . import cache_key_schema
+from .cache_codecs import CODECS, PICKLE_TAG, CompactSerializer
+from .cache_metrics import CacheMetrics
+from .utils import get_cached_entry, invalidate_tags
+
+
+def is_redis_available() -> bool:
+    try:
+        return bool(get_redis_connection("default").ping())
+    except (RedisError, NotImplementedError):
+        return False
+
+
+class RedisTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if not is_redis_available():
+            raise SkipTest("Redis is not available")
+        super().setUpClass()
+
+    def setUp(self):
+        for cache_alias in ("default", "local", "fallback"):
+            caches[cache_alias].clear()
+
+
+class TagInvalidationTests(RedisTestCase):
+    def get_cached_value(self):
+        cached_object = get_cached_entry(
+            get_object_function=lambda: next(self.values),
+            cache_key="tests:tagged",
+            get_tags_function=lambda value: (cache_key_schema.products_tag(),),
+        )
+        return cached_object.value
+
+    def test_tags_are_invalidated_on_commit(self):
+        self.values = iter((1, 2))
+        self.assertEqual(self.get_cached_value(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_tags(cache_key_schema.products_tag())
+            self.assertEqual(self.get_cached_value(), 1)
+
+        self.assertEqual(self.get_cached_value(), 2)
+        self.assertEqual(self.get_cached_value(), 2)
+
+    def test_other_tags_keep_entry_fresh(self):
+        self.values = iter((1, 2))
+        self.assertEqual(self.get_cached_value(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_tags(cache_key_schema.search_tag())
+
+        self.assertEqual(self.get_cached_value(), 1)
+
+
+class CompactSerializerTests(SimpleTestCase):
+    def test_str_subclasses_are_not_pickled(self):
+        value = {"title": SafeString("<b>title</b>"), "tags": [SafeString("new")]}
+
+        for codec_name, codec in CODECS.items():
+            serializer = CompactSerializer({"COMPACT_CODEC": codec_name})
+            payload = serializer.dumps(value)
+
+            self.assertEqual(payload[:1], codec.tag)
+            self.assertNotEqual(payload[:1], PICKLE_TAG)
+            self.assertEqual(serializer.loads(payload), value)
+
+
+class CacheMetricsTests(SimpleTestCase):
+    def test_fill_size_is_sampled(self):
+        metrics = CacheMetrics(flush_interval=3600, size_sample_rate=0)
+        cache_key = cache_key_schema.products_tag()
+        family = cache_key_schema.key_family(cache_key)
+
+        with mock.patch.object(metrics, "get_payload_size") as get_payload_size:
+            metrics.record_fill(cache_key, fill_time=0.5, value={"id": 1})
+            metrics.record_fill(cache_key, fill_time=0.5, size=120)
+
+        get_payload_size.assert_not_called()
+        self.assertEqual(metrics.counters[family]["fills"], 2)
+        self.assertEqual(metrics.counters[family]["sized_fills"], 1)
+        self.assertEqual(metrics.counters[family]["fill_bytes"], 120)
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import views
+
+app_name = "core"
+urlpatterns = [
+    path(
+        route="cache-metrics/",
+        view=views.CacheMetrics.as_view(),
+        name="cache_metrics",
+    ),
+]
@@ -1,19 +1,414 @@
-from django.core.cache import cache
+import hashlib
+import logging
+import math
+import random
+import threading
+import time
+from collections import namedtuple
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.connection import ConnectionProxy
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_page
+from django_redis import get_redis_connection
+from redis.exceptions import LockError, RedisError
+
+from . import cache_key_schema
+from .cache_metrics import cache_metrics
+from .cdn import add_surrogate_keys, purge_cdn_tags
+
+logger = logging.getLogger(__name__)
+
+NAMESPACED_CACHE_TIMEOUT = 60 * 60 * 24
+CACHE_FILL_LOCK_TIMEOUT = 10
+CACHE_FILL_WAIT_TIMEOUT = 1
+CACHE_FILL_POLL_INTERVAL = 0.05
+EARLY_REFRESH_BETA = 1.0
+
+tiered_cache = ConnectionProxy(caches, "tiered")
+pending_invalidations = threading.local()
+
+CachedObject = namedtuple(
+    "CachedObject",
+    ("value", "delta", "expiry", "tags", "clock"),
+    defaults=((), None),
+)
+
+INVALIDATE_TAGS_SCRIPT = """
+local clock = tonumber(redis.call("GET", KEYS[1]) or 0) + 1
+local version = math.max(clock, tonumber(ARGV[1]))
+for index = 1, #KEYS do
+    redis.call("SET", KEYS[index], version)
+end
+return version
+"""
 
 
 def get_cached_queryset(queryset, cache_key, timeout=None):
-    cached_queryset = cache.get_or_set(key=cache_key, default=queryset, timeout=timeout)
-    return cached_queryset
+    cached_queryset = cache.get(key=cache_key)
+    if cached_queryset is not None:
+        cache_metrics.record_hit(cache_key)
+        return cached_queryset
+
+    cache_metrics.record_miss(cache_key)
+    start_time = time.monotonic()
+    cache.set(key=cache_key, value=queryset, timeout=timeout)
+    cache_metrics.record_fill(
+        cache_key, fill_time=time.monotonic() - start_time, value=queryset
+    )
+    return queryset
+
+
+def load_cached_object(value):
+    if isinstance(value, dict) and value.keys() == set(CachedObject._fields):
+        return CachedObject(**value)
+    return None
+
+
+def get_fresh_cached_object(cache_key, cache_backend=cache):
+    cached_object = load_cached_object(cache_backend.get(key=cache_key))
+    if cached_object is None:
+        return None
+    if not tags_are_fresh(cached_object.tags, cached_object.clock):
+        return None
+    return cached_object
 
 
-def get_cached_object(get_object_function, cache_key, timeout=None):
-    cached_object = cache.get(key=cache_key)
+def get_cached_object(
+    get_object_function, cache_key, timeout=None, get_tags_function=None
+):
+    cached_object = get_cached_entry(
+        get_object_function, cache_key, timeout, get_tags_function
+    )
+    return cached_object.value
+
+
+def get_cached_entry(
+    get_object_function, cache_key, timeout=None, get_tags_function=None
+) -> CachedObject:
+    cached_object = get_fresh_cached_object(cache_key)
     if cached_object is None:
-        object = get_object_function()
-        cached_object = cache.get_or_set(key=cache_key, default=object, timeout=timeout)
+        cache_metrics.record_miss(cache_key)
+        return fill_cached_object(
+            get_object_function, cache_key, timeout, get_tags_function
+        )
+
+    cache_metrics.record_hit(cache_key)
+    if should_refresh_early(cached_object):
+        return fill_cached_object(
+            get_object_function,
+            cache_key,
+            timeout,
+            get_tags_function,
+            stale_object=cached_object,
+        )
     return cached_object
 
 
+def should_refresh_early(cached_object, beta=EARLY_REFRESH_BETA) -> bool:
+    if cached_object.expiry is None:
+        return False
+    jitter = cached_object.delta * beta * -math.log(1 - random.random())
+    return time.time() + jitter >= cached_object.expiry
+
+
+def compute_cached_object(get_object_function) -> CachedObject:
+    return CachedObject(value=get_object_function(), delta=0, expiry=None)
+
+
+def fill_cached_object(
+    get_object_function, cache_key, timeout, get_tags_function=None, stale_object=None
+) -> CachedObject:
+    try:
+        lock = cache.lock(
+            cache_key_schema.cache_fill_lock(cache_key),
+            timeout=CACHE_FILL_LOCK_TIMEOUT,
+        )
+        acquired = lock.acquire(blocking=False)
+    except RedisError:
+        return compute_cached_object(get_object_function)
+
+    if acquired:
+        try:
+            clock = get_tags_clock()
+            start_time = time.monotonic()
+            object = get_object_function()
+            delta = time.monotonic() - start_time
+            expiry = time.time() + timeout if timeout is not None else None
+            tags, clock = register_tags(
+                get_tags_function(object) if get_tags_function else (), clock
+            )
+            cached_object = CachedObject(
+                value=object, delta=delta, expiry=expiry, tags=tags, clock=clock
+            )
+            cache.set(key=cache_key, value=cached_object._asdict(), timeout=timeout)
+            cache_metrics.record_fill(cache_key, fill_time=delta, value=object)
+            return cached_object
+        finally:
+            try:
+                lock.release()
+            except (LockError, RedisError):
+                pass
+
+    if stale_object is not None:
+        return stale_object
+
+    deadline = time.monotonic() + CACHE_FILL_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(CACHE_FILL_POLL_INTERVAL)
+        cached_object = get_fresh_cached_object(cache_key)
+        if cached_object is not None:
+            return cached_object
+
+    return compute_cached_object(get_object_function)
+
+
+def get_query_fingerprint(request, param_names, default_params=None) -> str:
+    default_params = default_params or {}
+    canonical_params = []
+
+    for param_name in sorted(set(param_names)):
+        values = (value.strip() for value in request.query_params.getlist(param_name))
+        values = [value for value in values if value]
+        if values == [default_params.get(param_name)]:
+            continue
+        canonical_params.extend((param_name, value) for value in values)
+
+    fingerprint_source = "{scheme}://{host}?{query}".format(
+        scheme=request.scheme,
+        host=request.get_host(),
+        query=urlencode(canonical_params),
+    )
+    return hashlib.md5(fingerprint_source.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_initial_generation() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def get_namespace_generations(*namespaces) -> list:
+    keys = [
+        cache_key_schema.namespace_generation(namespace) for namespace in namespaces
+    ]
+    generations = tiered_cache.get_many(keys=keys)
+
+    missing_keys = [key for key in keys if key not in generations]
+    if missing_keys:
+        for key in missing_keys:
+            tiered_cache.add(key=key, value=get_initial_generation(), timeout=None)
+        generations.update(tiered_cache.get_many(keys=missing_keys))
+
+    return [generations.get(key, 0) for key in keys]
+
+
+def register_tags(tags, clock) -> tuple:
+    tags = sorted(set(tags))
+    keys = [cache_key_schema.cache_tag_version(tag) for tag in tags]
+    versions = tiered_cache.get_many(keys=keys)
+
+    missing_keys = [key for key in keys if key not in versions]
+    if not missing_keys:
+        return tags, clock
+
+    try:
+        set_tag_versions(*missing_keys)
+    except (RedisError, NotImplementedError) as error:
+        logger.warning("Could not set cache tag versions: %s", error)
+        return tags, clock
+
+    registered_clock = get_tags_clock()
+    versions = tiered_cache.get_many(keys=list(versions))
+    if all(version <= (clock or 0) for version in versions.values()):
+        return tags, registered_clock
+    return tags, clock
+
+
+def get_tags_clock():
+    return cache.get(key=cache_key_schema.cache_tags_clock())
+
+
+def get_tag_versions(*tags) -> dict:
+    keys = {cache_key_schema.cache_tag_version(tag): tag for tag in tags}
+    versions = tiered_cache.get_many(keys=list(keys))
+
+    missing_keys = [key for key in keys if key not in versions]
+    if missing_keys:
+        try:
+            set_tag_versions(*missing_keys)
+        except (RedisError, NotImplementedError) as error:
+            logger.warning("Could not set cache tag versions: %s", error)
+        versions.update(tiered_cache.get_many(keys=missing_keys))
+
+    return {tag: versions.get(key) for key, tag in keys.items()}
+
+
+def tags_are_fresh(tags, clock) -> bool:
+    if not tags:
+        return True
+    if clock is None:
+        return False
+
+    versions = get_tag_versions(*tags).values()
+    return all(version is not None and version <= clock for version in versions)
+
+
+def set_tag_versions(*keys, client=None):
+    keys = [cache_key_schema.cache_tags_clock(), *keys]
+    connection = get_redis_connection("default")
+    invalidate_tags_script = connection.register_script(INVALIDATE_TAGS_SCRIPT)
+    invalidate_tags_script(
+        keys=[cache.make_key(key) for key in keys],
+        args=[get_initial_generation()],
+        client=client,
+    )
+
+
+def get_pending_invalidations():
+    if not hasattr(pending_invalidations, "keys"):
+        reset_pending_invalidations()
+    return pending_invalidations
+
+
+def reset_pending_invalidations():
+    pending_invalidations.keys = set()
+    pending_invalidations.namespaces = set()
+    pending_invalidations.tags = set()
+
+
+def invalidate_keys(*keys):
+    get_pending_invalidations().keys.update(keys)
+    transaction.on_commit(flush_pending_invalidations)
+
+
+def invalidate_namespace(*namespaces):
+    get_pending_invalidations().namespaces.update(namespaces)
+    transaction.on_commit(flush_pending_invalidations)
+
+
+def invalidate_tags(*tags):
+    get_pending_invalidations().tags.update(tags)
+    transaction.on_commit(flush_pending_invalidations)
+
+
+def flush_pending_invalidations():
+    pending = get_pending_invalidations()
+    keys, namespaces, tags = pending.keys, pending.namespaces, pending.tags
+    reset_pending_invalidations()
+
+    namespace_keys = [
+        cache_key_schema.namespace_generation(namespace)
+        for namespace in sorted(namespaces)
+    ]
+    tag_keys = [cache_key_schema.cache_tag_version(tag) for tag in sorted(tags)]
+    if not (keys or namespace_keys or tag_keys):
+        return
+
+    try:
+        pipeline = get_redis_connection("default").pipeline(transaction=False)
+        if keys:
+            pipeline.delete(*(cache.make_key(key) for key in sorted(keys)))
+        if namespace_keys or tag_keys:
+            set_tag_versions(*namespace_keys, *tag_keys, client=pipeline)
+        pipeline.execute()
+    except (RedisError, NotImplementedError) as error:
+        logger.warning("Could not invalidate cache entries: %s", error)
+
+    if namespace_keys or tag_keys:
+        tiered_cache.invalidate_local([*namespace_keys, *tag_keys])
+        purge_cdn_tags(*namespaces, *tags)
+    cache_metrics.record_invalidation(*keys, *namespace_keys, *tag_keys)
+
+
+def get_cache_validators(cache_key, versions):
+    if not versions or None in versions:
+        return None, None
+
+    etag_source = ":".join((cache_key, *map(str, versions)))
+    etag = hashlib.md5(etag_source.encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(etag), max(versions) // 1000
+
+
+def get_cached_object_validators(cache_key, cached_object):
+    if not cached_object.tags:
+        return None, None
+    versions = get_tag_versions(*cached_object.tags)
+    return get_cache_validators(
+        cache_key, [versions[tag] for tag in cached_object.tags]
+    )
+
+
+def get_conditional_cached_response(request, etag, last_modified, response=None):
+    if etag is None and last_modified is None:
+        return response
+    if response is not None and not 200 <= response.status_code < 300:
+        return response
+
+    conditional_response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response
+    )
+    if conditional_response is None:
+        return None
+
+    if request.method in ("GET", "HEAD"):
+        if last_modified and not conditional_response.has_header("Last-Modified"):
+            conditional_response.headers["Last-Modified"] = http_date(last_modified)
+        if etag:
+            conditional_response.headers.setdefault("ETag", etag)
+    return conditional_response
+
+
+def namespaced_cache_page(key_prefix, namespaces, timeout=NAMESPACED_CACHE_TIMEOUT):
+    def decorator(view_function):
+        @wraps(view_function)
+        def wrapper(request, *args, **kwargs):
+            generations = get_namespace_generations(*namespaces)
+            generation = ".".join(map(str, generations))
+            namespaced_key_prefix = f"{key_prefix}:{generation}"
+
+            etag, last_modified = get_cache_validators(
+                f"{key_prefix}:{request.build_absolute_uri()}", generations
+            )
+            not_modified_response = get_conditional_cached_response(
+                request, etag, last_modified
+            )
+            if not_modified_response is not None:
+                cache_metrics.record_hit(namespaced_key_prefix)
+                return add_surrogate_keys(request, not_modified_response, namespaces)
+
+            cached_view_function = cache_page(
+                timeout, cache="tiered", key_prefix=namespaced_key_prefix
+            )(view_function)
+
+            start_time = time.monotonic()
+            response = cached_view_function(request, *args, **kwargs)
+            fill_time = time.monotonic() - start_time
+
+            if not getattr(request, "_cache_update_cache", False):
+                cache_metrics.record_hit(namespaced_key_prefix)
+            else:
+                cache_metrics.record_miss(namespaced_key_prefix)
+                if hasattr(response, "add_post_render_callback"):
+                    response.add_post_render_callback(
+                        lambda rendered_response: cache_metrics.record_fill(
+                            namespaced_key_prefix,
+                            fill_time=fill_time,
+                            size=len(rendered_response.content),
+                        )
+                    )
+            response = get_conditional_cached_response(
+                request, etag, last_modified, response
+            )
+            return add_surrogate_keys(request, response, namespaces)
+
+        return wrapper
+
+    return decorator
+
+
 def brand_directory_path(brand, filename) -> str:
     brand_name = brand.url.replace("-", " ").strip()
     return f"brands/{brand_name}/{filename}"
@@ -0,0 +1,120 @@
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .cache_metrics import cache_metrics
+from .cdn import add_surrogate_keys
+from .utils import (
+    NAMESPACED_CACHE_TIMEOUT,
+    CachedObject,
+    get_cached_object_validators,
+    get_conditional_cached_response,
+    get_fresh_cached_object,
+    get_query_fingerprint,
+    get_tags_clock,
+    register_tags,
+    tiered_cache,
+)
+
+
+class CachedListAPIViewMixin:
+    list_cache_timeout = NAMESPACED_CACHE_TIMEOUT
+    list_cache_params = ()
+    list_cache_kwargs = ()
+    all_list_cache_key = None
+    visible_list_cache_key = None
+
+    def get_list_cache_args(self) -> list:
+        return [self.kwargs[kwarg] for kwarg in self.list_cache_kwargs]
+
+    def get_list_cache_key(self, fingerprint):
+        if self.request.user.is_staff:
+            key_function = self.all_list_cache_key
+        else:
+            key_function = self.visible_list_cache_key
+
+        if key_function is None:
+            raise ImproperlyConfigured(
+                f"{self.__class__.__name__} is missing a list cache key. Define "
+                f"{self.__class__.__name__}.all_list_cache_key and "
+                f"{self.__class__.__name__}.visible_list_cache_key, or override "
+                f"{self.__class__.__name__}.get_list_cache_key()."
+            )
+        return key_function(*self.get_list_cache_args(), fingerprint)
+
+    def get_list_cache_tags(self, objects):
+        tags = []
+        for obj in objects:
+            tags.extend(obj.get_cache_tags())
+        return tags
+
+    def get_list_cache_params(self):
+        param_names = [
+            api_settings.SEARCH_PARAM,
+            api_settings.ORDERING_PARAM,
+            *getattr(self, "filterset_fields", ()),
+            *self.list_cache_params,
+        ]
+        default_params = {}
+
+        paginator = self.paginator
+        if paginator is not None:
+            page_query_param = getattr(paginator, "page_query_param", None)
+            page_size_query_param = getattr(paginator, "page_size_query_param", None)
+            if page_query_param:
+                param_names.append(page_query_param)
+                default_params[page_query_param] = "1"
+            if page_size_query_param:
+                param_names.append(page_size_query_param)
+            for param_name in ("pagination_query_param", "cursor_query_param"):
+                if getattr(paginator, param_name, None):
+                    param_names.append(getattr(paginator, param_name))
+
+        return param_names, default_params
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self.list_cache_objects = queryset if page is None else page
+        return page
+
+    def list(self, request, *args, **kwargs):
+        param_names, default_params = self.get_list_cache_params()
+        fingerprint = get_query_fingerprint(request, param_names, default_params)
+        cache_key = self.get_list_cache_key(fingerprint)
+
+        cached_page = get_fresh_cached_object(cache_key, cache_backend=tiered_cache)
+        if cached_page is not None:
+            cache_metrics.record_hit(cache_key)
+            etag, last_modified = get_cached_object_validators(cache_key, cached_page)
+            response = get_conditional_cached_response(
+                request, etag, last_modified, Response(data=cached_page.value)
+            )
+            return add_surrogate_keys(request, response, cached_page.tags)
+
+        cache_metrics.record_miss(cache_key)
+        clock = get_tags_clock()
+        start_time = time.monotonic()
+        response = super().list(request, *args, **kwargs)
+        fill_time = time.monotonic() - start_time
+        tags, clock = register_tags(
+            self.get_list_cache_tags(self.list_cache_objects), clock
+        )
+        cached_page = CachedObject(
+            value=response.data,
+            delta=fill_time,
+            expiry=None,
+            tags=tags,
+            clock=clock,
+        )
+        tiered_cache.set(
+            key=cache_key, value=cached_page._asdict(), timeout=self.list_cache_timeout
+        )
+        cache_metrics.record_fill(cache_key, fill_time=fill_time, value=response.data)
+
+        etag, last_modified = get_cached_object_validators(cache_key, cached_page)
+        response = get_conditional_cached_response(
+            request, etag, last_modified, response
+        )
+        return add_surrogate_keys(request, response, cached_page.tags)
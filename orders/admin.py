@@ -12,5 +12,8 @@ admin.site.register(
         models.OrderStatus,
         models.PaymentMethod,
         models.ShippingMethod,
+        models.Reservation,
+        models.ReservationItem,
+        models.RecordedSale,
     )
 )
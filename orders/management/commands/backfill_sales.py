@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import cache_key_schema
+from core.utils import invalidate_tags
+from orders.models import Order, RecordedSale
+from orders.sales import SALES_BATCH_SIZE, SOLD_ORDER_STATUSES, record_sales
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Record sold counts and purchased products of past paid orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SALES_BATCH_SIZE,
+            help="Number of orders recorded together",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Zero every sold count and record all paid orders again",
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            with transaction.atomic():
+                products = Product.objects.exclude(sold_count=0)
+                product_ids = list(products.values_list("id", flat=True))
+                products.update(sold_count=0)
+                invalidate_tags(*map(cache_key_schema.product_tag, product_ids))
+                RecordedSale.objects.all().delete()
+
+        orders = Order.objects.filter(
+            recorded_sale=None, status__status__in=SOLD_ORDER_STATUSES
+        ).order_by("id")
+        last_order_id, recorded_orders, batches = 0, 0, 0
+
+        while True:
+            order_ids = list(
+                orders.filter(id__gt=last_order_id).values_list("id", flat=True)[
+                    : options["batch_size"]
+                ]
+            )
+            if not order_ids:
+                break
+
+            recorded_orders += record_sales(order_ids)
+            last_order_id = order_ids[-1]
+            batches += 1
+
+        self.stdout.write(f"{'batches':<20}{batches:>10}")
+        self.stdout.write(f"{'recorded orders':<20}{recorded_orders:>10}")
+        self.stdout.write(self.style.SUCCESS("Sales backfilled"))
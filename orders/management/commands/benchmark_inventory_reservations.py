@@ -0,0 +1,154 @@
+import multiprocessing
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+
+from orders.models import Reservation
+from orders.reservations import InsufficientInventory, reserve
+from products.models import ProductItem
+
+
+def run_reservations(cart, attempts):
+    connections.close_all()
+    reservation_ids, latencies = [], []
+    insufficient_count = error_count = 0
+
+    for _ in range(attempts):
+        start_time = time.perf_counter()
+        try:
+            reservation_ids.append(reserve(cart).id)
+        except InsufficientInventory:
+            insufficient_count += 1
+        except DatabaseError:
+            error_count += 1
+        latencies.append(time.perf_counter() - start_time)
+
+    connections.close_all()
+    return reservation_ids, insufficient_count, error_count, latencies
+
+
+class Command(BaseCommand):
+    help = "Measure concurrent checkout reservations against the same items"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=8,
+            help="Number of processes reserving at the same time",
+        )
+        parser.add_argument(
+            "--attempts",
+            type=int,
+            default=200,
+            help="Number of reservations attempted by every process",
+        )
+        parser.add_argument(
+            "--items",
+            type=int,
+            default=1,
+            help="Number of product items in every cart",
+        )
+        parser.add_argument(
+            "--quantity",
+            type=int,
+            default=1,
+            help="Quantity of every product item in the cart",
+        )
+        parser.add_argument(
+            "--inventory",
+            type=int,
+            default=1000,
+            help="Inventory given to every product item before the run",
+        )
+
+    def handle(self, *args, **options):
+        product_items = list(ProductItem.objects.order_by("id")[: options["items"]])
+        if not product_items:
+            raise CommandError("At least one product item is needed for the benchmark")
+
+        original_inventories = {item.id: item.inventory for item in product_items}
+        cart = [(item.id, options["quantity"]) for item in product_items]
+        ProductItem.objects.filter(id__in=original_inventories).update(
+            inventory=options["inventory"]
+        )
+
+        processes, attempts = options["processes"], options["attempts"]
+        connections.close_all()
+        start_time = time.perf_counter()
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            results = pool.starmap(run_reservations, [(cart, attempts)] * processes)
+        elapsed_time = time.perf_counter() - start_time
+
+        reservation_ids = [id for result in results for id in result[0]]
+        insufficient_count = sum(result[1] for result in results)
+        error_count = sum(result[2] for result in results)
+        latencies = sorted(latency for result in results for latency in result[3])
+        final_inventories = dict(
+            ProductItem.objects.filter(id__in=original_inventories).values_list(
+                "id", "inventory"
+            )
+        )
+
+        try:
+            self.write_report(
+                options,
+                elapsed_time,
+                reservation_ids,
+                insufficient_count,
+                error_count,
+                latencies,
+                final_inventories,
+            )
+        finally:
+            Reservation.objects.filter(id__in=reservation_ids).delete()
+            for product_item_id, inventory in original_inventories.items():
+                ProductItem.objects.filter(id=product_item_id).update(
+                    inventory=inventory
+                )
+
+    def write_report(
+        self,
+        options,
+        elapsed_time,
+        reservation_ids,
+        insufficient_count,
+        error_count,
+        latencies,
+        final_inventories,
+    ):
+        total_attempts = options["processes"] * options["attempts"]
+        reserved_quantity = len(reservation_ids) * options["quantity"]
+        percentiles = (
+            statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+        )
+
+        self.stdout.write(f"{'attempts':<24}{total_attempts:>12}")
+        self.stdout.write(f"{'reserved':<24}{len(reservation_ids):>12}")
+        self.stdout.write(f"{'insufficient inventory':<24}{insufficient_count:>12}")
+        self.stdout.write(f"{'database errors':<24}{error_count:>12}")
+        self.stdout.write(f"{'elapsed s':<24}{elapsed_time:>12.2f}")
+        self.stdout.write(
+            f"{'reservations / s':<24}{total_attempts / elapsed_time:>12.1f}"
+        )
+        if percentiles:
+            for name, index in (("p50 ms", 49), ("p95 ms", 94), ("p99 ms", 98)):
+                self.stdout.write(f"{name:<24}{percentiles[index] * 1000:>12.2f}")
+
+        oversold = False
+        for product_item_id, inventory in final_inventories.items():
+            expected_inventory = options["inventory"] - reserved_quantity
+            self.stdout.write(
+                f"{f'item {product_item_id} inventory':<24}{inventory:>12}"
+                f"  (expected {expected_inventory})"
+            )
+            oversold = oversold or inventory < 0 or inventory != expected_inventory
+
+        if oversold:
+            self.stdout.write(
+                self.style.ERROR("Inventory does not match the reservations")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("No item was oversold"))
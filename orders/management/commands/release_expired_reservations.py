@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from orders.reservations import (
+    RESERVATION_RELEASE_BATCH_SIZE,
+    release_expired_reservations,
+)
+
+
+class Command(BaseCommand):
+    help = "Return the inventory of expired checkout reservations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RESERVATION_RELEASE_BATCH_SIZE,
+            help="Number of expired reservations loaded at a time",
+        )
+
+    def handle(self, *args, **options):
+        released_count = release_expired_reservations(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{released_count} expired reservations were released")
+        )
@@ -0,0 +1,117 @@
+# Generated by Django 4.2.6 on 2026-10-18 15:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("products", "0005_product_cheapest_product_item"),
+        ("orders", "0003_alter_order_order_code"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Reservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.IntegerField(
+                        choices=[(1, "رزرو شده"), (2, "نهایی شده"), (3, "آزاد شده")],
+                        default=1,
+                        verbose_name="وضعیت رزرو",
+                    ),
+                ),
+                (
+                    "create_datetime",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="تاریخ و زمان ایجاد"
+                    ),
+                ),
+                (
+                    "expire_datetime",
+                    models.DateTimeField(verbose_name="تاریخ و زمان انقضا"),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="reservations",
+                        to="orders.order",
+                        verbose_name="سفارش",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="reservations",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="کاربر",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "reservation",
+                "ordering": ("-create_datetime",),
+            },
+        ),
+        migrations.CreateModel(
+            name="ReservationItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(verbose_name="تعداد")),
+                (
+                    "product_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservation_items",
+                        to="products.productitem",
+                        verbose_name="محصول",
+                    ),
+                ),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="orders.reservation",
+                        verbose_name="رزرو",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "reservation_item",
+                "unique_together": {("reservation", "product_item")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["status", "expire_datetime"],
+                name="reservation_status_78700c_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.6 on 2026-10-18 15:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0004_reservation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecordedSale",
+            fields=[
+                (
+                    "order",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="recorded_sale",
+                        serialize=False,
+                        to="orders.order",
+                        verbose_name="سفارش",
+                    ),
+                ),
+                (
+                    "create_datetime",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="تاریخ و زمان ثبت"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "recorded_sale",
+                "ordering": ("-create_datetime",),
+            },
+        ),
+    ]
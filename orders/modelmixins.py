@@ -1,4 +1,13 @@
-from django_lifecycle import BEFORE_CREATE, BEFORE_SAVE, BEFORE_UPDATE, hook
+from django.db import transaction
+from django_lifecycle import (
+    AFTER_CREATE,
+    AFTER_DELETE,
+    AFTER_UPDATE,
+    BEFORE_CREATE,
+    BEFORE_SAVE,
+    BEFORE_UPDATE,
+    hook,
+)
 
 
 class AddressModelMixin:
@@ -30,6 +39,14 @@ class OrderModelMixin:
     def set_shipping_cost(self):
         self.shipping_cost = self.shipping_method.cost
 
+    @hook(AFTER_CREATE)
+    @hook(AFTER_UPDATE, when="status", has_changed=True)
+    def update_sales(self):
+        from .sales import update_sales
+
+        order_id = self.id
+        transaction.on_commit(lambda: update_sales(order_ids=[order_id]))
+
 
 class OrderItemModelMixin:
     @hook(BEFORE_CREATE)
@@ -41,3 +58,52 @@ class OrderItemModelMixin:
     @hook(BEFORE_CREATE)
     def set_name(self):
         self.name = self.product_item.product.name
+
+    def get_sold_quantities(self, product_item_id, quantity, sign=1) -> dict:
+        if product_item_id is None or not quantity:
+            return {}
+
+        product_item_model = self._meta.get_field("product_item").related_model
+        product_id = (
+            product_item_model.objects.filter(id=product_item_id)
+            .values_list("product_id", flat=True)
+            .first()
+        )
+        return {} if product_id is None else {product_id: sign * quantity}
+
+    def update_recorded_sale(self, order_id, quantities):
+        from .sales import update_recorded_sale
+
+        update_recorded_sale(order_id=order_id, quantities=quantities)
+
+    @hook(AFTER_CREATE)
+    def add_recorded_sale(self):
+        self.update_recorded_sale(
+            self.order_id, self.get_sold_quantities(self.product_item_id, self.quantity)
+        )
+
+    @hook(
+        AFTER_UPDATE, when_any=["order", "product_item", "quantity"], has_changed=True
+    )
+    def change_recorded_sale(self):
+        initial_order_id = self.initial_value("order")
+        initial_quantities = self.get_sold_quantities(
+            self.initial_value("product_item"), self.initial_value("quantity"), sign=-1
+        )
+        quantities = self.get_sold_quantities(self.product_item_id, self.quantity)
+
+        if initial_order_id != self.order_id:
+            self.update_recorded_sale(initial_order_id, initial_quantities)
+            self.update_recorded_sale(self.order_id, quantities)
+            return
+
+        for product_id, quantity in initial_quantities.items():
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        self.update_recorded_sale(self.order_id, quantities)
+
+    @hook(AFTER_DELETE)
+    def remove_recorded_sale(self):
+        self.update_recorded_sale(
+            self.order_id,
+            self.get_sold_quantities(self.product_item_id, self.quantity, sign=-1),
+        )
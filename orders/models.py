@@ -321,3 +321,100 @@ class OrderItem(LifecycleModelMixin, OrderItemModelMixin, models.Model):
 
     def __str__(self) -> str:
         return f"{self.name} | {self.order}"
+
+
+class Reservation(models.Model):
+    RESERVED = 1
+    COMMITTED = 2
+    RELEASED = 3
+
+    RESERVATION_STATUS_CHOICES = (
+        (RESERVED, _("رزرو شده")),
+        (COMMITTED, _("نهایی شده")),
+        (RELEASED, _("آزاد شده")),
+    )
+
+    user = models.ForeignKey(
+        verbose_name=_("کاربر"),
+        related_name="reservations",
+        to=User,
+        on_delete=models.SET_NULL,
+        db_index=True,
+        null=True,
+    )
+    order = models.ForeignKey(
+        verbose_name=_("سفارش"),
+        related_name="reservations",
+        to="Order",
+        on_delete=models.SET_NULL,
+        db_index=True,
+        null=True,
+    )
+    status = models.IntegerField(
+        verbose_name=_("وضعیت رزرو"),
+        choices=RESERVATION_STATUS_CHOICES,
+        default=RESERVED,
+    )
+    create_datetime = models.DateTimeField(
+        verbose_name=_("تاریخ و زمان ایجاد"),
+        auto_now_add=True,
+    )
+    expire_datetime = models.DateTimeField(
+        verbose_name=_("تاریخ و زمان انقضا"),
+    )
+
+    class Meta:
+        ordering = ("-create_datetime",)
+        indexes = (models.Index(fields=("status", "expire_datetime")),)
+        db_table = "reservation"
+
+    def __str__(self) -> str:
+        return f"{self.user} | {self.get_status_display()}"
+
+
+class ReservationItem(models.Model):
+    reservation = models.ForeignKey(
+        verbose_name=_("رزرو"),
+        related_name="items",
+        to="Reservation",
+        on_delete=models.CASCADE,
+        db_index=True,
+    )
+    product_item = models.ForeignKey(
+        verbose_name=_("محصول"),
+        related_name="reservation_items",
+        to="products.ProductItem",
+        on_delete=models.CASCADE,
+        db_index=True,
+    )
+    quantity = models.PositiveIntegerField(
+        verbose_name=_("تعداد"),
+    )
+
+    class Meta:
+        unique_together = ("reservation", "product_item")
+        db_table = "reservation_item"
+
+    def __str__(self) -> str:
+        return f"{self.product_item} | {self.quantity}"
+
+
+class RecordedSale(models.Model):
+    order = models.OneToOneField(
+        verbose_name=_("سفارش"),
+        related_name="recorded_sale",
+        to="Order",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    create_datetime = models.DateTimeField(
+        verbose_name=_("تاریخ و زمان ثبت"),
+        auto_now_add=True,
+    )
+
+    class Meta:
+        ordering = ("-create_datetime",)
+        db_table = "recorded_sale"
+
+    def __str__(self) -> str:
+        return f"{self.order} | {self.create_datetime}"
@@ -0,0 +1,162 @@
+from datetime import timedelta
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from core import cache_key_schema
+from core.utils import invalidate_keys, invalidate_tags
+from products.models import Product, ProductItem
+
+from .models import Reservation, ReservationItem
+
+RESERVATION_TIMEOUT = 60 * 15
+RESERVATION_RELEASE_BATCH_SIZE = 500
+
+
+class ReservationError(Exception):
+    pass
+
+
+class InsufficientInventory(ReservationError):
+    def __init__(self, product_item_ids):
+        self.product_item_ids = sorted(product_item_ids)
+        super().__init__(f"Insufficient inventory for items {self.product_item_ids}")
+
+
+def get_quantity_expression(quantities):
+    return Case(
+        *(
+            When(id=product_item_id, then=Value(quantity))
+            for product_item_id, quantity in quantities.items()
+        ),
+        output_field=IntegerField(),
+    )
+
+
+def get_cart_quantities(cart) -> dict:
+    quantities = {}
+    for product_item_id, quantity in cart:
+        if quantity <= 0:
+            raise ReservationError(f"Invalid quantity {quantity} for {product_item_id}")
+        quantities[product_item_id] = quantities.get(product_item_id, 0) + quantity
+    return quantities
+
+
+def refresh_reserved_products(quantities, crossed_zero):
+    product_items = list(
+        ProductItem.objects.filter(id__in=quantities).values_list(
+            "id", "product_id", "inventory"
+        )
+    )
+    invalidate_keys(
+        cache_key_schema.all_product_items(),
+        *map(cache_key_schema.single_product_item, quantities),
+    )
+    invalidate_tags(
+        *{
+            cache_key_schema.product_tag(product_id)
+            for product_item_id, product_id, inventory in product_items
+        }
+    )
+
+    product_ids = {
+        product_id
+        for product_item_id, product_id, inventory in product_items
+        if crossed_zero(inventory, quantities[product_item_id])
+    }
+    if product_ids:
+        with transaction.atomic():
+            Product.objects.update_cheapest_product_items(product_ids)
+            Product.objects.invalidate_catalog_cache(product_ids=product_ids)
+
+
+def reserve(cart, user=None, timeout=RESERVATION_TIMEOUT) -> Reservation:
+    quantities = get_cart_quantities(cart)
+    if not quantities:
+        raise ReservationError("The cart is empty")
+
+    quantity_expression = get_quantity_expression(quantities)
+    with transaction.atomic():
+        reserved = ProductItem.objects.filter(
+            id__in=quantities, inventory__gte=quantity_expression
+        ).update(inventory=F("inventory") - quantity_expression)
+
+        if reserved != len(quantities):
+            available_ids = ProductItem.objects.filter(
+                id__in=quantities, inventory__gte=quantity_expression
+            ).values_list("id", flat=True)
+            raise InsufficientInventory(set(quantities) - set(available_ids))
+
+        reservation = Reservation.objects.create(
+            user=user,
+            expire_datetime=timezone.now() + timedelta(seconds=timeout),
+        )
+        ReservationItem.objects.bulk_create(
+            ReservationItem(
+                reservation=reservation,
+                product_item_id=product_item_id,
+                quantity=quantity,
+            )
+            for product_item_id, quantity in quantities.items()
+        )
+        transaction.on_commit(
+            partial(
+                refresh_reserved_products,
+                quantities,
+                crossed_zero=lambda inventory, quantity: inventory == 0,
+            )
+        )
+    return reservation
+
+
+def commit(reservation, order=None):
+    committed = Reservation.objects.filter(
+        id=reservation.id,
+        status=Reservation.RESERVED,
+        expire_datetime__gt=timezone.now(),
+    ).update(status=Reservation.COMMITTED, order=order)
+    if not committed:
+        raise ReservationError(f"Reservation {reservation.id} is no longer active")
+
+    reservation.status, reservation.order = Reservation.COMMITTED, order
+
+
+def release(reservation) -> bool:
+    with transaction.atomic():
+        released = Reservation.objects.filter(
+            id=reservation.id, status=Reservation.RESERVED
+        ).update(status=Reservation.RELEASED)
+        if not released:
+            return False
+
+        quantities = dict(reservation.items.values_list("product_item_id", "quantity"))
+        quantity_expression = get_quantity_expression(quantities)
+        ProductItem.objects.filter(id__in=quantities).update(
+            inventory=F("inventory") + quantity_expression
+        )
+        transaction.on_commit(
+            partial(
+                refresh_reserved_products,
+                quantities,
+                crossed_zero=lambda inventory, quantity: 0 < inventory <= quantity,
+            )
+        )
+
+    reservation.status = Reservation.RELEASED
+    return True
+
+
+def release_expired_reservations(batch_size=RESERVATION_RELEASE_BATCH_SIZE) -> int:
+    released_count = 0
+    while True:
+        reservations = Reservation.objects.filter(
+            status=Reservation.RESERVED, expire_datetime__lte=timezone.now()
+        )[:batch_size]
+        reservations = list(reservations)
+        if not reservations:
+            return released_count
+
+        for reservation in reservations:
+            released_count += release(reservation)
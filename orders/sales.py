@@ -0,0 +1,178 @@
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Sum
+
+from comments.models import Comment
+from core import cache_key_schema
+from core.utils import invalidate_keys, invalidate_tags
+from products.models import Product
+from users.models import PurchasedProducts
+
+from .models import Order, OrderItem, OrderStatus, RecordedSale
+from .reservations import get_quantity_expression
+
+SALES_BATCH_SIZE = 500
+SOLD_ORDER_STATUSES = (
+    OrderStatus.SUCCESSFUL,
+    OrderStatus.PROCESSING,
+    OrderStatus.SENT,
+    OrderStatus.DELIVERED,
+)
+
+
+def get_sold_quantities(order_ids) -> dict:
+    quantities = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .exclude(product_item=None)
+        .values_list("product_item__product_id")
+        .annotate(quantity=Sum("quantity"))
+        .order_by()
+    )
+    return dict(quantities)
+
+
+def get_purchases(order_ids) -> set:
+    purchases = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .exclude(order__user=None)
+        .exclude(product_item=None)
+        .values_list("order__user_id", "product_item__product_id")
+        .order_by()
+        .distinct()
+    )
+    return set(purchases)
+
+
+def remove_purchases(purchases):
+    if not purchases:
+        return
+
+    remaining_purchases = get_purchases(
+        Order.objects.filter(
+            recorded_sale__isnull=False,
+            user_id__in={user_id for user_id, _ in purchases},
+            items__product_item__product_id__in={
+                product_id for _, product_id in purchases
+            },
+        ).values("id")
+    )
+    for user_id, product_id in purchases - remaining_purchases:
+        PurchasedProducts.objects.filter(
+            user_id=user_id, product_id=product_id
+        ).delete()
+
+
+def update_sold_counts(quantities, sign):
+    if quantities:
+        Product.objects.filter(id__in=quantities).update(
+            sold_count=F("sold_count") + sign * get_quantity_expression(quantities)
+        )
+        invalidate_tags(*map(cache_key_schema.product_tag, quantities))
+
+
+def update_buyer_comments(product_ids):
+    purchased_products = PurchasedProducts.objects.filter(
+        user=OuterRef("user"), product=OuterRef("product")
+    )
+    comments = Comment.objects.filter(product_id__in=product_ids).exclude(
+        is_buyer=Exists(purchased_products)
+    )
+    comment_ids = list(comments.values_list("id", flat=True))
+    if comment_ids:
+        Comment.objects.filter(id__in=comment_ids).update(
+            is_buyer=Exists(purchased_products)
+        )
+        invalidate_keys(
+            cache_key_schema.all_comments(),
+            *map(cache_key_schema.single_comment, comment_ids),
+        )
+
+
+def record_sales(order_ids) -> int:
+    with transaction.atomic():
+        orders = Order.objects.select_for_update(of=("self",)).filter(
+            id__in=order_ids,
+            recorded_sale=None,
+            status__status__in=SOLD_ORDER_STATUSES,
+        )
+        order_ids = list(orders.values_list("id", flat=True))
+        if not order_ids:
+            return 0
+
+        quantities = get_sold_quantities(order_ids)
+        update_sold_counts(quantities, sign=1)
+        PurchasedProducts.objects.bulk_create(
+            (
+                PurchasedProducts(user_id=user_id, product_id=product_id)
+                for user_id, product_id in get_purchases(order_ids)
+            ),
+            ignore_conflicts=True,
+        )
+        RecordedSale.objects.bulk_create(
+            RecordedSale(order_id=order_id) for order_id in order_ids
+        )
+        update_buyer_comments(quantities)
+    return len(order_ids)
+
+
+def revert_sales(order_ids) -> int:
+    with transaction.atomic():
+        orders = (
+            Order.objects.select_for_update(of=("self",))
+            .filter(id__in=order_ids, recorded_sale__isnull=False)
+            .exclude(status__status__in=SOLD_ORDER_STATUSES)
+        )
+        order_ids = list(orders.values_list("id", flat=True))
+        if not order_ids:
+            return 0
+
+        quantities = get_sold_quantities(order_ids)
+        update_sold_counts(quantities, sign=-1)
+        RecordedSale.objects.filter(order_id__in=order_ids).delete()
+
+        remove_purchases(get_purchases(order_ids))
+        update_buyer_comments(quantities)
+    return len(order_ids)
+
+
+def update_recorded_sale(order_id, quantities) -> bool:
+    quantities = {
+        product_id: quantity for product_id, quantity in quantities.items() if quantity
+    }
+    if not quantities:
+        return False
+
+    with transaction.atomic():
+        order = (
+            Order.objects.select_for_update(of=("self",))
+            .filter(id=order_id, recorded_sale__isnull=False)
+            .first()
+        )
+        if order is None:
+            return False
+
+        update_sold_counts(quantities, sign=1)
+        if order.user_id is not None:
+            PurchasedProducts.objects.bulk_create(
+                (
+                    PurchasedProducts(user_id=order.user_id, product_id=product_id)
+                    for product_id, quantity in quantities.items()
+                    if quantity > 0
+                ),
+                ignore_conflicts=True,
+            )
+            remove_purchases(
+                {
+                    (order.user_id, product_id)
+                    for product_id, quantity in quantities.items()
+                    if quantity < 0
+                }
+            )
+        update_buyer_comments(quantities)
+    return True
+
+
+def update_sales(order_ids) -> dict:
+    return {
+        "recorded_orders": record_sales(order_ids),
+        "reverted_orders": revert_sales(order_ids),
+    }
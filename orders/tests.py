@@ -1,3 +1,317 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from categories.models import Category
+from core.tests import RedisTestCase
+from products.models import Product, ProductItem
+from users.models import PurchasedProducts
+
+from .models import (
+    Order,
+    OrderItem,
+    OrderStatus,
+    RecordedSale,
+    Reservation,
+    ShippingMethod,
+)
+from .reservations import (
+    InsufficientInventory,
+    ReservationError,
+    commit,
+    release,
+    release_expired_reservations,
+    reserve,
+)
+from .sales import record_sales, revert_sales
+
+
+def create_product_item(sku, inventory, price=100):
+    category, _ = Category.objects.get_or_create(
+        name="Phones", defaults={"media_folder_name": "phones"}
+    )
+    product = Product.objects.create(
+        name=f"Phone {sku}",
+        url=f"phone-{sku}",
+        category=category,
+        main_image="products/phone.png",
+        is_visible=True,
+    )
+    return ProductItem.objects.create(
+        product=product,
+        sku=sku,
+        original_price=price,
+        inventory=inventory,
+        is_visible=True,
+        is_available=True,
+    )
+
+
+class ReservationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product_item = create_product_item("phone-1", inventory=3)
+        cls.other_product_item = create_product_item("phone-2", inventory=5)
+
+    def get_inventories(self):
+        return list(
+            ProductItem.objects.filter(
+                id__in=(self.product_item.id, self.other_product_item.id)
+            )
+            .order_by("id")
+            .values_list("inventory", flat=True)
+        )
+
+    def test_reserve_takes_inventory_of_every_item(self):
+        reservation = reserve(
+            [(self.product_item.id, 2), (self.other_product_item.id, 1)]
+        )
+
+        self.assertEqual(self.get_inventories(), [1, 4])
+        self.assertEqual(reservation.status, Reservation.RESERVED)
+        self.assertEqual(reservation.items.count(), 2)
+
+    def test_short_stock_fails_without_taking_inventory(self):
+        with self.assertRaises(InsufficientInventory) as context:
+            reserve([(self.product_item.id, 4), (self.other_product_item.id, 1)])
+
+        self.assertEqual(context.exception.product_item_ids, [self.product_item.id])
+        self.assertEqual(self.get_inventories(), [3, 5])
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_last_unit_goes_to_one_reservation(self):
+        reserve([(self.product_item.id, 3)])
+
+        with self.assertRaises(InsufficientInventory):
+            reserve([(self.product_item.id, 1)])
+        self.assertEqual(self.get_inventories(), [0, 5])
+
+    def test_invalid_carts_are_rejected(self):
+        for cart in ([], [(self.product_item.id, 0)]):
+            with self.subTest(cart=cart), self.assertRaises(ReservationError):
+                reserve(cart)
+
+    def test_release_is_idempotent(self):
+        reservation = reserve([(self.product_item.id, 2)])
+
+        self.assertTrue(release(reservation))
+        self.assertFalse(release(reservation))
+        self.assertEqual(self.get_inventories(), [3, 5])
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, Reservation.RELEASED)
+
+    def test_commit_is_final(self):
+        reservation = reserve([(self.product_item.id, 2)])
+
+        commit(reservation)
+        with self.assertRaises(ReservationError):
+            commit(reservation)
+        self.assertFalse(release(reservation))
+        self.assertEqual(self.get_inventories(), [1, 5])
+
+    def test_expired_reservations_are_released(self):
+        expired = reserve([(self.product_item.id, 2)], timeout=0)
+        active = reserve([(self.other_product_item.id, 1)])
+        Reservation.objects.filter(id=expired.id).update(
+            expire_datetime=timezone.now() - timedelta(seconds=1)
+        )
+
+        with self.assertRaises(ReservationError):
+            commit(expired)
+        self.assertEqual(release_expired_reservations(), 1)
+        self.assertEqual(release_expired_reservations(), 0)
+        self.assertEqual(self.get_inventories(), [3, 4])
+        active.refresh_from_db()
+        self.assertEqual(active.status, Reservation.RESERVED)
+
+    def test_cheapest_item_is_refreshed_on_commit(self):
+        product = self.product_item.product
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = reserve([(self.product_item.id, 3)])
+        product.refresh_from_db()
+        self.assertIsNone(product.cheapest_product_item_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            release(reservation)
+        product.refresh_from_db()
+        self.assertEqual(product.cheapest_product_item_id, self.product_item.id)
+
+
+class ReservationCacheTests(RedisTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        cls.product_item = create_product_item("phone-1", inventory=10)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+        self.url = reverse(
+            "products:product_item_detail_update_delete",
+            kwargs={"product_item_id": self.product_item.id},
+        )
+
+    def get_inventory(self):
+        return self.client.get(self.url).data["inventory"]
+
+    def test_reserve_and_release_refresh_cached_item(self):
+        self.assertEqual(self.get_inventory(), 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = reserve([(self.product_item.id, 7)])
+        self.assertEqual(self.get_inventory(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(release(reservation))
+        self.assertEqual(self.get_inventory(), 10)
+
+    def test_stale_cached_item_save_keeps_reserved_inventory(self):
+        self.assertEqual(self.get_inventory(), 10)
+        reserve([(self.product_item.id, 7)])
+
+        response = self.client.patch(
+            self.url, {"original_price": "150"}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.product_item.refresh_from_db()
+        self.assertEqual(self.product_item.original_price, 150)
+        self.assertEqual(self.product_item.inventory, 3)
+
+
+class SalesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("buyer", password="password")
+        cls.statuses = {
+            status: OrderStatus.objects.create(status=status)
+            for status in (OrderStatus.FAILED, OrderStatus.SUCCESSFUL)
+        }
+        cls.shipping_method = ShippingMethod.objects.create(name="Post", cost=10)
+        cls.product_items = [
+            create_product_item(f"phone-{index}", inventory=10) for index in range(3)
+        ]
+
+    def create_order(self, status, quantities):
+        order = Order.objects.create(
+            id=Order.objects.count() + 1,
+            user=self.user,
+            status=self.statuses[status],
+            shipping_method=self.shipping_method,
+        )
+        for product_item, quantity in zip(self.product_items, quantities):
+            OrderItem.objects.create(
+                order=order, product_item=product_item, quantity=quantity
+            )
+        return order
+
+    def get_sold_counts(self):
+        return [
+            Product.objects.get(id=product_item.product_id).sold_count
+            for product_item in self.product_items
+        ]
+
+    def get_purchased_products(self):
+        return set(
+            PurchasedProducts.objects.filter(user=self.user).values_list(
+                "product_id", flat=True
+            )
+        )
+
+    def get_product_ids(self, *indexes):
+        return {self.product_items[index].product_id for index in indexes}
+
+    def test_record_and_revert_sales(self):
+        order = self.create_order(OrderStatus.SUCCESSFUL, (2, 1))
+
+        self.assertEqual(record_sales([order.id]), 1)
+        self.assertEqual(record_sales([order.id]), 0)
+        self.assertEqual(self.get_sold_counts(), [2, 1, 0])
+        self.assertEqual(self.get_purchased_products(), self.get_product_ids(0, 1))
+
+        self.assertEqual(revert_sales([order.id]), 0)
+        Order.objects.filter(id=order.id).update(
+            status=self.statuses[OrderStatus.FAILED]
+        )
+        self.assertEqual(revert_sales([order.id]), 1)
+        self.assertEqual(revert_sales([order.id]), 0)
+        self.assertEqual(self.get_sold_counts(), [0, 0, 0])
+        self.assertEqual(self.get_purchased_products(), set())
+        self.assertFalse(RecordedSale.objects.exists())
+
+    def test_failed_orders_are_not_recorded(self):
+        order = self.create_order(OrderStatus.FAILED, (2,))
+
+        self.assertEqual(record_sales([order.id]), 0)
+        self.assertEqual(self.get_sold_counts(), [0, 0, 0])
+        self.assertEqual(self.get_purchased_products(), set())
+
+    def test_status_changes_record_and_revert_sales(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self.create_order(OrderStatus.FAILED, (1, 3))
+        self.assertEqual(self.get_sold_counts(), [0, 0, 0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = self.statuses[OrderStatus.SUCCESSFUL]
+            order.save()
+        self.assertEqual(self.get_sold_counts(), [1, 3, 0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = self.statuses[OrderStatus.FAILED]
+            order.save()
+        self.assertEqual(self.get_sold_counts(), [0, 0, 0])
+
+    def test_purchases_of_other_recorded_orders_are_kept(self):
+        first_order = self.create_order(OrderStatus.SUCCESSFUL, (1,))
+        second_order = self.create_order(OrderStatus.SUCCESSFUL, (2, 1))
+        record_sales([first_order.id, second_order.id])
+        self.assertEqual(self.get_sold_counts(), [3, 1, 0])
+
+        Order.objects.filter(id=second_order.id).update(
+            status=self.statuses[OrderStatus.FAILED]
+        )
+        revert_sales([second_order.id])
+        self.assertEqual(self.get_sold_counts(), [1, 0, 0])
+        self.assertEqual(self.get_purchased_products(), self.get_product_ids(0))
+
+    def test_item_changes_of_recorded_order_update_sales(self):
+        order = self.create_order(OrderStatus.SUCCESSFUL, (2,))
+        record_sales([order.id])
+
+        order_item = OrderItem.objects.create(
+            order=order, product_item=self.product_items[1], quantity=3
+        )
+        self.assertEqual(self.get_sold_counts(), [2, 3, 0])
+        self.assertEqual(self.get_purchased_products(), self.get_product_ids(0, 1))
+
+        order_item.quantity = 1
+        order_item.save()
+        self.assertEqual(self.get_sold_counts(), [2, 1, 0])
+
+        order_item = OrderItem.objects.get(id=order_item.id)
+        order_item.product_item = self.product_items[2]
+        order_item.save()
+        self.assertEqual(self.get_sold_counts(), [2, 0, 1])
+        self.assertEqual(self.get_purchased_products(), self.get_product_ids(0, 2))
+
+        order_item.delete()
+        self.assertEqual(self.get_sold_counts(), [2, 0, 0])
+        self.assertEqual(self.get_purchased_products(), self.get_product_ids(0))
+
+    def test_item_changes_of_unrecorded_order_wait_for_recording(self):
+        order = self.create_order(OrderStatus.FAILED, (2,))
+        OrderItem.objects.create(
+            order=order, product_item=self.product_items[1], quantity=3
+        )
+        self.assertEqual(self.get_sold_counts(), [0, 0, 0])
 
-# Create your tests here.
+        Order.objects.filter(id=order.id).update(
+            status=self.statuses[OrderStatus.SUCCESSFUL]
+        )
+        record_sales([order.id])
+        self.assertEqual(self.get_sold_counts(), [2, 3, 0])
@@ -0,0 +1,390 @@
+import csv
+import json
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from brands.models import Brand
+from categories.models import Category
+
+from .models import AttributeValue, Product, ProductAttributeValue, ProductItem
+from .search import get_search_backend
+from .serializers import CatalogImportRowSerializer
+
+CATALOG_IMPORT_BATCH_SIZE = 1000
+CATALOG_IMPORT_MAX_ERRORS = 100
+
+PRODUCT_FIELDS = {
+    "product_url": "url",
+    "category": "category_id",
+    "brand": "brand_id",
+    "introduction": "introduction",
+    "main_image": "main_image",
+    "is_visible": "is_visible",
+    "is_available": "is_available",
+}
+PRODUCT_UPDATE_FIELDS = (
+    "category_id",
+    "brand_id",
+    "url",
+    "introduction",
+    "main_image",
+    "is_visible",
+    "is_available",
+    "meta_title",
+    "meta_description",
+)
+
+ITEM_FIELDS = {
+    "original_price": "original_price",
+    "selling_price": "selling_price",
+    "inventory": "inventory",
+    "item_is_visible": "is_visible",
+    "item_is_available": "is_available",
+}
+ITEM_UPDATE_FIELDS = (
+    "product_id",
+    "original_price",
+    "selling_price",
+    "inventory",
+    "is_visible",
+    "is_available",
+)
+
+
+def read_csv_rows(stream):
+    for row in csv.DictReader(stream):
+        yield {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if key is not None and value is not None and value.strip()
+        }
+
+
+def read_jsonl_rows(stream):
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def get_field_values(instance, fields) -> tuple:
+    return tuple(getattr(instance, field) for field in fields)
+
+
+CATALOG_READERS = {
+    "csv": read_csv_rows,
+    "jsonl": read_jsonl_rows,
+}
+
+
+class CatalogImporter:
+    def __init__(
+        self,
+        batch_size=CATALOG_IMPORT_BATCH_SIZE,
+        max_errors=CATALOG_IMPORT_MAX_ERRORS,
+    ):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.category_ids = set(Category.objects.values_list("id", flat=True))
+        self.brand_ids = dict(Brand.objects.values_list("url", "id"))
+        self.row_serializer = CatalogImportRowSerializer()
+        self.summary = {
+            "rows": 0,
+            "imported_rows": 0,
+            "failed_rows": 0,
+            "created_products": 0,
+            "updated_products": 0,
+            "created_items": 0,
+            "updated_items": 0,
+            "errors": [],
+        }
+
+    def run(self, stream, format) -> dict:
+        rows = enumerate(CATALOG_READERS[format](stream), start=1)
+        while batch := list(islice(rows, self.batch_size)):
+            self.import_batch(batch)
+        return self.summary
+
+    def add_error(self, rows, errors):
+        self.summary["failed_rows"] += len(rows)
+        if len(self.summary["errors"]) < self.max_errors:
+            self.summary["errors"].append({"rows": rows, "errors": errors})
+
+    def validate_row(self, row):
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except ValueError as error:
+                return None, {"non_field_errors": [str(error)]}
+            if not isinstance(row, dict):
+                return None, {"non_field_errors": ["Expected a JSON object"]}
+
+        try:
+            data = self.row_serializer.run_validation(row)
+        except ValidationError as error:
+            return None, error.detail
+
+        if data["category"] not in self.category_ids:
+            return None, {"category": [f"Category {data['category']} does not exist"]}
+        if "brand" in data:
+            if data["brand"] not in self.brand_ids:
+                return None, {"brand": [f"Brand {data['brand']} does not exist"]}
+            data["brand"] = self.brand_ids[data["brand"]]
+        return data, None
+
+    def validate_batch(self, batch):
+        rows = []
+        for row_number, row in batch:
+            data, errors = self.validate_row(row)
+            if errors:
+                self.add_error([row_number], errors)
+            else:
+                rows.append((row_number, data))
+
+        attribute_value_ids = {
+            attribute_value_id
+            for _, data in rows
+            for attribute_value_id in data.get("configuration", ())
+        }
+        existing_attribute_value_ids = set(
+            AttributeValue.objects.filter(id__in=attribute_value_ids).values_list(
+                "id", flat=True
+            )
+        )
+
+        valid_rows = []
+        for row_number, data in rows:
+            missing_ids = (
+                set(data.get("configuration", ())) - existing_attribute_value_ids
+            )
+            if missing_ids:
+                errors = {
+                    "configuration": [
+                        f"Unknown attribute values: {sorted(missing_ids)}"
+                    ]
+                }
+                self.add_error([row_number], errors)
+            else:
+                valid_rows.append((row_number, data))
+        return valid_rows
+
+    def import_batch(self, batch):
+        self.summary["rows"] += len(batch)
+        rows = self.validate_batch(batch)
+        if not rows:
+            return
+
+        try:
+            with transaction.atomic():
+                counts = self.save_batch([data for _, data in rows])
+        except DatabaseError as error:
+            self.add_error([row_number for row_number, _ in rows], str(error))
+            return
+
+        self.summary["imported_rows"] += len(rows)
+        for name, count in counts.items():
+            self.summary[name] += count
+
+    def save_batch(self, rows) -> dict:
+        touched = {
+            "products": set(),
+            "items": set(),
+            "categories": set(),
+            "brands": set(),
+        }
+        products, created_products, updated_products = self.save_products(rows, touched)
+        created_items, updated_items = self.save_items(rows, products, touched)
+
+        if touched["products"]:
+            Product.objects.update_cheapest_product_items(touched["products"])
+            ProductAttributeValue.objects.refresh_products(touched["products"])
+            get_search_backend().index_products(touched["products"])
+            Product.objects.invalidate_catalog_cache(
+                product_ids=touched["products"],
+                product_item_ids=touched["items"],
+                category_ids=touched["categories"],
+                brand_ids=touched["brands"],
+                search=bool(created_products or updated_products),
+                facets=True,
+            )
+
+        return {
+            "created_products": created_products,
+            "updated_products": updated_products,
+            "created_items": created_items,
+            "updated_items": updated_items,
+        }
+
+    def touch_product(self, touched, product):
+        touched["products"].add(product.id)
+        touched["categories"].add(product.category_id)
+        touched["brands"].add(product.brand_id)
+
+    def save_products(self, rows, touched):
+        product_rows = {}
+        for data in rows:
+            product_rows.setdefault(data["product_name"], {}).update(data)
+
+        products = Product.objects.select_related(None).filter(name__in=product_rows)
+        products = {product.name: product for product in products}
+        created_products, updated_products = [], []
+        now = timezone.now()
+
+        for name, data in product_rows.items():
+            product = products.get(name)
+            if product is None:
+                product = products[name] = Product(name=name)
+                created_products.append(product)
+                initial_values = None
+            else:
+                initial_values = get_field_values(product, PRODUCT_UPDATE_FIELDS)
+
+            for key, field in PRODUCT_FIELDS.items():
+                if key in data:
+                    setattr(product, field, data[key])
+            product.set_metadate()
+            product.set_url()
+
+            if initial_values is None:
+                continue
+            if initial_values != get_field_values(product, PRODUCT_UPDATE_FIELDS):
+                product.update_datetime = now
+                updated_products.append(product)
+                touched["categories"].add(initial_values[0])
+                touched["brands"].add(initial_values[1])
+
+        Product.objects.bulk_create(created_products)
+        Product.objects.bulk_update(
+            updated_products, fields=(*PRODUCT_UPDATE_FIELDS, "update_datetime")
+        )
+
+        for product in (*created_products, *updated_products):
+            self.touch_product(touched, product)
+        return products, len(created_products), len(updated_products)
+
+    def save_items(self, rows, products, touched):
+        item_rows = {data["sku"]: data for data in rows}
+        items = ProductItem.objects.select_related(None).filter(sku__in=item_rows)
+        items = {item.sku: item for item in items}
+        created_items, updated_items = [], []
+
+        for sku, data in item_rows.items():
+            item = items.get(sku)
+            if item is None:
+                item = items[sku] = ProductItem(sku=sku)
+                created_items.append(item)
+                initial_values = None
+            else:
+                initial_values = get_field_values(item, ITEM_UPDATE_FIELDS)
+
+            item.product = products[data["product_name"]]
+            for key, field in ITEM_FIELDS.items():
+                if key in data:
+                    setattr(item, field, data[key])
+            item.set_selling_price()
+            item.set_availability()
+
+            if initial_values is None:
+                self.touch_product(touched, item.product)
+            elif initial_values != get_field_values(item, ITEM_UPDATE_FIELDS):
+                updated_items.append(item)
+                touched["items"].add(item.id)
+                touched["products"].add(initial_values[0])
+                self.touch_product(touched, item.product)
+
+        ProductItem.objects.bulk_create(created_items)
+        ProductItem.objects.bulk_update(updated_items, fields=ITEM_UPDATE_FIELDS)
+        self.save_configurations(item_rows, items, touched)
+        return len(created_items), len(updated_items)
+
+    def save_configurations(self, item_rows, items, touched):
+        configurations = {
+            items[sku]: set(data["configuration"])
+            for sku, data in item_rows.items()
+            if "configuration" in data
+        }
+        if not configurations:
+            return
+
+        configuration_model = ProductItem.configuration.through
+        current_configurations = {}
+        for item_id, attribute_value_id in configuration_model.objects.filter(
+            productitem_id__in=[item.id for item in configurations]
+        ).values_list("productitem_id", "attributevalue_id"):
+            current_configurations.setdefault(item_id, set()).add(attribute_value_id)
+
+        changed_items = [
+            item
+            for item, attribute_value_ids in configurations.items()
+            if current_configurations.get(item.id, set()) != attribute_value_ids
+        ]
+        if not changed_items:
+            return
+
+        configuration_model.objects.filter(
+            productitem_id__in=[item.id for item in changed_items]
+        ).delete()
+        configuration_model.objects.bulk_create(
+            [
+                configuration_model(
+                    productitem_id=item.id, attributevalue_id=attribute_value_id
+                )
+                for item in changed_items
+                for attribute_value_id in configurations[item]
+            ]
+        )
+        for item in changed_items:
+            touched["items"].add(item.id)
+            touched["products"].add(item.product_id)
+
+
+def update_product_items(rows, batch_size=CATALOG_IMPORT_BATCH_SIZE) -> dict:
+    rows = {row["sku"]: row for row in rows}
+    skus = list(rows)
+    fields = {field for row in rows.values() for field in row} - {"sku"}
+    update_fields = set(fields)
+    if "original_price" in fields:
+        update_fields.add("selling_price")
+    if "inventory" in fields:
+        update_fields.add("is_available")
+    update_fields = sorted(update_fields)
+    summary = {"rows": len(rows), "updated_items": 0, "unknown_skus": []}
+    touched_products, touched_items = set(), set()
+
+    with transaction.atomic():
+        for index in range(0, len(skus), batch_size):
+            batch_skus = skus[index : index + batch_size]
+            items = (
+                ProductItem.objects.select_related(None)
+                .select_for_update()
+                .filter(sku__in=batch_skus)
+            )
+
+            updated_items = []
+            for item in items:
+                initial_values = get_field_values(item, update_fields)
+                for field, value in rows[item.sku].items():
+                    setattr(item, field, value)
+                item.set_selling_price()
+                item.set_availability()
+                if initial_values != get_field_values(item, update_fields):
+                    updated_items.append(item)
+            ProductItem.objects.bulk_update(updated_items, fields=update_fields)
+
+            found_skus = {item.sku for item in items}
+            summary["unknown_skus"].extend(
+                sku for sku in batch_skus if sku not in found_skus
+            )
+            summary["updated_items"] += len(updated_items)
+            touched_products.update(item.product_id for item in updated_items)
+            touched_items.update(item.id for item in updated_items)
+
+        if touched_products:
+            Product.objects.update_cheapest_product_items(touched_products)
+            Product.objects.invalidate_catalog_cache(
+                product_ids=touched_products, product_item_ids=touched_items
+            )
+
+    return summary
@@ -0,0 +1,93 @@
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+
+from core.pagination import is_nullable
+
+from .models import ProductAttributeValue
+from .search import get_search_backend, get_search_terms
+
+ATTRIBUTE_FILTER_PARAM = "attr"
+
+
+def get_attribute_filters(request) -> dict:
+    attribute_filters = {}
+    for value in request.query_params.getlist(ATTRIBUTE_FILTER_PARAM):
+        attribute_id, _, attribute_value_ids = value.partition(":")
+        try:
+            attribute_id = int(attribute_id)
+            attribute_value_ids = {int(id) for id in attribute_value_ids.split(",")}
+        except ValueError:
+            raise ValidationError(
+                {
+                    ATTRIBUTE_FILTER_PARAM: (
+                        f"Invalid attribute filter {value!r}, "
+                        "expected <attribute_id>:<value_id>[,<value_id>...]"
+                    )
+                }
+            )
+        attribute_filters.setdefault(attribute_id, set()).update(attribute_value_ids)
+    return attribute_filters
+
+
+class AttributeValueFilter(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        attribute_filters = get_attribute_filters(request)
+        return ProductAttributeValue.objects.filter_products(
+            queryset, attribute_filters, field="pk"
+        )
+
+
+class ProductSearchFilter(SearchFilter):
+    def filter_queryset(self, request, queryset, view):
+        search_backend = get_search_backend()
+        if not search_backend.supports_search:
+            return super().filter_queryset(request, queryset, view)
+
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        search_terms = get_search_terms(" ".join(search_terms))
+        if not search_terms:
+            return queryset.none()
+
+        search_results = search_backend.search(queryset, search_terms)
+        if search_results.exists():
+            return search_results
+
+        suggested_terms = search_backend.suggest_terms(search_terms)
+        if suggested_terms == search_terms:
+            return search_results
+        return search_backend.search(queryset, suggested_terms)
+
+
+class ProductListingOrderingFilter(OrderingFilter):
+    ordering_field_map = {
+        "id": "pk",
+        "cheapest_product_item__selling_price": "selling_price",
+    }
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+
+        listing_ordering, field_names = [], set()
+        for field_name in ordering:
+            descending = field_name.startswith("-")
+            field_name = field_name.lstrip("-")
+            field_name = self.ordering_field_map.get(field_name, field_name)
+            field_names.add(field_name)
+            if is_nullable(queryset.model, field_name):
+                listing_ordering.append(
+                    F(field_name).desc(nulls_last=True)
+                    if descending
+                    else F(field_name).asc(nulls_last=True)
+                )
+            else:
+                listing_ordering.append(f"-{field_name}" if descending else field_name)
+
+        if "pk" not in field_names:
+            listing_ordering.append("-pk")
+        return listing_ordering
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from products.product_views import PRODUCT_VIEWS_FLUSH_BATCH_SIZE, product_view_counter
+
+
+class Command(BaseCommand):
+    help = "Write the product views buffered in redis to Product.views_count"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PRODUCT_VIEWS_FLUSH_BATCH_SIZE,
+            help="Number of products updated by every query",
+        )
+
+    def handle(self, *args, **options):
+        summary = product_view_counter.flush(batch_size=options["batch_size"])
+
+        for name, value in summary.items():
+            self.stdout.write(f"{name:<20}{value:>10}")
+        self.stdout.write(self.style.SUCCESS("Product views flushed"))
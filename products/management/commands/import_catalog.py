@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.catalog_import import (
+    CATALOG_IMPORT_BATCH_SIZE,
+    CATALOG_IMPORT_MAX_ERRORS,
+    CATALOG_READERS,
+    CatalogImporter,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or JSONL catalog feed into products and product items"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the catalog feed")
+        parser.add_argument(
+            "--format",
+            choices=tuple(CATALOG_READERS),
+            help="Feed format, detected from the file extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=CATALOG_IMPORT_BATCH_SIZE,
+            help="Number of rows validated and written together",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=CATALOG_IMPORT_MAX_ERRORS,
+            help="Number of row errors kept in the summary",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        format = options["format"] or path.rsplit(".", 1)[-1].lower()
+        if format not in CATALOG_READERS:
+            raise CommandError("Could not detect the feed format, use --format")
+
+        importer = CatalogImporter(
+            batch_size=options["batch_size"], max_errors=options["max_errors"]
+        )
+        try:
+            with open(path, encoding="utf-8-sig", newline="") as stream:
+                summary = importer.run(stream, format)
+        except OSError as error:
+            raise CommandError(error)
+
+        errors = summary.pop("errors")
+        for name, value in summary.items():
+            self.stdout.write(f"{name:<20}{value:>10}")
+        for error in errors:
+            self.stderr.write(json.dumps(error, ensure_ascii=False, default=str))
+
+        if summary["failed_rows"]:
+            self.stdout.write(self.style.WARNING("Catalog imported with errors"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Catalog imported"))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import cache_key_schema
+from core.utils import invalidate_tags
+from products.models import Product, ProductListing
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized product listing table used by product lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of products rebuilt together",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        product_ids = list(
+            Product.objects.select_related(None)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        with transaction.atomic():
+            for index in range(0, len(product_ids), batch_size):
+                ProductListing.objects.refresh_products(
+                    product_ids=product_ids[index : index + batch_size]
+                )
+            invalidate_tags(cache_key_schema.products_tag())
+
+        rows_count = ProductListing.objects.count()
+        self.stdout.write(f"{'products':<20}{len(product_ids):>10}")
+        self.stdout.write(f"{'listing rows':<20}{rows_count:>10}")
+        self.stdout.write(self.style.SUCCESS("Product listing table rebuilt"))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import cache_key_schema
+from core.utils import invalidate_tags
+from products.models import Product
+from products.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of products"
+
+    def handle(self, *args, **options):
+        search_backend = get_search_backend()
+        if not search_backend.supports_search:
+            raise CommandError(
+                f"Full-text search is not supported on {search_backend.connection.vendor}"
+            )
+
+        product_ids = list(
+            Product.objects.select_related(None)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        with transaction.atomic():
+            search_backend.drop_table()
+            search_backend.create_table()
+            search_backend.index_products(product_ids=product_ids)
+            invalidate_tags(cache_key_schema.search_tag())
+
+        self.stdout.write(f"{'products':<20}{len(product_ids):>10}")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
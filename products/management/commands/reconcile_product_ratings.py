@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from comments.models import Comment
+from products.models import Product
+
+
+def get_rating_subquery(aggregate):
+    ratings = (
+        Comment.objects.filter(
+            product=OuterRef("pk"), published=True, rating__isnull=False
+        )
+        .order_by()
+        .values("product")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    return Coalesce(
+        Subquery(ratings, output_field=IntegerField()),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def get_rating(rating_sum, rating_count):
+    return rating_sum / rating_count if rating_count else 0
+
+
+class Command(BaseCommand):
+    help = "Recompute product rating aggregates from the rated comments"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of products checked together",
+        )
+
+    def handle(self, *args, **options):
+        products = (
+            Product.objects.order_by("id")
+            .select_related(None)
+            .annotate(
+                actual_rating_sum=get_rating_subquery(Sum("rating")),
+                actual_rating_count=get_rating_subquery(Count("id")),
+            )
+        )
+        last_product_id, checked_products, reconciled_products = 0, 0, 0
+
+        while True:
+            batch = list(
+                products.filter(id__gt=last_product_id).values_list(
+                    "id",
+                    "rating_sum",
+                    "rating_count",
+                    "rating",
+                    "actual_rating_sum",
+                    "actual_rating_count",
+                )[: options["batch_size"]]
+            )
+            if not batch:
+                break
+
+            checked_products += len(batch)
+            last_product_id = batch[-1][0]
+            product_ids = [
+                product_id
+                for product_id, *aggregates, actual_sum, actual_count in batch
+                if aggregates
+                != [actual_sum, actual_count, get_rating(actual_sum, actual_count)]
+            ]
+
+            if not product_ids:
+                continue
+
+            with transaction.atomic():
+                rating_sum = get_rating_subquery(Sum("rating"))
+                rating_count = get_rating_subquery(Count("id"))
+                Product.objects.filter(id__in=product_ids).update(
+                    rating_sum=rating_sum,
+                    rating_count=rating_count,
+                    rating=Product.objects.get_rating_expression(
+                        rating_sum, rating_count
+                    ),
+                )
+                Product.objects.refresh_listings(product_ids)
+                Product.objects.invalidate_catalog_cache(product_ids=product_ids)
+            reconciled_products += len(product_ids)
+
+        self.stdout.write(f"{'checked products':<24}{checked_products:>10}")
+        self.stdout.write(f"{'reconciled products':<24}{reconciled_products:>10}")
+        self.stdout.write(self.style.SUCCESS("Product ratings reconciled"))
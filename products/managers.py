@@ -1,4 +1,25 @@
 from django.db import models
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from core import cache_key_schema
+from core.utils import invalidate_keys, invalidate_tags
+
+PRODUCT_LISTING_FIELDS = {
+    "category_id": "category_id",
+    "brand_id": "brand_id",
+    "name": "name",
+    "url": "url",
+    "category_full_name": "category__full_name",
+    "brand_name": "brand__name",
+    "brand_url": "brand__url",
+    "is_available": "is_available",
+    "is_visible": "is_visible",
+    "rating": "rating",
+    "main_image": "main_image",
+    "original_price": "cheapest_product_item__original_price",
+    "selling_price": "cheapest_product_item__selling_price",
+}
 
 
 class ProductManager(models.Manager):
@@ -7,6 +28,101 @@ class ProductManager(models.Manager):
         queryset = queryset.select_related("brand", "category", "cheapest_product_item")
         return queryset
 
+    def cheapest_product_item(self, product_id):
+        cheapest_product_item = (
+            self.filter(id=product_id)
+            .values_list(
+                "cheapest_product_item_id", "cheapest_product_item__selling_price"
+            )
+            .first()
+        )
+        return cheapest_product_item or (None, None)
+
+    def update_cheapest_product_items(self, product_ids):
+        product_item_model = self.model._meta.get_field("items").related_model
+        cheapest_product_items = (
+            product_item_model.objects.filter(
+                product=OuterRef("pk"),
+                inventory__gt=0,
+                is_visible=True,
+                is_available=True,
+            )
+            .order_by("selling_price", "id")
+            .values("id")[:1]
+        )
+
+        products = self.filter(id__in=product_ids)
+        products.exclude(cheapest_product_item=None).exclude(
+            cheapest_product_item__product=F("id")
+        ).update(cheapest_product_item=None)
+        products.update(cheapest_product_item=Subquery(cheapest_product_items))
+        self.refresh_listings(product_ids)
+
+    def get_rating_expression(self, rating_sum, rating_count):
+        return Coalesce(
+            Cast(rating_sum, output_field=FloatField())
+            / NullIf(rating_count, Value(0)),
+            Value(0.0),
+            output_field=FloatField(),
+        )
+
+    def update_rating(self, product_id, rating_sum, rating_count):
+        new_rating_sum = F("rating_sum") + rating_sum
+        new_rating_count = F("rating_count") + rating_count
+        updated = self.filter(id=product_id).update(
+            rating_sum=new_rating_sum,
+            rating_count=new_rating_count,
+            rating=self.get_rating_expression(new_rating_sum, new_rating_count),
+        )
+        self.refresh_listings([product_id])
+        return updated
+
+    def refresh_listings(self, product_ids):
+        product_listing_model = self.model._meta.get_field("listing").related_model
+        product_listing_model.objects.refresh_products(product_ids)
+
+    def invalidate_catalog_cache(
+        self,
+        product_ids,
+        product_item_ids=(),
+        category_ids=(),
+        brand_ids=(),
+        search=False,
+        facets=False,
+    ):
+        category_ids, brand_ids = set(category_ids), set(brand_ids)
+        for category_id, brand_id in self.filter(id__in=product_ids).values_list(
+            "category_id", "brand_id"
+        ):
+            category_ids.add(category_id)
+            brand_ids.add(brand_id)
+        brand_model = self.model._meta.get_field("brand").related_model
+        brand_urls = brand_model.objects.filter(id__in=brand_ids).values_list(
+            "url", flat=True
+        )
+
+        collection_tags = [cache_key_schema.products_tag()]
+        collection_tags.extend(
+            map(cache_key_schema.category_products_tag, category_ids)
+        )
+        collection_tags.extend(map(cache_key_schema.brand_products_tag, brand_urls))
+        tags = [
+            *map(cache_key_schema.product_tag, product_ids),
+            *collection_tags,
+            *map(cache_key_schema.ordering_tag, collection_tags),
+        ]
+        if search:
+            tags.append(cache_key_schema.search_tag())
+        if facets:
+            tags.append(cache_key_schema.facets_tag())
+        invalidate_tags(*tags)
+
+        if product_item_ids:
+            invalidate_keys(
+                cache_key_schema.all_product_items(),
+                *map(cache_key_schema.single_product_item, product_item_ids),
+            )
+
     def visible_products(self):
         queryset = self.filter(is_visible=True)
         return queryset
@@ -26,3 +142,133 @@ class ProductManager(models.Manager):
     def category_visible_products(self, category_id):
         queryset = self.filter(category=category_id, is_visible=True)
         return queryset
+
+
+class ProductAttributeValueManager(models.Manager):
+    def get_configuration_model(self):
+        product_model = self.model._meta.get_field("product").related_model
+        product_item_model = product_model._meta.get_field("items").related_model
+        return product_item_model.configuration.through
+
+    def refresh_products(self, product_ids, attribute_value_ids=None):
+        configuration_model = self.get_configuration_model()
+        configurations = configuration_model.objects.filter(
+            productitem__product_id__in=product_ids
+        )
+        product_attribute_values = self.filter(product_id__in=product_ids)
+        if attribute_value_ids is not None:
+            configurations = configurations.filter(
+                attributevalue_id__in=attribute_value_ids
+            )
+            product_attribute_values = product_attribute_values.filter(
+                attribute_value_id__in=attribute_value_ids
+            )
+
+        configurations = configurations.values_list(
+            "productitem__product_id",
+            "attributevalue_id",
+            "productitem__product__category_id",
+            "productitem__product__is_visible",
+        ).distinct()
+        product_attribute_values.delete()
+        self.bulk_create(
+            (
+                self.model(
+                    product_id=product_id,
+                    attribute_value_id=attribute_value_id,
+                    category_id=category_id,
+                    is_visible=is_visible,
+                )
+                for product_id, attribute_value_id, category_id, is_visible in (
+                    configurations.order_by()
+                )
+            ),
+            ignore_conflicts=True,
+        )
+
+    def update_products(self, product_ids, category_id, is_visible):
+        return self.filter(product_id__in=product_ids).update(
+            category_id=category_id, is_visible=is_visible
+        )
+
+    def filter_products(self, products, attribute_filters, field="id"):
+        for attribute_value_ids in attribute_filters.values():
+            product_ids = self.filter(attribute_value_id__in=attribute_value_ids)
+            products = products.filter(
+                **{f"{field}__in": product_ids.values("product_id")}
+            )
+        return products
+
+    def facet_counts(self, category_id, attribute_filters, visible_only=False):
+        queryset = self.filter(category_id=category_id)
+        if visible_only:
+            queryset = queryset.filter(is_visible=True)
+
+        facet_queries = [
+            self.filter_products(
+                queryset.exclude(attribute_value__attribute_id__in=attribute_filters),
+                attribute_filters,
+                field="product_id",
+            )
+        ]
+        for attribute_id in attribute_filters:
+            other_attribute_filters = {
+                other_attribute_id: attribute_value_ids
+                for other_attribute_id, attribute_value_ids in attribute_filters.items()
+                if other_attribute_id != attribute_id
+            }
+            facet_queries.append(
+                self.filter_products(
+                    queryset.filter(attribute_value__attribute_id=attribute_id),
+                    other_attribute_filters,
+                    field="product_id",
+                )
+            )
+
+        facet_counts = {}
+        for facet_query in facet_queries:
+            facet_counts.update(
+                facet_query.order_by()
+                .values_list("attribute_value_id")
+                .annotate(products_count=Count("product_id"))
+            )
+        return facet_counts
+
+
+class ProductListingManager(models.Manager):
+    def refresh_products(self, product_ids):
+        product_model = self.model._meta.get_field("product").related_model
+        products = product_model.objects.filter(id__in=product_ids).values_list(
+            "id", *PRODUCT_LISTING_FIELDS.values()
+        )
+        self.bulk_create(
+            (
+                self.model(
+                    product_id=product_id, **dict(zip(PRODUCT_LISTING_FIELDS, values))
+                )
+                for product_id, *values in products
+            ),
+            update_conflicts=True,
+            unique_fields=("product",),
+            update_fields=list(PRODUCT_LISTING_FIELDS),
+        )
+
+    def visible_products(self):
+        queryset = self.filter(is_visible=True)
+        return queryset
+
+    def brand_all_products(self, brand_url):
+        queryset = self.filter(brand_url=brand_url)
+        return queryset
+
+    def brand_visible_products(self, brand_url):
+        queryset = self.filter(brand_url=brand_url, is_visible=True)
+        return queryset
+
+    def category_all_products(self, category_id):
+        queryset = self.filter(category=category_id)
+        return queryset
+
+    def category_visible_products(self, category_id):
+        queryset = self.filter(category=category_id, is_visible=True)
+        return queryset
@@ -0,0 +1,108 @@
+# Generated by Django 4.2.6 on 2026-10-18 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_product_attribute_values(apps, schema_editor):
+    ProductItem = apps.get_model("products", "ProductItem")
+    ProductAttributeValue = apps.get_model("products", "ProductAttributeValue")
+    configurations = (
+        ProductItem.configuration.through.objects.values_list(
+            "productitem__product_id",
+            "attributevalue_id",
+            "productitem__product__category_id",
+            "productitem__product__is_visible",
+        )
+        .order_by()
+        .distinct()
+    )
+    ProductAttributeValue.objects.bulk_create(
+        (
+            ProductAttributeValue(
+                product_id=product_id,
+                attribute_value_id=attribute_value_id,
+                category_id=category_id,
+                is_visible=is_visible,
+            )
+            for product_id, attribute_value_id, category_id, is_visible in (
+                configurations.iterator()
+            )
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0004_alter_category_full_name"),
+        ("products", "0005_product_cheapest_product_item"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductAttributeValue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "is_visible",
+                    models.BooleanField(default=False, verbose_name="وضعیت نمایش"),
+                ),
+                (
+                    "attribute_value",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="product_attribute_values",
+                        to="products.attributevalue",
+                        verbose_name="مقدار ویژگی",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="product_attribute_values",
+                        to="categories.category",
+                        verbose_name="دسته\u200cبندی",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attribute_values",
+                        to="products.product",
+                        verbose_name="محصول",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "product_attribute_value",
+                "ordering": ("product", "attribute_value"),
+                "indexes": [
+                    models.Index(
+                        fields=["attribute_value", "product"],
+                        name="product_attr_value_idx",
+                    ),
+                    models.Index(
+                        fields=["category", "is_visible", "attribute_value"],
+                        name="product_attr_category_idx",
+                    ),
+                ],
+                "unique_together": {("product", "attribute_value")},
+            },
+        ),
+        migrations.RunPython(
+            code=fill_product_attribute_values,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
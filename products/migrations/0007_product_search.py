@@ -0,0 +1,41 @@
+from django.db import migrations
+
+CREATE_PRODUCT_SEARCH_TABLE = {
+    "sqlite": (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS product_search "
+        "USING fts5(name, brand, category, attributes, "
+        "tokenize = 'unicode61 remove_diacritics 2')",
+    ),
+    "postgresql": (
+        "CREATE TABLE IF NOT EXISTS product_search ("
+        "product_id bigint PRIMARY KEY REFERENCES product (id) "
+        "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS product_search_document_idx "
+        "ON product_search USING GIN (document)",
+    ),
+}
+
+
+def create_product_search_table(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in CREATE_PRODUCT_SEARCH_TABLE.get(vendor, ()):
+        schema_editor.execute(sql)
+
+
+def drop_product_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_PRODUCT_SEARCH_TABLE:
+        schema_editor.execute("DROP TABLE IF EXISTS product_search")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0006_product_attribute_value"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=create_product_search_table,
+            reverse_code=drop_product_search_table,
+        ),
+    ]
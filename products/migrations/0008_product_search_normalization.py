@@ -0,0 +1,112 @@
+from django.db import migrations
+
+from ._search_0008 import (
+    PRODUCT_SEARCH_BATCH_SIZE,
+    SEARCH_TERM_MIN_LENGTH,
+    get_search_documents,
+    get_search_terms,
+)
+
+DROP_PRODUCT_SEARCH_TABLE = {
+    "sqlite": (
+        "DROP TABLE IF EXISTS product_search",
+        "DROP TABLE IF EXISTS product_search_term",
+        "DROP TABLE IF EXISTS product_search_term_trigram",
+    ),
+    "postgresql": (
+        "DROP TABLE IF EXISTS product_search",
+        "DROP TABLE IF EXISTS product_search_term",
+    ),
+}
+CREATE_PRODUCT_SEARCH_TABLE = {
+    "sqlite": (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS product_search "
+        "USING fts5(name, brand, category, attributes, "
+        "tokenize = 'unicode61 remove_diacritics 2')",
+        "CREATE TABLE IF NOT EXISTS product_search_term (term TEXT PRIMARY KEY)",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS product_search_term_trigram "
+        "USING fts5(term, content = 'product_search_term', tokenize = 'trigram')",
+        "CREATE TRIGGER IF NOT EXISTS product_search_term_insert "
+        "AFTER INSERT ON product_search_term BEGIN "
+        "INSERT INTO product_search_term_trigram (rowid, term) "
+        "VALUES (new.rowid, new.term); END",
+    ),
+    "postgresql": (
+        "CREATE TABLE IF NOT EXISTS product_search ("
+        "product_id bigint PRIMARY KEY REFERENCES product (id) "
+        "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS product_search_document_idx "
+        "ON product_search USING GIN (document)",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE TABLE IF NOT EXISTS product_search_term (term text PRIMARY KEY)",
+        "CREATE INDEX IF NOT EXISTS product_search_term_trigram_idx "
+        "ON product_search_term USING GIN (term gin_trgm_ops)",
+    ),
+}
+INSERT_PRODUCT_SEARCH_DOCUMENT = {
+    "sqlite": (
+        "INSERT INTO product_search (rowid, name, brand, category, attributes) "
+        "VALUES (%s, %s, %s, %s, %s)"
+    ),
+    "postgresql": (
+        "INSERT INTO product_search (product_id, document) VALUES (%s, "
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'C'))"
+    ),
+}
+INSERT_PRODUCT_SEARCH_TERM = {
+    "sqlite": "INSERT OR IGNORE INTO product_search_term (term) VALUES (%s)",
+    "postgresql": (
+        "INSERT INTO product_search_term (term) VALUES (%s) "
+        "ON CONFLICT (term) DO NOTHING"
+    ),
+}
+
+
+def rebuild_product_search_table(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    vendor = schema_editor.connection.vendor
+    if vendor not in CREATE_PRODUCT_SEARCH_TABLE:
+        return
+
+    for sql in (
+        *DROP_PRODUCT_SEARCH_TABLE[vendor],
+        *CREATE_PRODUCT_SEARCH_TABLE[vendor],
+    ):
+        schema_editor.execute(sql)
+
+    product_ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+    with schema_editor.connection.cursor() as cursor:
+        for index in range(0, len(product_ids), PRODUCT_SEARCH_BATCH_SIZE):
+            documents = get_search_documents(
+                apps, product_ids[index : index + PRODUCT_SEARCH_BATCH_SIZE]
+            )
+            cursor.executemany(
+                INSERT_PRODUCT_SEARCH_DOCUMENT[vendor],
+                [(product_id, *document) for product_id, document in documents.items()],
+            )
+            terms = {
+                term
+                for document in documents.values()
+                for term in get_search_terms(" ".join(document))
+                if len(term) >= SEARCH_TERM_MIN_LENGTH
+            }
+            cursor.executemany(
+                INSERT_PRODUCT_SEARCH_TERM[vendor], [(term,) for term in terms]
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0007_product_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=rebuild_product_search_table,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
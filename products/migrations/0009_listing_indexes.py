@@ -0,0 +1,39 @@
+# Generated by Django 4.2.6 on 2026-10-18 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0008_product_search_normalization"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["is_visible", "is_available", "id"], name="product_listing_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "is_visible", "is_available", "id"],
+                name="product_category_listing_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["brand", "is_visible", "is_available", "id"],
+                name="product_brand_listing_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["is_visible", "rating", "id"], name="product_rating_listing_idx"
+            ),
+        ),
+    ]
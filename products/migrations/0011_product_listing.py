@@ -0,0 +1,223 @@
+# Generated by Django 4.2.6 on 2026-10-18 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_product_listings(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    ProductListing = apps.get_model("products", "ProductListing")
+    products = Product.objects.values_list(
+        "id",
+        "category_id",
+        "brand_id",
+        "name",
+        "url",
+        "category__full_name",
+        "brand__name",
+        "is_available",
+        "is_visible",
+        "rating",
+        "main_image",
+        "cheapest_product_item__original_price",
+        "cheapest_product_item__selling_price",
+    )
+    ProductListing.objects.bulk_create(
+        (
+            ProductListing(
+                product_id=product_id,
+                category_id=category_id,
+                brand_id=brand_id,
+                name=name,
+                url=url,
+                category_full_name=category_full_name,
+                brand_name=brand_name,
+                is_available=is_available,
+                is_visible=is_visible,
+                rating=rating,
+                main_image=main_image,
+                original_price=original_price,
+                selling_price=selling_price,
+            )
+            for (
+                product_id,
+                category_id,
+                brand_id,
+                name,
+                url,
+                category_full_name,
+                brand_name,
+                is_available,
+                is_visible,
+                rating,
+                main_image,
+                original_price,
+                selling_price,
+            ) in products.order_by().iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("brands", "0001_initial"),
+        ("categories", "0004_alter_category_full_name"),
+        ("products", "0010_product_rating_aggregate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductListing",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="listing",
+                        serialize=False,
+                        to="products.product",
+                        verbose_name="محصول",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, verbose_name="نام")),
+                (
+                    "url",
+                    models.SlugField(
+                        allow_unicode=True,
+                        db_index=False,
+                        max_length=255,
+                        verbose_name="لینک",
+                    ),
+                ),
+                (
+                    "category_full_name",
+                    models.CharField(
+                        max_length=255, verbose_name="نام کامل دسته\u200cبندی"
+                    ),
+                ),
+                (
+                    "brand_name",
+                    models.CharField(
+                        blank=True, max_length=255, null=True, verbose_name="نام برند"
+                    ),
+                ),
+                (
+                    "is_available",
+                    models.BooleanField(default=False, verbose_name="وضعیت موجودی"),
+                ),
+                (
+                    "is_visible",
+                    models.BooleanField(default=False, verbose_name="وضعیت نمایش"),
+                ),
+                ("rating", models.FloatField(default=0, verbose_name="امتیاز")),
+                (
+                    "main_image",
+                    models.ImageField(
+                        blank=True, upload_to="", verbose_name="تصویر اصلی"
+                    ),
+                ),
+                (
+                    "original_price",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=3,
+                        max_digits=15,
+                        null=True,
+                        verbose_name="قیمت اصلی",
+                    ),
+                ),
+                (
+                    "selling_price",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=3,
+                        max_digits=15,
+                        null=True,
+                        verbose_name="قیمت فروش",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "product_listing",
+                "ordering": ("-is_visible", "-is_available", "-pk"),
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_listing_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_category_listing_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_brand_listing_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_rating_listing_idx",
+        ),
+        migrations.AddField(
+            model_name="productlisting",
+            name="brand",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="product_listings",
+                to="brands.brand",
+                verbose_name="برند",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productlisting",
+            name="category",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="product_listings",
+                to="categories.category",
+                verbose_name="دسته\u200cبندی",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productlisting",
+            index=models.Index(
+                fields=["is_visible", "is_available", "product"], name="listing_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productlisting",
+            index=models.Index(
+                fields=["category", "is_visible", "is_available", "product"],
+                name="listing_category_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productlisting",
+            index=models.Index(
+                fields=["brand", "is_visible", "is_available", "product"],
+                name="listing_brand_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productlisting",
+            index=models.Index(
+                fields=["is_visible", "rating", "product"], name="listing_rating_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productlisting",
+            index=models.Index(
+                fields=["is_visible", "selling_price", "product"],
+                name="listing_price_idx",
+            ),
+        ),
+        migrations.RunPython(
+            code=fill_product_listings,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
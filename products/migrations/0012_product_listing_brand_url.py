@@ -0,0 +1,52 @@
+# Generated by Django 4.2.6 on 2026-10-18 16:23
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_brand_urls(apps, schema_editor):
+    Brand = apps.get_model("brands", "Brand")
+    ProductListing = apps.get_model("products", "ProductListing")
+    ProductListing.objects.filter(brand__isnull=False).update(
+        brand_url=Subquery(
+            Brand.objects.filter(id=OuterRef("brand_id")).values("url")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("brands", "0001_initial"),
+        ("products", "0011_product_listing"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="productlisting",
+            name="listing_brand_idx",
+        ),
+        migrations.AddField(
+            model_name="productlisting",
+            name="brand_url",
+            field=models.SlugField(
+                allow_unicode=True,
+                blank=True,
+                db_index=False,
+                max_length=100,
+                null=True,
+                verbose_name="لینک برند",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productlisting",
+            index=models.Index(
+                fields=["brand_url", "is_visible", "is_available", "product"],
+                name="listing_brand_url_idx",
+            ),
+        ),
+        migrations.RunPython(
+            code=fill_brand_urls,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,86 @@
+import re
+
+PRODUCT_SEARCH_BATCH_SIZE = 1000
+SEARCH_TERM_MIN_LENGTH = 3
+ZERO_WIDTH_NON_JOINER = "\u200c"
+SEARCH_TEXT_TRANSLATION = str.maketrans(
+    {
+        "\u064a": "\u06cc",
+        "\u0649": "\u06cc",
+        "\u0643": "\u06a9",
+        "\u0629": "\u0647",
+        "\u06c0": "\u0647",
+        "\u0623": "\u0627",
+        "\u0625": "\u0627",
+        "\u0671": "\u0627",
+        "\u0624": "\u0648",
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+        **{chr(code): None for code in range(0x064B, 0x0660)},
+        "\u0670": None,
+        "\u0640": None,
+        "\u200d": None,
+        "\u200e": None,
+        "\u200f": None,
+        "\ufeff": None,
+    }
+)
+ATTRIBUTE_VALUE_FIELDS = (
+    "char_value",
+    "text_value",
+    "int_value",
+    "decimal_value",
+    "date_value",
+    "time_value",
+)
+
+
+def normalize_search_text(text):
+    return text.translate(SEARCH_TEXT_TRANSLATION).casefold()
+
+
+def get_search_terms(text):
+    text = normalize_search_text(text).replace(ZERO_WIDTH_NON_JOINER, "")
+    return re.findall(r"\w+", text)
+
+
+def get_search_document_text(text):
+    text = normalize_search_text(text)
+    split_words = [
+        word.replace(ZERO_WIDTH_NON_JOINER, " ")
+        for word in text.split()
+        if ZERO_WIDTH_NON_JOINER in word
+    ]
+    return " ".join((text.replace(ZERO_WIDTH_NON_JOINER, ""), *split_words))
+
+
+def get_search_documents(apps, product_ids):
+    Product = apps.get_model("products", "Product")
+    ProductItem = apps.get_model("products", "ProductItem")
+
+    products = Product.objects.filter(id__in=product_ids).values_list(
+        "id", "name", "brand__name", "category__full_name"
+    )
+    documents = {
+        product_id: (name, brand_name or "", category_full_name)
+        for product_id, name, brand_name, category_full_name in products.order_by()
+    }
+    attributes = {product_id: {} for product_id in documents}
+
+    configurations = ProductItem.configuration.through.objects.filter(
+        productitem__product_id__in=documents
+    ).values_list(
+        "productitem__product_id",
+        "attributevalue__attribute__name",
+        *(f"attributevalue__{field}" for field in ATTRIBUTE_VALUE_FIELDS),
+    )
+    for product_id, attribute_name, *values in configurations.order_by().distinct():
+        attributes[product_id][attribute_name] = None
+        attributes[product_id].update((str(value), None) for value in values if value)
+
+    return {
+        product_id: tuple(
+            map(get_search_document_text, (*document, " ".join(attributes[product_id])))
+        )
+        for product_id, document in documents.items()
+    }
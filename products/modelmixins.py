@@ -1,33 +1,76 @@
-from django.core.cache import cache
 from django.utils.text import slugify
 from django_lifecycle import (
     AFTER_CREATE,
     AFTER_DELETE,
     AFTER_SAVE,
+    AFTER_UPDATE,
+    BEFORE_DELETE,
     BEFORE_SAVE,
     BEFORE_UPDATE,
     hook,
 )
 
 from core import cache_key_schema
+from core.modelmixins import CounterFieldsModelMixin
+from core.utils import invalidate_keys, invalidate_tags
 
+from .search import ATTRIBUTE_VALUE_FIELDS, get_search_backend
+
+
+class ProductModelMixin(CounterFieldsModelMixin):
+    counter_fields = (
+        "rating",
+        "rating_sum",
+        "rating_count",
+        "comments_count",
+        "views_count",
+        "sold_count",
+    )
 
-class ProductModelMixin:
     @hook(BEFORE_SAVE)
     def find_cheapest_product_item(self):
-        cheapest_product_item = (
-            self.items.filter(
-                inventory__gt=0,
-                is_visible=True,
-                is_available=True,
-            )
-            .order_by("selling_price")
-            .first()
+        if self._state.adding:
+            return
+        self.cheapest_product_item = self.get_purchasable_product_items().first()
+
+    def get_purchasable_product_items(self):
+        queryset = self.items.filter(
+            inventory__gt=0, is_visible=True, is_available=True
+        )
+        queryset = queryset.order_by("selling_price", "id")
+        return queryset
+
+    def set_cheapest_product_item(self, products, cheapest_product_item_id) -> bool:
+        updated = products.update(cheapest_product_item_id=cheapest_product_item_id)
+        if not updated:
+            return False
+
+        self.cheapest_product_item_id = cheapest_product_item_id
+        self.refresh_listing_ordering()
+        return True
+
+    def refresh_listing_ordering(self):
+        self._meta.model.objects.refresh_listings(product_ids=[self.id])
+        collection_tags = self.get_collection_cache_tags()
+        invalidate_tags(*map(cache_key_schema.ordering_tag, collection_tags))
+
+    def replace_cheapest_product_item(
+        self, current_cheapest_product_item_id, cheapest_product_item_id
+    ):
+        products = self._meta.model.objects.filter(
+            id=self.id, cheapest_product_item_id=current_cheapest_product_item_id
         )
-        if cheapest_product_item:
-            self.cheapest_product_item = cheapest_product_item
-        else:
-            self.cheapest_product_item = None
+        if not self.set_cheapest_product_item(products, cheapest_product_item_id):
+            self.refresh_cheapest_product_item()
+
+    def refresh_cheapest_product_item(self) -> bool:
+        cheapest_product_item_id = (
+            self.get_purchasable_product_items().values_list("id", flat=True).first()
+        )
+        products = self._meta.model.objects.filter(id=self.id).exclude(
+            cheapest_product_item_id=cheapest_product_item_id
+        )
+        return self.set_cheapest_product_item(products, cheapest_product_item_id)
 
     @hook(BEFORE_SAVE)
     def set_metadate(self):
@@ -46,29 +89,153 @@ class ProductModelMixin:
         old_image = self._meta.model.objects.get(id=self.id).main_image
         old_image.delete(save=False)
 
+    def get_cache_tags(self):
+        tags = [
+            cache_key_schema.product_tag(self.id),
+            cache_key_schema.category_tag(self.category_id),
+        ]
+        if self.brand_id:
+            tags.append(cache_key_schema.brand_tag(self.brand_id))
+        return tags
+
+    def get_collection_cache_tags(self):
+        brand_model = self._meta.get_field("brand").related_model
+        categories = {self.category_id, self.initial_value("category")} - {None}
+        brands = {self.brand_id, self.initial_value("brand")} - {None}
+        brand_urls = brand_model.objects.filter(id__in=brands).values_list(
+            "url", flat=True
+        )
+
+        tags = [cache_key_schema.products_tag()]
+        tags.extend(map(cache_key_schema.category_products_tag, categories))
+        tags.extend(map(cache_key_schema.brand_products_tag, brand_urls))
+        return tags
+
+    @hook(AFTER_CREATE)
+    @hook(
+        AFTER_UPDATE,
+        when_any=[
+            "category",
+            "brand",
+            "cheapest_product_item",
+            "name",
+            "url",
+            "is_available",
+            "is_visible",
+            "rating",
+            "main_image",
+        ],
+        has_changed=True,
+    )
+    def update_listing(self):
+        self._meta.model.objects.refresh_listings(product_ids=[self.id])
+
+    @hook(AFTER_UPDATE, when_any=["category", "is_visible"], has_changed=True)
+    def update_attribute_values(self):
+        product_attribute_value_model = self._meta.get_field(
+            "attribute_values"
+        ).related_model
+        updated = product_attribute_value_model.objects.update_products(
+            product_ids=[self.id],
+            category_id=self.category_id,
+            is_visible=self.is_visible,
+        )
+        if updated:
+            invalidate_tags(cache_key_schema.facets_tag())
+
+    @hook(AFTER_CREATE)
+    @hook(AFTER_UPDATE, when_any=["name", "brand", "category"], has_changed=True)
+    def update_search_document(self):
+        get_search_backend().index_products(product_ids=[self.id])
+
+    @hook(BEFORE_DELETE)
+    def remove_search_document(self):
+        get_search_backend().remove_products(product_ids=[self.id])
+
     @hook(AFTER_SAVE)
     @hook(AFTER_DELETE)
     def clear_cache(self):
-        category, brand = self.category, self.brand
-        cache.delete_many(
-            keys=(
-                cache_key_schema.all_products(),
-                cache_key_schema.visible_products(),
-                cache_key_schema.single_product(self.url),
-                cache_key_schema.category_all_products(category.id),
-                cache_key_schema.category_visible_products(category.id),
-                cache_key_schema.brand_all_products(brand.url if brand else None),
-                cache_key_schema.brand_visible_products(brand.url if brand else None),
+        invalidate_tags(cache_key_schema.product_tag(self.id))
+
+    @hook(AFTER_CREATE)
+    @hook(AFTER_DELETE)
+    @hook(
+        AFTER_UPDATE,
+        when_any=["is_visible", "is_available", "category", "brand"],
+        has_changed=True,
+    )
+    def clear_collections_cache(self):
+        invalidate_tags(*self.get_collection_cache_tags())
+
+    @hook(
+        AFTER_UPDATE,
+        when_any=["name", "rating", "cheapest_product_item"],
+        has_changed=True,
+    )
+    def clear_collections_ordering_cache(self):
+        collection_tags = self.get_collection_cache_tags()
+        invalidate_tags(*map(cache_key_schema.ordering_tag, collection_tags))
+
+
+class ProductItemModelMixin(CounterFieldsModelMixin):
+    counter_fields = ("inventory",)
+
+    def is_purchasable(self) -> bool:
+        return self.inventory > 0 and self.is_visible and self.is_available
+
+    @hook(AFTER_SAVE)
+    def update_cheapest_product_item(self):
+        product_model = self._meta.get_field("product").related_model
+        initial_product_id = self.initial_value("product")
+        if initial_product_id not in (None, self.product_id):
+            initial_product = product_model.objects.get(id=initial_product_id)
+            initial_product.refresh_cheapest_product_item()
+
+        cheapest_product_item = product_model.objects.cheapest_product_item(
+            product_id=self.product_id
+        )
+        cheapest_product_item_id, cheapest_selling_price = cheapest_product_item
+
+        if cheapest_product_item_id == self.id:
+            initial_selling_price = self.initial_value("selling_price")
+            if not self.is_purchasable() or (
+                initial_product_id == self.product_id
+                and self.selling_price > initial_selling_price
+            ):
+                self.product.refresh_cheapest_product_item()
+        elif self.is_purchasable() and (
+            cheapest_product_item_id is None
+            or (self.selling_price, self.id)
+            < (cheapest_selling_price, cheapest_product_item_id)
+        ):
+            self.product.replace_cheapest_product_item(
+                cheapest_product_item_id, self.id
             )
+
+    def is_cheapest_product_item(self) -> bool:
+        product_model = self._meta.get_field("product").related_model
+        cheapest_product_item_id, _ = product_model.objects.cheapest_product_item(
+            product_id=self.product_id
         )
+        return cheapest_product_item_id == self.id
 
+    @hook(AFTER_DELETE)
+    def remove_cheapest_product_item(self):
+        product = self.product
+        if not product.refresh_cheapest_product_item():
+            product.refresh_listing_ordering()
 
-class ProductItemModelMixin:
-    @hook(AFTER_CREATE)
-    @hook(AFTER_SAVE)
     @hook(AFTER_DELETE)
-    def update_cheapest_product_item(self):
-        self.product.save()
+    @hook(AFTER_UPDATE, when="product", has_changed=True)
+    def refresh_attribute_values(self):
+        product_model = self._meta.get_field("product").related_model
+        product_attribute_value_model = product_model._meta.get_field(
+            "attribute_values"
+        ).related_model
+        products = {self.product_id, self.initial_value("product")} - {None}
+        product_attribute_value_model.objects.refresh_products(product_ids=products)
+        get_search_backend().index_products(product_ids=products)
+        invalidate_tags(cache_key_schema.facets_tag(), cache_key_schema.search_tag())
 
     @hook(BEFORE_SAVE)
     def set_selling_price(self):
@@ -83,16 +250,24 @@ class ProductItemModelMixin:
     @hook(AFTER_SAVE)
     @hook(AFTER_DELETE)
     def clear_cache(self):
-        product = self.product
-        cache.delete_many(
-            keys=(
-                cache_key_schema.all_product_items(),
-                cache_key_schema.single_product_item(self.id),
-                cache_key_schema.all_products(),
-                cache_key_schema.visible_products(),
-                cache_key_schema.single_product(product.url),
-            )
+        invalidate_keys(
+            cache_key_schema.all_product_items(),
+            cache_key_schema.single_product_item(self.id),
         )
+        products = {self.product_id, self.initial_value("product")} - {None}
+        invalidate_tags(*map(cache_key_schema.product_tag, products))
+
+    @hook(AFTER_UPDATE, when_any=["original_price", "selling_price"], has_changed=True)
+    def update_product_listing(self):
+        if self.is_cheapest_product_item():
+            product_model = self._meta.get_field("product").related_model
+            product_model.objects.refresh_listings(product_ids=[self.product_id])
+
+    @hook(AFTER_UPDATE, when="selling_price", has_changed=True)
+    def clear_collections_ordering_cache(self):
+        if self.is_cheapest_product_item():
+            collection_tags = self.product.get_collection_cache_tags()
+            invalidate_tags(*map(cache_key_schema.ordering_tag, collection_tags))
 
 
 class ProductMediaModelMixin:
@@ -100,3 +275,59 @@ class ProductMediaModelMixin:
     def delete_old_file(self):
         old_file = self._meta.model.objects.get(id=self.id).file
         old_file.delete(save=False)
+
+    @hook(AFTER_SAVE)
+    @hook(AFTER_DELETE)
+    def clear_cache(self):
+        products = {self.product_id, self.initial_value("product")} - {None}
+        invalidate_tags(*map(cache_key_schema.product_tag, products))
+
+
+class ConfigurationModelMixin:
+    configuration_lookup = "configuration"
+
+    def get_configured_product_items(self):
+        product_item_model = self._meta.apps.get_model("products", "ProductItem")
+        return product_item_model.objects.filter(**{self.configuration_lookup: self})
+
+    def get_configured_product_ids(self) -> set:
+        product_items = self.get_configured_product_items().order_by()
+        return set(product_items.values_list("product_id", flat=True).distinct())
+
+    def update_configured_products(self, product_ids):
+        get_search_backend().index_products(product_ids=product_ids)
+        invalidate_tags(
+            cache_key_schema.facets_tag(),
+            cache_key_schema.search_tag(),
+            *map(cache_key_schema.product_tag, product_ids),
+        )
+
+    @hook(AFTER_CREATE)
+    def clear_facets_cache(self):
+        invalidate_tags(cache_key_schema.facets_tag())
+
+    @hook(BEFORE_DELETE)
+    def find_configured_products(self):
+        self.configured_product_ids = self.get_configured_product_ids()
+
+    @hook(AFTER_DELETE)
+    def remove_from_configured_products(self):
+        self.update_configured_products(self.configured_product_ids)
+
+
+class AttributeModelMixin(ConfigurationModelMixin):
+    configuration_lookup = "configuration__attribute"
+
+    @hook(AFTER_UPDATE, when_any=["name", "category"], has_changed=True)
+    def update_search_documents(self):
+        self.update_configured_products(self.get_configured_product_ids())
+
+
+class AttributeValueModelMixin(ConfigurationModelMixin):
+    @hook(
+        AFTER_UPDATE,
+        when_any=["attribute", *ATTRIBUTE_VALUE_FIELDS],
+        has_changed=True,
+    )
+    def update_search_documents(self):
+        self.update_configured_products(self.get_configured_product_ids())
@@ -5,10 +5,21 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django_lifecycle import LifecycleModelMixin
 
+from core import cache_key_schema
 from core.models import TimeStamp
 
-from .managers import ProductManager
-from .modelmixins import ProductItemModelMixin, ProductModelMixin
+from .managers import (
+    ProductAttributeValueManager,
+    ProductListingManager,
+    ProductManager,
+)
+from .modelmixins import (
+    AttributeModelMixin,
+    AttributeValueModelMixin,
+    ProductItemModelMixin,
+    ProductMediaModelMixin,
+    ProductModelMixin,
+)
 
 User = get_user_model()
 
@@ -132,6 +143,16 @@ class Product(LifecycleModelMixin, ProductModelMixin, TimeStamp):
             MaxValueValidator(5),
         ),
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name=_("مجموع امتیازها"),
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name=_("تعداد امتیازها"),
+        default=0,
+        editable=False,
+    )
     comments_count = models.IntegerField(
         verbose_name=_("تعداد نظرات"),
         default=0,
@@ -239,7 +260,7 @@ class ProductItem(LifecycleModelMixin, ProductItemModelMixin, models.Model):
         )
 
 
-class ProductMedia(LifecycleModelMixin, models.Model):
+class ProductMedia(LifecycleModelMixin, ProductMediaModelMixin, models.Model):
     IMAGE = 1
     VIDEO = 2
 
@@ -288,7 +309,7 @@ class ProductMedia(LifecycleModelMixin, models.Model):
         )
 
 
-class Attribute(models.Model):
+class Attribute(LifecycleModelMixin, AttributeModelMixin, models.Model):
     category = models.ForeignKey(
         verbose_name=_("دسته‌بندی"),
         related_name="attributes",
@@ -316,7 +337,7 @@ class Attribute(models.Model):
         )
 
 
-class AttributeValue(models.Model):
+class AttributeValue(LifecycleModelMixin, AttributeValueModelMixin, models.Model):
     attribute = models.ForeignKey(
         verbose_name=_("ویژگی"),
         related_name="values",
@@ -379,3 +400,170 @@ class AttributeValue(models.Model):
             viewname="products:attribute_value_detail_update_delete",
             kwargs={"attribute_value_id": self.id},
         )
+
+
+class ProductAttributeValue(models.Model):
+    product = models.ForeignKey(
+        verbose_name=_("محصول"),
+        related_name="attribute_values",
+        to="Product",
+        on_delete=models.CASCADE,
+    )
+    attribute_value = models.ForeignKey(
+        verbose_name=_("مقدار ویژگی"),
+        related_name="product_attribute_values",
+        to="AttributeValue",
+        on_delete=models.CASCADE,
+    )
+    category = models.ForeignKey(
+        verbose_name=_("دسته‌بندی"),
+        related_name="product_attribute_values",
+        to="categories.Category",
+        on_delete=models.CASCADE,
+    )
+    is_visible = models.BooleanField(
+        verbose_name=_("وضعیت نمایش"),
+        default=False,
+    )
+
+    objects = ProductAttributeValueManager()
+
+    class Meta:
+        ordering = ("product", "attribute_value")
+        db_table = "product_attribute_value"
+        unique_together = ("product", "attribute_value")
+        indexes = (
+            models.Index(
+                fields=("attribute_value", "product"),
+                name="product_attr_value_idx",
+            ),
+            models.Index(
+                fields=("category", "is_visible", "attribute_value"),
+                name="product_attr_category_idx",
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.product} | {self.attribute_value}"
+
+
+class ProductListing(models.Model):
+    product = models.OneToOneField(
+        verbose_name=_("محصول"),
+        related_name="listing",
+        to="Product",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    category = models.ForeignKey(
+        verbose_name=_("دسته‌بندی"),
+        related_name="product_listings",
+        to="categories.Category",
+        on_delete=models.CASCADE,
+    )
+    brand = models.ForeignKey(
+        verbose_name=_("برند"),
+        related_name="product_listings",
+        to="brands.Brand",
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    name = models.CharField(
+        verbose_name=_("نام"),
+        max_length=255,
+    )
+    url = models.SlugField(
+        verbose_name=_("لینک"),
+        max_length=255,
+        allow_unicode=True,
+        db_index=False,
+    )
+    category_full_name = models.CharField(
+        verbose_name=_("نام کامل دسته‌بندی"),
+        max_length=255,
+    )
+    brand_name = models.CharField(
+        verbose_name=_("نام برند"),
+        max_length=255,
+        blank=True,
+        null=True,
+    )
+    brand_url = models.SlugField(
+        verbose_name=_("لینک برند"),
+        max_length=100,
+        allow_unicode=True,
+        blank=True,
+        null=True,
+        db_index=False,
+    )
+    is_available = models.BooleanField(
+        verbose_name=_("وضعیت موجودی"),
+        default=False,
+    )
+    is_visible = models.BooleanField(
+        verbose_name=_("وضعیت نمایش"),
+        default=False,
+    )
+    rating = models.FloatField(
+        verbose_name=_("امتیاز"),
+        default=0,
+    )
+    main_image = models.ImageField(
+        verbose_name=_("تصویر اصلی"),
+        blank=True,
+    )
+    original_price = models.DecimalField(
+        verbose_name=_("قیمت اصلی"),
+        max_digits=15,
+        decimal_places=3,
+        blank=True,
+        null=True,
+    )
+    selling_price = models.DecimalField(
+        verbose_name=_("قیمت فروش"),
+        max_digits=15,
+        decimal_places=3,
+        blank=True,
+        null=True,
+    )
+
+    objects = ProductListingManager()
+
+    class Meta:
+        ordering = ("-is_visible", "-is_available", "-pk")
+        db_table = "product_listing"
+        indexes = (
+            models.Index(
+                fields=("is_visible", "is_available", "product"),
+                name="listing_idx",
+            ),
+            models.Index(
+                fields=("category", "is_visible", "is_available", "product"),
+                name="listing_category_idx",
+            ),
+            models.Index(
+                fields=("brand_url", "is_visible", "is_available", "product"),
+                name="listing_brand_url_idx",
+            ),
+            models.Index(
+                fields=("is_visible", "rating", "product"),
+                name="listing_rating_idx",
+            ),
+            models.Index(
+                fields=("is_visible", "selling_price", "product"),
+                name="listing_price_idx",
+            ),
+        )
+
+    def __str__(self) -> str:
+        return self.name
+
+    def get_cache_tags(self):
+        tags = [
+            cache_key_schema.product_tag(self.pk),
+            cache_key_schema.category_tag(self.category_id),
+        ]
+        if self.brand_id:
+            tags.append(cache_key_schema.brand_tag(self.brand_id))
+        return tags
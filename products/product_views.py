@@ -0,0 +1,115 @@
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError, ResponseError
+
+from core import cache_key_schema
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_VIEWS_DEDUPLICATION_TIMEOUT = 60 * 30
+PRODUCT_VIEWS_FLUSH_BATCH_SIZE = 1000
+
+RECORD_PRODUCT_VIEW_SCRIPT = """
+if ARGV[3] ~= "0" then
+    if not redis.call("SET", KEYS[2], 1, "NX", "EX", ARGV[3]) then
+        return 0
+    end
+end
+redis.call("HINCRBY", KEYS[1], ARGV[1], ARGV[2])
+return 1
+"""
+
+
+def get_visitor(request) -> str:
+    user = request.user
+    if user.is_authenticated:
+        return f"user-{user.id}"
+
+    visitor_source = "{address}|{user_agent}".format(
+        address=request.META.get("REMOTE_ADDR", ""),
+        user_agent=request.META.get("HTTP_USER_AGENT", ""),
+    )
+    return hashlib.md5(visitor_source.encode(), usedforsecurity=False).hexdigest()
+
+
+class ProductViewCounter:
+    def __init__(
+        self,
+        cache_alias="default",
+        deduplication_timeout=PRODUCT_VIEWS_DEDUPLICATION_TIMEOUT,
+    ):
+        self.cache_alias = cache_alias
+        self.deduplication_timeout = deduplication_timeout
+
+    def record(self, request, product_id) -> bool:
+        try:
+            connection = get_redis_connection(self.cache_alias)
+            record_product_view_script = connection.register_script(
+                RECORD_PRODUCT_VIEW_SCRIPT
+            )
+            recorded = record_product_view_script(
+                keys=[
+                    cache.make_key(cache_key_schema.product_views()),
+                    cache.make_key(
+                        cache_key_schema.product_viewer(
+                            product_id, get_visitor(request)
+                        )
+                    ),
+                ],
+                args=[product_id, 1, self.deduplication_timeout or 0],
+            )
+        except RedisError as error:
+            logger.warning("Could not record product view: %s", error)
+            return False
+        return bool(recorded)
+
+    def get_pending_views(self, connection) -> dict:
+        pending_key = cache.make_key(cache_key_schema.product_views())
+        flushing_key = cache.make_key(cache_key_schema.product_views_flushing())
+
+        if not connection.exists(flushing_key):
+            try:
+                connection.rename(pending_key, flushing_key)
+            except ResponseError:
+                return {}
+
+        return {
+            int(product_id): int(views)
+            for product_id, views in connection.hgetall(flushing_key).items()
+        }
+
+    def flush(self, batch_size=PRODUCT_VIEWS_FLUSH_BATCH_SIZE) -> dict:
+        connection = get_redis_connection(self.cache_alias)
+        pending_views = self.get_pending_views(connection)
+        product_ids = sorted(pending_views)
+        updated_products = 0
+
+        with transaction.atomic():
+            for index in range(0, len(product_ids), batch_size):
+                batch_product_ids = product_ids[index : index + batch_size]
+                views_expression = Case(
+                    *(
+                        When(id=product_id, then=Value(pending_views[product_id]))
+                        for product_id in batch_product_ids
+                    ),
+                    output_field=IntegerField(),
+                )
+                updated_products += Product.objects.filter(
+                    id__in=batch_product_ids
+                ).update(views_count=F("views_count") + views_expression)
+
+        connection.delete(cache.make_key(cache_key_schema.product_views_flushing()))
+        return {
+            "products": updated_products,
+            "views": sum(pending_views.values()),
+        }
+
+
+product_view_counter = ProductViewCounter()
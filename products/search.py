@@ -0,0 +1,453 @@
+import json
+import re
+
+from django.apps import apps as global_apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.expressions import RawSQL
+
+PRODUCT_SEARCH_TABLE = "product_search"
+PRODUCT_SEARCH_TERM_TABLE = "product_search_term"
+PRODUCT_SEARCH_BATCH_SIZE = 1000
+SEARCH_TERM_MIN_LENGTH = 3
+SEARCH_SIMILARITY_THRESHOLD = 0.3
+SEARCH_SUGGESTION_CANDIDATES = 20
+
+ZERO_WIDTH_NON_JOINER = "\u200c"
+SEARCH_TEXT_TRANSLATION = str.maketrans(
+    {
+        "\u064a": "\u06cc",
+        "\u0649": "\u06cc",
+        "\u0643": "\u06a9",
+        "\u0629": "\u0647",
+        "\u06c0": "\u0647",
+        "\u0623": "\u0627",
+        "\u0625": "\u0627",
+        "\u0671": "\u0627",
+        "\u0624": "\u0648",
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+        **{chr(code): None for code in range(0x064B, 0x0660)},
+        "\u0670": None,
+        "\u0640": None,
+        "\u200d": None,
+        "\u200e": None,
+        "\u200f": None,
+        "\ufeff": None,
+    }
+)
+
+ATTRIBUTE_VALUE_FIELDS = (
+    "char_value",
+    "text_value",
+    "int_value",
+    "decimal_value",
+    "date_value",
+    "time_value",
+)
+
+
+def normalize_search_text(text) -> str:
+    return text.translate(SEARCH_TEXT_TRANSLATION).casefold()
+
+
+def get_search_terms(query) -> list:
+    query = normalize_search_text(query).replace(ZERO_WIDTH_NON_JOINER, "")
+    return re.findall(r"\w+", query)
+
+
+def get_search_document_text(text) -> str:
+    text = normalize_search_text(text)
+    split_words = [
+        word.replace(ZERO_WIDTH_NON_JOINER, " ")
+        for word in text.split()
+        if ZERO_WIDTH_NON_JOINER in word
+    ]
+    return " ".join((text.replace(ZERO_WIDTH_NON_JOINER, ""), *split_words))
+
+
+def get_trigrams(term) -> set:
+    padded_term = f"  {term} "
+    return {padded_term[index : index + 3] for index in range(len(padded_term) - 2)}
+
+
+def get_similarity(term, other_term) -> float:
+    trigrams, other_trigrams = get_trigrams(term), get_trigrams(other_term)
+    return len(trigrams & other_trigrams) / len(trigrams | other_trigrams)
+
+
+def get_search_documents(product_ids, apps=global_apps) -> dict:
+    product_model = apps.get_model("products", "Product")
+    product_item_model = apps.get_model("products", "ProductItem")
+    configuration_model = product_item_model.configuration.through
+
+    products = product_model.objects.filter(id__in=product_ids).values_list(
+        "id", "name", "brand__name", "category__full_name"
+    )
+    documents = {
+        product_id: (name, brand_name or "", category_full_name)
+        for product_id, name, brand_name, category_full_name in products.order_by()
+    }
+    attributes = {product_id: {} for product_id in documents}
+
+    configurations = configuration_model.objects.filter(
+        productitem__product_id__in=documents
+    ).values_list(
+        "productitem__product_id",
+        "attributevalue__attribute__name",
+        *(f"attributevalue__{field}" for field in ATTRIBUTE_VALUE_FIELDS),
+    )
+    for product_id, attribute_name, *values in configurations.order_by().distinct():
+        attributes[product_id][attribute_name] = None
+        attributes[product_id].update((str(value), None) for value in values if value)
+
+    return {
+        product_id: tuple(
+            map(get_search_document_text, (*document, " ".join(attributes[product_id])))
+        )
+        for product_id, document in documents.items()
+    }
+
+
+class BaseSearchBackend:
+    supports_search = True
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def create_table(self):
+        raise NotImplementedError
+
+    def drop_table(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {PRODUCT_SEARCH_TABLE}")
+            cursor.execute(f"DROP TABLE IF EXISTS {PRODUCT_SEARCH_TERM_TABLE}")
+
+    def delete_documents(self, product_ids):
+        placeholders = ", ".join(["%s"] * len(product_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {PRODUCT_SEARCH_TABLE} "
+                f"WHERE {self.product_id_column} IN ({placeholders})",
+                product_ids,
+            )
+
+    def insert_documents(self, documents):
+        raise NotImplementedError
+
+    def insert_terms(self, terms):
+        raise NotImplementedError
+
+    def get_document_terms(self, product_ids) -> set:
+        raise NotImplementedError
+
+    def delete_unused_terms(self, terms):
+        raise NotImplementedError
+
+    def get_term_candidates(self, term) -> list:
+        raise NotImplementedError
+
+    def index_products(self, product_ids, apps=global_apps):
+        product_ids = list(product_ids)
+        for index in range(0, len(product_ids), PRODUCT_SEARCH_BATCH_SIZE):
+            batch_product_ids = product_ids[index : index + PRODUCT_SEARCH_BATCH_SIZE]
+            documents = get_search_documents(batch_product_ids, apps=apps)
+            old_terms = self.get_document_terms(batch_product_ids)
+            self.delete_documents(batch_product_ids)
+            terms = {
+                term
+                for document in documents.values()
+                for term in get_search_terms(" ".join(document))
+                if len(term) >= SEARCH_TERM_MIN_LENGTH
+            }
+            if documents:
+                self.insert_documents(documents)
+                self.insert_terms(terms)
+            self.delete_unused_terms(old_terms - terms)
+
+    def remove_products(self, product_ids):
+        product_ids = list(product_ids)
+        for index in range(0, len(product_ids), PRODUCT_SEARCH_BATCH_SIZE):
+            batch_product_ids = product_ids[index : index + PRODUCT_SEARCH_BATCH_SIZE]
+            old_terms = self.get_document_terms(batch_product_ids)
+            self.delete_documents(batch_product_ids)
+            self.delete_unused_terms(old_terms)
+
+    def get_search_query(self, search_terms) -> str:
+        raise NotImplementedError
+
+    def get_match_sql(self) -> str:
+        raise NotImplementedError
+
+    def get_rank_sql(self, product_id_column) -> str:
+        raise NotImplementedError
+
+    def search(self, queryset, search_terms):
+        search_query = self.get_search_query(search_terms)
+        product_id_column = '"{table}"."{column}"'.format(
+            table=queryset.model._meta.db_table, column=queryset.model._meta.pk.column
+        )
+        queryset = queryset.filter(
+            pk__in=RawSQL(sql=self.get_match_sql(), params=(search_query,))
+        ).annotate(
+            search_rank=RawSQL(
+                sql=self.get_rank_sql(product_id_column), params=(search_query,)
+            )
+        )
+        return queryset.order_by("-search_rank", *queryset.model._meta.ordering)
+
+    def suggest_term(self, term) -> str:
+        if len(term) < SEARCH_TERM_MIN_LENGTH:
+            return term
+
+        suggestions = [
+            (get_similarity(term, candidate), candidate)
+            for candidate in self.get_term_candidates(term)
+        ]
+        similarity, suggestion = max(suggestions, default=(0, term))
+        return suggestion if similarity >= SEARCH_SIMILARITY_THRESHOLD else term
+
+    def suggest_terms(self, search_terms) -> list:
+        return [self.suggest_term(search_term) for search_term in search_terms]
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    product_id_column = "rowid"
+
+    def create_table(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCT_SEARCH_TABLE} "
+                "USING fts5(name, brand, category, attributes, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {PRODUCT_SEARCH_TERM_TABLE} "
+                "(term TEXT PRIMARY KEY)"
+            )
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCT_SEARCH_TERM_TABLE}_trigram "
+                f"USING fts5(term, content = '{PRODUCT_SEARCH_TERM_TABLE}', "
+                "tokenize = 'trigram')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {PRODUCT_SEARCH_TERM_TABLE}_insert "
+                f"AFTER INSERT ON {PRODUCT_SEARCH_TERM_TABLE} BEGIN "
+                f"INSERT INTO {PRODUCT_SEARCH_TERM_TABLE}_trigram (rowid, term) "
+                "VALUES (new.rowid, new.term); END"
+            )
+
+    def drop_table(self):
+        super().drop_table()
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {PRODUCT_SEARCH_TERM_TABLE}_trigram")
+
+    def insert_documents(self, documents):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {PRODUCT_SEARCH_TABLE} "
+                "(rowid, name, brand, category, attributes) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [(product_id, *document) for product_id, document in documents.items()],
+            )
+
+    def insert_terms(self, terms):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT OR IGNORE INTO {PRODUCT_SEARCH_TERM_TABLE} (term) VALUES (%s)",
+                [(term,) for term in terms],
+            )
+
+    def get_document_terms(self, product_ids) -> set:
+        placeholders = ", ".join(["%s"] * len(product_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT name, brand, category, attributes FROM {PRODUCT_SEARCH_TABLE} "
+                f"WHERE rowid IN ({placeholders})",
+                product_ids,
+            )
+            return {
+                term
+                for document in cursor.fetchall()
+                for term in get_search_terms(" ".join(document))
+                if len(term) >= SEARCH_TERM_MIN_LENGTH
+            }
+
+    def delete_unused_terms(self, terms):
+        if not terms:
+            return
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, term FROM {PRODUCT_SEARCH_TERM_TABLE} "
+                "WHERE term IN (SELECT value FROM json_each(%s)) "
+                f"AND NOT EXISTS (SELECT 1 FROM {PRODUCT_SEARCH_TABLE} "
+                f"WHERE {PRODUCT_SEARCH_TABLE} MATCH '\"' || term || '\"')",
+                (json.dumps(list(terms)),),
+            )
+            unused_terms = cursor.fetchall()
+            cursor.executemany(
+                f"INSERT INTO {PRODUCT_SEARCH_TERM_TABLE}_trigram "
+                f"({PRODUCT_SEARCH_TERM_TABLE}_trigram, rowid, term) "
+                "VALUES ('delete', %s, %s)",
+                unused_terms,
+            )
+            cursor.executemany(
+                f"DELETE FROM {PRODUCT_SEARCH_TERM_TABLE} WHERE rowid = %s",
+                [(rowid,) for rowid, term in unused_terms],
+            )
+
+    def get_term_candidates(self, term) -> list:
+        trigrams = {term[index : index + 3] for index in range(len(term) - 2)}
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT term FROM {PRODUCT_SEARCH_TERM_TABLE}_trigram "
+                f"WHERE {PRODUCT_SEARCH_TERM_TABLE}_trigram MATCH %s "
+                "ORDER BY rank LIMIT %s",
+                (
+                    " OR ".join(f'"{trigram}"' for trigram in trigrams),
+                    SEARCH_SUGGESTION_CANDIDATES,
+                ),
+            )
+            return [term for (term,) in cursor.fetchall()]
+
+    def get_search_query(self, search_terms) -> str:
+        return " ".join(f'"{search_term}"*' for search_term in search_terms)
+
+    def get_match_sql(self) -> str:
+        return (
+            f"SELECT rowid FROM {PRODUCT_SEARCH_TABLE} "
+            f"WHERE {PRODUCT_SEARCH_TABLE} MATCH %s"
+        )
+
+    def get_rank_sql(self, product_id_column) -> str:
+        return (
+            f"SELECT -bm25({PRODUCT_SEARCH_TABLE}, 10.0, 4.0, 4.0, 1.0) "
+            f"FROM {PRODUCT_SEARCH_TABLE} WHERE {PRODUCT_SEARCH_TABLE} MATCH %s "
+            f"AND rowid = {product_id_column}"
+        )
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    product_id_column = "product_id"
+
+    def create_table(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {PRODUCT_SEARCH_TABLE} ("
+                "product_id bigint PRIMARY KEY REFERENCES product (id) "
+                "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {PRODUCT_SEARCH_TABLE}_document_idx "
+                f"ON {PRODUCT_SEARCH_TABLE} USING GIN (document)"
+            )
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {PRODUCT_SEARCH_TERM_TABLE} "
+                "(term text PRIMARY KEY)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {PRODUCT_SEARCH_TERM_TABLE}_trigram_idx "
+                f"ON {PRODUCT_SEARCH_TERM_TABLE} USING GIN (term gin_trgm_ops)"
+            )
+
+    def insert_documents(self, documents):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {PRODUCT_SEARCH_TABLE} (product_id, document) "
+                "VALUES (%s, "
+                "setweight(to_tsvector('simple', %s), 'A') || "
+                "setweight(to_tsvector('simple', %s), 'B') || "
+                "setweight(to_tsvector('simple', %s), 'B') || "
+                "setweight(to_tsvector('simple', %s), 'C')) "
+                "ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                [(product_id, *document) for product_id, document in documents.items()],
+            )
+
+    def insert_terms(self, terms):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {PRODUCT_SEARCH_TERM_TABLE} (term) VALUES (%s) "
+                "ON CONFLICT (term) DO NOTHING",
+                [(term,) for term in terms],
+            )
+
+    def get_document_terms(self, product_ids) -> set:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT unnest(tsvector_to_array(document)) "
+                f"FROM {PRODUCT_SEARCH_TABLE} WHERE product_id = ANY(%s)",
+                (list(product_ids),),
+            )
+            return {
+                term
+                for (term,) in cursor.fetchall()
+                if len(term) >= SEARCH_TERM_MIN_LENGTH
+            }
+
+    def delete_unused_terms(self, terms):
+        if not terms:
+            return
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {PRODUCT_SEARCH_TERM_TABLE} WHERE term = ANY(%s) "
+                f"AND NOT EXISTS (SELECT 1 FROM {PRODUCT_SEARCH_TABLE} "
+                "WHERE document @@ plainto_tsquery('simple', term))",
+                (list(terms),),
+            )
+
+    def get_term_candidates(self, term) -> list:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT term FROM {PRODUCT_SEARCH_TERM_TABLE} WHERE term %% %s "
+                "ORDER BY similarity(term, %s) DESC LIMIT %s",
+                (term, term, SEARCH_SUGGESTION_CANDIDATES),
+            )
+            return [term for (term,) in cursor.fetchall()]
+
+    def get_search_query(self, search_terms) -> str:
+        return " & ".join(f"{search_term}:*" for search_term in search_terms)
+
+    def get_match_sql(self) -> str:
+        return (
+            f"SELECT product_id FROM {PRODUCT_SEARCH_TABLE} "
+            "WHERE document @@ to_tsquery('simple', %s)"
+        )
+
+    def get_rank_sql(self, product_id_column) -> str:
+        return (
+            "SELECT ts_rank(document, to_tsquery('simple', %s)) "
+            f"FROM {PRODUCT_SEARCH_TABLE} WHERE product_id = {product_id_column}"
+        )
+
+
+class UnsupportedSearchBackend(BaseSearchBackend):
+    supports_search = False
+
+    def create_table(self):
+        pass
+
+    def drop_table(self):
+        pass
+
+    def index_products(self, product_ids, apps=global_apps):
+        pass
+
+    def remove_products(self, product_ids):
+        pass
+
+
+SEARCH_BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(connection=None) -> BaseSearchBackend:
+    connection = connection or connections[DEFAULT_DB_ALIAS]
+    search_backend_class = SEARCH_BACKENDS.get(
+        connection.vendor, UnsupportedSearchBackend
+    )
+    return search_backend_class(connection)
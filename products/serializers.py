@@ -4,7 +4,14 @@ from rest_framework.reverse import reverse
 from brands.serializers import BrandInfoSerializer
 from categories.serializers import CategoryInfoSerializer
 
-from .models import Attribute, AttributeValue, Product, ProductItem, ProductMedia
+from .models import (
+    Attribute,
+    AttributeValue,
+    Product,
+    ProductItem,
+    ProductListing,
+    ProductMedia,
+)
 
 
 class AttributeSerializer(serializers.ModelSerializer):
@@ -106,6 +113,53 @@ class ConfigurationSerializer(serializers.ModelSerializer):
         )
 
 
+class AttributeValueFacetSerializer(ConfigurationSerializer):
+    products_count = serializers.SerializerMethodField()
+    is_selected = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AttributeValue
+        fields = (
+            "id",
+            "char_value",
+            "text_value",
+            "int_value",
+            "decimal_value",
+            "date_value",
+            "time_value",
+            "products_count",
+            "is_selected",
+        )
+
+    def get_products_count(self, attribute_value) -> int:
+        return self.context["facet_counts"].get(attribute_value.id, 0)
+
+    def get_is_selected(self, attribute_value) -> bool:
+        return attribute_value.id in self.context["selected_attribute_values"]
+
+
+class AttributeFacetSerializer(serializers.ModelSerializer):
+    values = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Attribute
+        fields = ("id", "name", "values")
+
+    def get_values(self, attribute) -> list:
+        facet_counts = self.context["facet_counts"]
+        selected_attribute_values = self.context["selected_attribute_values"]
+        attribute_values = [
+            attribute_value
+            for attribute_value in attribute.values.all()
+            if facet_counts.get(attribute_value.id)
+            or attribute_value.id in selected_attribute_values
+        ]
+        serializer = AttributeValueFacetSerializer(
+            attribute_values, many=True, context=self.context
+        )
+        return serializer.data
+
+
 class ProductItemBaseSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(
         source="product.name",
@@ -343,6 +397,57 @@ class ProductListSerializer(ProductBaseSerializer):
         }
 
 
+class ProductListingSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(
+        source="pk",
+        read_only=True,
+    )
+    absolute_url = serializers.SerializerMethodField(
+        method_name="get_absolute_url",
+    )
+    comments_url = serializers.SerializerMethodField(
+        method_name="get_comments_url",
+    )
+
+    class Meta:
+        model = ProductListing
+        fields = (
+            "id",
+            "name",
+            "url",
+            "category_full_name",
+            "brand_name",
+            "is_available",
+            "is_visible",
+            "rating",
+            "absolute_url",
+            "comments_url",
+            "main_image",
+            "original_price",
+            "selling_price",
+        )
+
+    def get_absolute_url(self, product_listing) -> str:
+        return reverse(
+            viewname="products:product_detail_update_delete",
+            request=self.context.get("request"),
+            kwargs={
+                "category_id": product_listing.category_id,
+                "product_url": product_listing.url,
+            },
+        )
+
+    def get_comments_url(self, product_listing) -> str:
+        return reverse(
+            viewname="products:product_comments",
+            request=self.context.get("request"),
+            kwargs={
+                "category_id": product_listing.category_id,
+                "product_url": product_listing.url,
+            },
+        )
+
+
 class ProductDetailSerializer(ProductBaseSerializer):
     brand_info = BrandInfoSerializer(
         source="brand",
@@ -391,10 +496,71 @@ class ProductDetailSerializer(ProductBaseSerializer):
         representation.move_to_end("media_files")
         representation.move_to_end("items")
 
+        representation.pop("views_count", None)
         if not user.is_staff:
             representation.pop("create_datetime", None)
             representation.pop("update_datetime", None)
-            representation.pop("views_count", None)
             representation.pop("sold_count", None)
 
         return representation
+
+
+class ConfigurationListField(serializers.ListField):
+    child = serializers.IntegerField(min_value=1)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [value for value in data.split("|") if value.strip()]
+        return super().to_internal_value(data)
+
+
+class CatalogImportRowSerializer(serializers.Serializer):
+    product_name = serializers.CharField(max_length=255)
+    product_url = serializers.SlugField(
+        max_length=255, allow_unicode=True, required=False
+    )
+    category = serializers.IntegerField(min_value=1)
+    brand = serializers.SlugField(max_length=100, allow_unicode=True, required=False)
+    introduction = serializers.CharField(required=False, allow_blank=True)
+    main_image = serializers.CharField(max_length=100, required=False)
+    is_visible = serializers.BooleanField(required=False)
+    is_available = serializers.BooleanField(required=False)
+    sku = serializers.CharField(max_length=50)
+    original_price = serializers.DecimalField(
+        max_digits=15, decimal_places=3, min_value=0
+    )
+    selling_price = serializers.DecimalField(
+        max_digits=15, decimal_places=3, min_value=0, required=False
+    )
+    inventory = serializers.IntegerField(min_value=0)
+    item_is_visible = serializers.BooleanField(required=False)
+    item_is_available = serializers.BooleanField(required=False)
+    configuration = ConfigurationListField(required=False)
+
+
+class ProductItemBatchUpdateSerializer(serializers.Serializer):
+    sku = serializers.CharField(max_length=50)
+    original_price = serializers.DecimalField(
+        max_digits=15, decimal_places=3, min_value=0, required=False
+    )
+    selling_price = serializers.DecimalField(
+        max_digits=15, decimal_places=3, min_value=0, required=False
+    )
+    inventory = serializers.IntegerField(min_value=0, required=False)
+    is_visible = serializers.BooleanField(required=False)
+    is_available = serializers.BooleanField(required=False)
+
+
+class CatalogImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=("csv", "jsonl"), required=False)
+
+    def validate(self, attrs):
+        if "format" not in attrs:
+            extension = attrs["file"].name.rsplit(".", 1)[-1].lower()
+            if extension not in ("csv", "jsonl"):
+                raise serializers.ValidationError(
+                    {"format": "Could not detect the format from the file name"}
+                )
+            attrs["format"] = extension
+        return attrs
@@ -1,10 +1,14 @@
 import shutil
 from pathlib import Path
 
-from django.db.models.signals import pre_delete
+from django.db.models.signals import m2m_changed, pre_delete
 from django.dispatch import receiver
 
-from .models import Product, ProductMedia
+from core import cache_key_schema
+from core.utils import invalidate_tags
+
+from .models import Product, ProductAttributeValue, ProductItem, ProductMedia
+from .search import get_search_backend
 
 
 @receiver(signal=pre_delete, sender=Product)
@@ -19,3 +23,38 @@ def delete_product_media_directory(instance, **kwargs):
 def delete_product_media_file(instance, **kwargs):
     product_media_file = instance.file
     product_media_file.delete(save=False)
+
+
+@receiver(signal=m2m_changed, sender=ProductItem.configuration.through)
+def update_product_attribute_values(instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if action != "post_clear" and not pk_set:
+        return
+
+    if not reverse:
+        product_item = instance
+        product_ids = [product_item.product_id]
+        attribute_value_ids = None if action == "post_clear" else pk_set
+    else:
+        attribute_value = instance
+        attribute_value_ids = [attribute_value.id]
+        if action == "post_clear":
+            product_ids = ProductAttributeValue.objects.filter(
+                attribute_value=attribute_value
+            ).values_list("product_id", flat=True)
+        else:
+            product_ids = ProductItem.objects.filter(id__in=pk_set).values_list(
+                "product_id", flat=True
+            )
+        product_ids = set(product_ids)
+
+    ProductAttributeValue.objects.refresh_products(
+        product_ids=product_ids, attribute_value_ids=attribute_value_ids
+    )
+    get_search_backend().index_products(product_ids=product_ids)
+    invalidate_tags(
+        cache_key_schema.facets_tag(),
+        cache_key_schema.search_tag(),
+        *map(cache_key_schema.product_tag, product_ids),
+    )
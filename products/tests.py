@@ -1,3 +1,409 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.db.models import F
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from brands.models import Brand
+from categories.models import Category
+from comments.models import Comment
+from core.tests import RedisTestCase
+
+from .models import Product, ProductItem, ProductListing
+from .product_views import ProductViewCounter
+from .search import PRODUCT_SEARCH_TERM_TABLE, get_search_backend
+
+
+class ProductTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        cls.category = Category.objects.create(
+            name="Phones", media_folder_name="phones"
+        )
+
+    @classmethod
+    def create_product(cls, index, prices=()):
+        product = Product.objects.create(
+            name=f"Phone {index}",
+            url=f"phone-{index}",
+            category=cls.category,
+            main_image="products/phone.png",
+            is_visible=True,
+        )
+        for item_index, price in enumerate(prices):
+            ProductItem.objects.create(
+                product=product,
+                sku=f"phone-{index}-{item_index}",
+                original_price=price,
+                inventory=5,
+                is_visible=True,
+                is_available=True,
+            )
+        return product
+
+    def get_listing_price(self, product):
+        listing = ProductListing.objects.get(product=product)
+        return listing.selling_price
+
+
+class CheapestProductItemTests(ProductTestCase):
+    def test_deleting_cheapest_item_updates_listing(self):
+        product = self.create_product(1, prices=(100, 200))
+        cheap_item, expensive_item = product.items.order_by("selling_price")
+        self.assertEqual(self.get_listing_price(product), 100)
+
+        cheap_item.delete()
+        product.refresh_from_db()
+        self.assertEqual(product.cheapest_product_item_id, expensive_item.id)
+        self.assertEqual(self.get_listing_price(product), 200)
+
+        expensive_item.delete()
+        product.refresh_from_db()
+        self.assertIsNone(product.cheapest_product_item_id)
+        self.assertIsNone(self.get_listing_price(product))
+
+    def test_price_change_of_cheapest_item_updates_listing(self):
+        product = self.create_product(1, prices=(100, 200))
+        cheap_item = ProductItem.objects.get(id=product.items.order_by("id")[0].id)
+
+        cheap_item.selling_price = 90
+        cheap_item.save()
+
+        self.assertEqual(self.get_listing_price(product), 90)
+
+
+class ProductListingBrandTests(ProductTestCase):
+    def test_brand_products_are_filtered_without_brand_join(self):
+        brand = Brand.objects.create(name="Nokia", url="nokia")
+        product = self.create_product(1, prices=(100,))
+        product.brand = brand
+        product.save()
+        self.create_product(2, prices=(100,))
+
+        queryset = ProductListing.objects.brand_visible_products("nokia")
+        self.assertNotIn("JOIN", str(queryset.query))
+        self.assertEqual(list(queryset.values_list("product", flat=True)), [product.id])
+
+        brand = Brand.objects.get(id=brand.id)
+        brand.url = "nokia-phones"
+        brand.save()
+
+        self.assertFalse(ProductListing.objects.brand_visible_products("nokia"))
+        self.assertEqual(
+            list(
+                ProductListing.objects.brand_visible_products(
+                    "nokia-phones"
+                ).values_list("product", flat=True)
+            ),
+            [product.id],
+        )
+
+
+class ProductSearchTests(ProductTestCase):
+    def setUp(self):
+        self.search_backend = get_search_backend()
+        if not self.search_backend.supports_search:
+            self.skipTest("Full-text search is not supported")
+
+    def get_search_terms(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT term FROM {PRODUCT_SEARCH_TERM_TABLE}")
+            return {term for (term,) in cursor.fetchall()}
+
+    def test_search_ranks_matching_products(self):
+        product = self.create_product(1)
+        product.name = "Galaxy Note"
+        product.save()
+        other_product = self.create_product(2)
+        other_product.name = "Galaxy Tab Galaxy"
+        other_product.save()
+        self.create_product(3)
+
+        products = self.search_backend.search(ProductListing.objects.all(), ["galaxy"])
+
+        self.assertEqual(
+            list(products.values_list("product", flat=True)),
+            [other_product.id, product.id],
+        )
+        self.assertEqual(
+            list(
+                self.search_backend.search(
+                    ProductListing.objects.all(), ["galaxy", "not"]
+                ).values_list("product", flat=True)
+            ),
+            [product.id],
+        )
+
+    def test_unused_terms_are_pruned(self):
+        product = self.create_product(1)
+        other_product = self.create_product(2)
+        self.assertIn("phone", self.get_search_terms())
+
+        product = Product.objects.get(id=product.id)
+        product.name = "Galaxy"
+        product.save()
+        self.assertIn("galaxy", self.get_search_terms())
+
+        other_product.delete()
+        self.assertNotIn("phone", self.get_search_terms())
+
+        Product.objects.get(id=product.id).delete()
+        self.assertNotIn("galaxy", self.get_search_terms())
+
+
+class ProductCounterTests(RedisTestCase, ProductTestCase):
+    def test_counters_survive_patch_of_cached_product(self):
+        product = self.create_product(1, prices=(100,))
+        url = reverse(
+            "products:product_detail_update_delete",
+            kwargs={"category_id": self.category.id, "product_url": product.url},
+        )
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        Product.objects.filter(id=product.id).update(
+            views_count=F("views_count") + 5,
+            sold_count=F("sold_count") + 2,
+            comments_count=3,
+            rating=4.5,
+            rating_sum=9,
+            rating_count=2,
+        )
+        response = self.client.patch(
+            url, {"name": "Renamed phone"}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        product.refresh_from_db()
+        self.assertEqual(product.name, "Renamed phone")
+        self.assertEqual(
+            (
+                product.views_count,
+                product.sold_count,
+                product.comments_count,
+                product.rating,
+                product.rating_sum,
+                product.rating_count,
+            ),
+            (5, 2, 3, 4.5, 9, 2),
+        )
+
+
+class ProductDetailCacheTests(RedisTestCase, ProductTestCase):
+    def get_url(self, product, category_id=None):
+        return reverse(
+            "products:product_detail_update_delete",
+            kwargs={
+                "category_id": category_id or self.category.id,
+                "product_url": product.url,
+            },
+        )
+
+    def test_staff_fill_is_not_served_to_public(self):
+        product = self.create_product(1, prices=(100,))
+        Product.objects.filter(id=product.id).update(is_visible=False)
+        url = self.get_url(product)
+
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.logout()
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_product_is_cached_per_category(self):
+        product = self.create_product(1, prices=(100,))
+        other_category = Category.objects.create(
+            name="Tablets", media_folder_name="tablets"
+        )
+
+        self.assertEqual(self.client.get(self.get_url(product)).status_code, 200)
+        self.assertEqual(
+            self.client.get(self.get_url(product, other_category.id)).status_code, 404
+        )
+
+
+class ProductListPaginationTests(RedisTestCase, ProductTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for index in range(14):
+            cls.create_product(
+                index, prices=(100 + index % 5 * 10,) if index % 4 else ()
+            )
+        cls.url = reverse("products:product_list_create")
+
+    def get_offset_ids(self, ordering):
+        ids, page = [], 1
+        while True:
+            data = self.client.get(self.url, {"ordering": ordering, "page": page}).data
+            ids.extend(product["id"] for product in data["results"])
+            if not data["next"]:
+                return ids
+            page += 1
+
+    def get_cursor_ids(self, ordering):
+        data = self.client.get(
+            self.url, {"ordering": ordering, "pagination": "cursor"}
+        ).data
+        forward_ids = [product["id"] for product in data["results"]]
+        while data["next"]:
+            data = self.client.get(data["next"]).data
+            forward_ids.extend(product["id"] for product in data["results"])
+
+        backward_ids = [product["id"] for product in data["results"]]
+        while data["previous"]:
+            data = self.client.get(data["previous"]).data
+            backward_ids[:0] = [product["id"] for product in data["results"]]
+        return forward_ids, backward_ids
+
+    def test_cursor_walks_match_offset_pages(self):
+        for ordering in (
+            "cheapest_product_item__selling_price",
+            "-cheapest_product_item__selling_price",
+            "rating",
+            "-id",
+        ):
+            with self.subTest(ordering=ordering):
+                offset_ids = self.get_offset_ids(ordering)
+                forward_ids, backward_ids = self.get_cursor_ids(ordering)
+
+                self.assertEqual(len(offset_ids), 14)
+                self.assertEqual(forward_ids, offset_ids)
+                self.assertEqual(backward_ids, offset_ids)
+
+
+class ProductRatingTests(ProductTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.product = cls.create_product(1, prices=(100,))
+        cls.other_product = cls.create_product(2, prices=(100,))
+        cls.users = [
+            get_user_model().objects.create_user(f"user-{index}", password="password")
+            for index in range(3)
+        ]
+
+    def create_comment(self, user, rating, **kwargs):
+        return Comment.objects.create(
+            user=user, product=self.product, text="Comment", rating=rating, **kwargs
+        )
+
+    def save_comment(self, comment, **changes):
+        for field_name, value in changes.items():
+            setattr(comment, field_name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.save()
+
+    def assertRating(self, product, rating_sum, rating_count):
+        product.refresh_from_db()
+        listing = ProductListing.objects.get(product=product)
+        rating = rating_sum / rating_count if rating_count else 0
+        self.assertEqual(
+            (product.rating_sum, product.rating_count), (rating_sum, rating_count)
+        )
+        self.assertAlmostEqual(product.rating, rating)
+        self.assertAlmostEqual(listing.rating, rating)
+
+    def test_rating_is_added(self):
+        self.create_comment(self.users[0], 4)
+        self.create_comment(self.users[1], 3)
+        self.create_comment(self.users[2], None)
+
+        self.assertRating(self.product, 7, 2)
+
+    def test_rating_is_edited(self):
+        comment = self.create_comment(self.users[0], 4)
+        self.create_comment(self.users[1], 3)
+
+        self.save_comment(comment, rating=1)
+        self.assertRating(self.product, 4, 2)
+
+        self.save_comment(comment, rating=None)
+        self.assertRating(self.product, 3, 1)
+
+    def test_unpublished_rating_is_not_counted(self):
+        comment = self.create_comment(self.users[0], 4)
+        self.create_comment(self.users[1], 2, published=False)
+        self.assertRating(self.product, 4, 1)
+
+        self.save_comment(comment, published=False)
+        self.assertRating(self.product, 0, 0)
+
+        self.save_comment(comment, published=True)
+        self.assertRating(self.product, 4, 1)
+
+    def test_rating_is_deleted(self):
+        comment = self.create_comment(self.users[0], 4)
+        self.create_comment(self.users[1], 2)
+
+        comment.delete()
+        self.assertRating(self.product, 2, 1)
+
+    def test_rating_moves_with_comment(self):
+        comment = self.create_comment(self.users[0], 4)
+
+        self.save_comment(comment, product=self.other_product)
+        self.assertRating(self.product, 0, 0)
+        self.assertRating(self.other_product, 4, 1)
+
+
+class ProductViewCounterTests(RedisTestCase, ProductTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.product = cls.create_product(1)
+        cls.other_product = cls.create_product(2)
+        cls.user = get_user_model().objects.create_user("viewer", password="password")
+
+    def setUp(self):
+        super().setUp()
+        self.counter = ProductViewCounter()
+
+    def get_request(self, user=None, address="10.0.0.1"):
+        request = RequestFactory().get("/", REMOTE_ADDR=address)
+        request.user = user or AnonymousUser()
+        return request
+
+    def get_views_counts(self):
+        return list(
+            Product.objects.filter(id__in=(self.product.id, self.other_product.id))
+            .order_by("id")
+            .values_list("views_count", flat=True)
+        )
+
+    def test_views_are_deduplicated_per_visitor(self):
+        self.assertTrue(self.counter.record(self.get_request(), self.product.id))
+        self.assertFalse(self.counter.record(self.get_request(), self.product.id))
+        self.assertTrue(
+            self.counter.record(self.get_request(address="10.0.0.2"), self.product.id)
+        )
+        self.assertTrue(
+            self.counter.record(self.get_request(user=self.user), self.product.id)
+        )
+        self.assertFalse(
+            self.counter.record(self.get_request(user=self.user), self.product.id)
+        )
+        self.assertTrue(self.counter.record(self.get_request(), self.other_product.id))
+
+        self.assertEqual(self.counter.flush(), {"products": 2, "views": 4})
+        self.assertEqual(self.get_views_counts(), [3, 1])
+
+    def test_views_without_deduplication_are_all_counted(self):
+        counter = ProductViewCounter(deduplication_timeout=0)
+        for _ in range(3):
+            self.assertTrue(counter.record(self.get_request(), self.product.id))
+
+        counter.flush()
+        self.assertEqual(self.get_views_counts(), [3, 0])
+
+    def test_flush_adds_to_existing_counts_once(self):
+        Product.objects.filter(id=self.product.id).update(views_count=10)
+        self.counter.record(self.get_request(), self.product.id)
+
+        self.assertEqual(self.counter.flush(batch_size=1), {"products": 1, "views": 1})
+        self.assertEqual(self.counter.flush(), {"products": 0, "views": 0})
+        self.assertEqual(self.get_views_counts(), [11, 0])
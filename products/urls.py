@@ -9,6 +9,11 @@ urlpatterns = [
         view=views.ProductListCreate.as_view(),
         name="product_list_create",
     ),
+    path(
+        route="products/import/",
+        view=views.ProductCatalogImport.as_view(),
+        name="product_catalog_import",
+    ),
     path(
         route="products/<int:category_id>/<slug:product_url>/",
         view=views.ProductDetailUpdateDelete.as_view(),
@@ -24,6 +29,11 @@ urlpatterns = [
         view=views.ProductItemListCreate.as_view(),
         name="product_item_list_create",
     ),
+    path(
+        route="product-items/batch/",
+        view=views.ProductItemBatchUpdate.as_view(),
+        name="product_item_batch_update",
+    ),
     path(
         route="product-items/<int:product_item_id>/",
         view=views.ProductItemDetailUpdateDelete.as_view(),
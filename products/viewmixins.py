@@ -1,9 +1,20 @@
+from django.core.exceptions import ImproperlyConfigured
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAdminUser
+from rest_framework.settings import api_settings
 
 from core import cache_key_schema
+from core.pagination import CursorPageNumberPagination
 from core.permissions import IsAdminOrReadOnly
 from core.utils import get_cached_object, get_cached_queryset
+from core.viewmixins import CachedListAPIViewMixin
 
+from .filters import (
+    ATTRIBUTE_FILTER_PARAM,
+    AttributeValueFilter,
+    ProductListingOrderingFilter,
+    ProductSearchFilter,
+)
 from .models import Attribute, AttributeValue, Product, ProductItem, ProductMedia
 from .serializers import (
     AttributeSerializer,
@@ -12,22 +23,59 @@ from .serializers import (
 )
 
 
-class ProductAPIViewMixin:
+class CachedProductListAPIViewMixin(CachedListAPIViewMixin):
+    pagination_class = CursorPageNumberPagination
+    filter_backends = (
+        DjangoFilterBackend,
+        ProductSearchFilter,
+        ProductListingOrderingFilter,
+        AttributeValueFilter,
+    )
+    list_cache_params = (ATTRIBUTE_FILTER_PARAM,)
+    list_cache_collection_tag = None
+
+    def get_list_cache_collection_tag(self):
+        if self.list_cache_collection_tag is None:
+            raise ImproperlyConfigured(
+                f"{self.__class__.__name__} is missing a list cache collection tag. "
+                f"Define {self.__class__.__name__}.list_cache_collection_tag, or "
+                f"override {self.__class__.__name__}.get_list_cache_collection_tag()."
+            )
+        return self.list_cache_collection_tag(*self.get_list_cache_args())
+
+    def get_list_cache_tags(self, products):
+        query_params = self.request.query_params
+        search = query_params.get(api_settings.SEARCH_PARAM, "").strip()
+        ordering = query_params.get(api_settings.ORDERING_PARAM, "").strip()
+        attribute_filters = query_params.getlist(ATTRIBUTE_FILTER_PARAM)
+
+        collection_tag = self.get_list_cache_collection_tag()
+        tags = [collection_tag]
+        if search or ordering:
+            tags.append(cache_key_schema.ordering_tag(collection_tag))
+        if search:
+            tags.append(cache_key_schema.search_tag())
+        if attribute_filters:
+            tags.append(cache_key_schema.facets_tag())
+
+        tags.extend(super().get_list_cache_tags(products))
+        return tags
+
+
+class ProductAPIViewMixin(CachedProductListAPIViewMixin):
     queryset = Product.objects.all()
     permission_classes = (IsAdminOrReadOnly,)
+    list_cache_collection_tag = staticmethod(cache_key_schema.products_tag)
+    all_list_cache_key = staticmethod(cache_key_schema.all_products)
+    visible_list_cache_key = staticmethod(cache_key_schema.visible_products)
 
     def get_queryset(self):
         user, queryset = self.request.user, super().get_queryset()
 
-        if user.is_staff:
-            cache_key = cache_key_schema.all_products()
-        else:
+        if not user.is_staff:
             queryset = Product.objects.visible_products()
-            queryset = self.filter_queryset(queryset=queryset)
-            cache_key = cache_key_schema.visible_products()
 
-        cached_queryset = get_cached_queryset(queryset=queryset, cache_key=cache_key)
-        return cached_queryset
+        return queryset
 
 
 class ProductItemAPIViewMixin:
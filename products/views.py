@@ -1,20 +1,42 @@
-from django.core.cache import cache
+import io
+
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
 from rest_framework.generics import (
+    GenericAPIView,
     ListAPIView,
     ListCreateAPIView,
     RetrieveUpdateDestroyAPIView,
 )
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
 from comments.models import Comment
 from comments.serializers import CommentListSerializer
 from core import cache_key_schema
+from core.cdn import add_surrogate_keys
+from core.pagination import CursorPageNumberPagination
+from core.utils import (
+    NAMESPACED_CACHE_TIMEOUT,
+    get_cached_entry,
+    get_cached_object,
+    get_cached_object_validators,
+    get_conditional_cached_response,
+    get_query_fingerprint,
+)
 
-from .models import Product
+from .catalog_import import CatalogImporter, update_product_items
+from .models import Product, ProductListing
+from .product_views import product_view_counter
 from .serializers import (
+    CatalogImportSerializer,
     ProductDetailSerializer,
+    ProductItemBatchUpdateSerializer,
     ProductItemDetailSerializer,
     ProductItemListSerializer,
+    ProductListingSerializer,
     ProductListSerializer,
 )
 from .viewmixins import (
@@ -29,28 +51,86 @@ from .viewmixins import (
 class ProductListCreate(ProductAPIViewMixin, ListCreateAPIView):
     serializer_class = ProductListSerializer
     ordering_fields = ("id", "rating", "cheapest_product_item__selling_price")
-    search_fields = ("name", "brand__name", "category__full_name")
+    search_fields = ("name", "brand_name", "category_full_name")
+
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return ProductListingSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return ProductListing.objects.all()
+        return ProductListing.objects.visible_products()
 
 
 class ProductDetailUpdateDelete(ProductAPIViewMixin, RetrieveUpdateDestroyAPIView):
     serializer_class = ProductDetailSerializer
     http_method_names = ("get", "patch", "delete")
+    object_cache_timeout = 60 * 60
+    cache_representation = True
+    count_views = True
+
+    def record_view(self, product_id):
+        if self.count_views and not self.request.user.is_staff:
+            product_view_counter.record(self.request, product_id)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.cache_representation:
+            response = super().retrieve(request, *args, **kwargs)
+            self.record_view(response.data["id"])
+            return response
+
+        cache_key = cache_key_schema.product_representation(
+            category=self.kwargs["category_id"],
+            product=self.kwargs["product_url"],
+            view=self.get_cache_view(),
+            fingerprint=get_query_fingerprint(request, param_names=()),
+        )
+        cache_tags = []
+
+        def get_representation():
+            product = self.get_object()
+            cache_tags.extend(product.get_cache_tags())
+            serializer = self.get_serializer(product)
+            return serializer.data
+
+        cached_representation = get_cached_entry(
+            get_object_function=get_representation,
+            cache_key=cache_key,
+            timeout=NAMESPACED_CACHE_TIMEOUT,
+            get_tags_function=lambda representation: cache_tags,
+        )
+        self.record_view(cached_representation.value["id"])
+        etag, last_modified = get_cached_object_validators(
+            cache_key, cached_representation
+        )
+        response = get_conditional_cached_response(
+            request, etag, last_modified, Response(data=cached_representation.value)
+        )
+        return add_surrogate_keys(request, response, cached_representation.tags)
+
+    def get_cache_view(self) -> str:
+        return "staff" if self.request.user.is_staff else "public"
 
     def get_object(self):
         category_id = self.kwargs["category_id"]
         product_url = self.kwargs["product_url"]
-        cache_key = cache_key_schema.single_product(product_url)
+        cache_key = cache_key_schema.single_product(
+            category=category_id, product=product_url, view=self.get_cache_view()
+        )
 
-        cached_object = cache.get(key=cache_key)
-        if cached_object is None:
-            queryset = self.get_queryset()
-            product = get_object_or_404(
-                klass=queryset, category__id=category_id, url=product_url
-            )
-            cached_object = cache.get_or_set(
-                key=cache_key, default=product, timeout=None
+        def get_product():
+            return get_object_or_404(
+                klass=self.get_queryset(), category__id=category_id, url=product_url
             )
 
+        cached_object = get_cached_object(
+            get_object_function=get_product,
+            cache_key=cache_key,
+            timeout=self.object_cache_timeout,
+            get_tags_function=Product.get_cache_tags,
+        )
         return cached_object
 
     def get_queryset(self):
@@ -63,24 +143,46 @@ class ProductDetailUpdateDelete(ProductAPIViewMixin, RetrieveUpdateDestroyAPIVie
         return queryset
 
 
+@method_decorator(decorator=transaction.non_atomic_requests, name="dispatch")
+class ProductCatalogImport(GenericAPIView):
+    serializer_class = CatalogImportSerializer
+    permission_classes = (IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        file = serializer.validated_data["file"]
+        stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        summary = CatalogImporter().run(stream, serializer.validated_data["format"])
+        return Response(data=summary)
+
+
 class ProductCommentList(ListAPIView):
     serializer_class = CommentListSerializer
+    pagination_class = CursorPageNumberPagination
     ordering_fields = ("id", "likes_count", "is_buyer")
+    object_cache_timeout = 60 * 60
 
     def get_object(self):
         category_id = self.kwargs["category_id"]
         product_url = self.kwargs["product_url"]
-        cache_key = cache_key_schema.single_product(product_url)
+        cache_key = cache_key_schema.single_product(
+            category=category_id, product=product_url, view="all"
+        )
 
-        cached_object = cache.get(key=cache_key)
-        if cached_object is None:
-            product = get_object_or_404(
+        def get_product():
+            return get_object_or_404(
                 klass=Product, category__id=category_id, url=product_url
             )
-            cached_object = cache.get_or_set(
-                key=cache_key, default=product, timeout=None
-            )
 
+        cached_object = get_cached_object(
+            get_object_function=get_product,
+            cache_key=cache_key,
+            timeout=self.object_cache_timeout,
+            get_tags_function=Product.get_cache_tags,
+        )
         return cached_object
 
     def get_queryset(self):
@@ -117,6 +219,18 @@ class ProductItemDetailUpdateDelete(
         return queryset
 
 
+class ProductItemBatchUpdate(GenericAPIView):
+    serializer_class = ProductItemBatchUpdateSerializer
+    permission_classes = (IsAdminUser,)
+    http_method_names = ("patch",)
+
+    def patch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        summary = update_product_items(serializer.validated_data)
+        return Response(data=summary)
+
+
 class ProductMediaListCreate(ProductMediaAPIViewMixin, ListCreateAPIView):
     pass
 